@@ -0,0 +1,226 @@
+"""
+Suíte de benchmarks do otimizador, do simulador e dos dashboards
+
+Executa os pontos de entrada com instâncias sintéticas de tamanho crescente
+(operários, opções de horas, linhas/produtos e cenários) e registra tempo de
+parede, pico de memória (tracemalloc, numa execução à parte para não
+distorcer o tempo) e, para os modelos, o tempo de montagem separado do
+tempo do solver. Compara com um arquivo de baseline e aponta regressões
+acima do limiar.
+
+Uso (a partir de expo/):
+    python benchmarks/desempenho.py --salvar-baseline     # grava a referência
+    python benchmarks/desempenho.py [--limiar 0.25]        # compara com ela
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from data.parametros import PARAMETROS
+from models import instrumentacao
+from models.multiproduto import OtimizadorMultiLinha, instancia_sintetica
+from models.otimizacao import OtimizadorProducao
+from models.simulacao import SimuladorCenarios
+from models.solvers import resolver
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Métricas comparadas com a baseline (as de tempo ficam sujeitas ao limiar)
+METRICAS = ('tempo_total', 'tempo_montagem', 'tempo_solver', 'pico_memoria_mb')
+
+
+def medir(funcao, repeticoes):
+    """Mediana do tempo de parede e pico de memória de funcao()
+
+    O tempo vem de execuções sem tracemalloc (rastrear cada alocação deixa
+    lentos os casos que alocam muito); o pico vem de uma execução extra.
+    """
+    tempos, extras = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        retorno = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        # Casos de montar_e_resolver e com_etapas devolvem tempos de montagem/solver
+        extras.append({chave: retorno[chave] for chave in ('tempo_montagem', 'tempo_solver')
+                       if isinstance(retorno, dict) and chave in retorno})
+
+    tracemalloc.start()
+    try:
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+    medicao = {'tempo_total': statistics.median(tempos), 'pico_memoria_mb': pico}
+    for chave in extras[0]:
+        medicao[chave] = statistics.median(extra[chave] for extra in extras)
+    return medicao
+
+
+def montar_e_resolver(montar, backend='auto'):
+    """Separa o tempo de montagem do modelo do tempo gasto no solver"""
+    def executar():
+        inicio = time.perf_counter()
+        problema = montar()
+        tempo_montagem = time.perf_counter() - inicio
+        solucao = resolver(problema, backend=backend)
+        return {'tempo_montagem': tempo_montagem, 'tempo_solver': solucao['tempo_solver']}
+    return executar
+
+
+def com_etapas(funcao):
+    """Roda um ponto de entrada com a instrumentação ligada e soma as etapas
+    'montagem_modelo' e 'solver' (só as do processo atual: use n_processos=1)"""
+    def executar():
+        instrumentacao.limpar()
+        instrumentacao.ativar()
+        try:
+            funcao()
+        finally:
+            instrumentacao.desativar()
+        totais = {}
+        for etapa in instrumentacao.resumo()['etapas']:
+            totais[etapa['nome']] = totais.get(etapa['nome'], 0.0) + etapa['total']
+        return {'tempo_montagem': totais.get('montagem_modelo', 0.0),
+                'tempo_solver': totais.get('solver', 0.0)}
+    return executar
+
+
+def casos(rapido=False):
+    """Gera (nome, função) para cada ponto de entrada e tamanho de instância"""
+    escala = [10, 100, 1000] if rapido else [10, 100, 1000, 10000]
+    for operarios in escala:
+        parametros = dict(PARAMETROS, operarios_maximos=operarios, meta_diaria=operarios * 500)
+        otimizador = OtimizadorProducao(parametros, cache=False)
+        yield f'otimizar_producao/operarios={operarios}', com_etapas(otimizador.otimizar_producao)
+        for backend in ('analitico', 'cbc'):
+            yield (f'modelo_horas_fixas/{backend}/operarios={operarios}',
+                   montar_e_resolver(lambda o=otimizador: o.modelo_horas_fixas(7), backend))
+
+    for n_opcoes in ([4, 16, 64] if rapido else [4, 16, 64, 256]):
+        opcoes = list(np.round(np.linspace(4, 12, n_opcoes), 3))
+        otimizador = OtimizadorProducao(PARAMETROS, cache=False)
+        yield (f'otimizar_com_horas_variaveis/opcoes={n_opcoes}',
+               com_etapas(lambda o=otimizador, h=opcoes: o.otimizar_com_horas_variaveis(h)))
+        yield (f'modelo_horas_selecionadas/opcoes={n_opcoes}',
+               montar_e_resolver(lambda o=otimizador, h=opcoes: o.modelo_horas_selecionadas(h)))
+
+    for n_pontos in ([10, 50] if rapido else [10, 50, 200]):
+        otimizador = OtimizadorProducao(PARAMETROS, cache=False)
+        yield (f'fronteira_pareto/pontos={n_pontos}',
+               com_etapas(lambda o=otimizador, n=n_pontos: o.fronteira_pareto(n, n_processos=1)))
+
+    for linhas, produtos in ([(5, 20), (20, 200)] if rapido else [(5, 20), (20, 200), (50, 1000)]):
+        otimizador = OtimizadorMultiLinha(instancia_sintetica(linhas, produtos))
+        yield f'multi_linha/linhas={linhas},produtos={produtos}', otimizador.otimizar_producao
+        yield (f'multi_linha_modelo/linhas={linhas},produtos={produtos}',
+               montar_e_resolver(lambda o=otimizador: o.montar_modelo()['problema']))
+
+    simulador = SimuladorCenarios(PARAMETROS)
+    yield 'simular_cenarios', simulador.simular_cenarios
+    for lado in ([10, 100] if rapido else [10, 100, 300]):
+        n_cenarios = lado ** 2 * 12
+        yield (f'simular_grade/cenarios={n_cenarios}',
+               lambda l=lado: simulador.simular_grade(operarios=np.arange(1, l + 1), horas=np.linspace(4, 12, l),
+                                                      taxa_producao=[90, 100, 110],
+                                                      meta_diaria=[2500, 3000, 3500, 4000]))
+
+    from models.horizonte import demanda_exemplo
+    for n_dias in ([28] if rapido else [28, 112]):
+        yield (f'planejar_horizonte/dias={n_dias}',
+               lambda n=n_dias: OtimizadorProducao(PARAMETROS).planejar_horizonte(
+                   demanda_exemplo(PARAMETROS, n), n_processos=1))
+
+    from models.eventos import SimuladorEventos
+    eventos = SimuladorEventos(PARAMETROS)
+    for n_turnos in ([4] if rapido else [4, 22]):
+        yield (f'simular_turnos_eventos/turnos={n_turnos}',
+               lambda n=n_turnos: eventos.simular_turnos(n, semente=0, n_processos=1))
+
+    from visualization.dashboard import criar_dashboard
+    resultado = OtimizadorProducao(PARAMETROS).otimizar_producao()
+    cenarios = simulador.simular_cenarios()
+    for lado in ([10, 200] if rapido else [10, 200, 1000]):
+        grade = {'operarios': list(range(1, lado + 1)), 'horas': list(np.linspace(4, 12, lado))}
+
+        def dashboard(grade=grade):
+            with tempfile.TemporaryDirectory() as diretorio:
+                criar_dashboard(resultado, cenarios, PARAMETROS, exportar=os.path.join(diretorio, 'r.html'),
+                                grade_sensibilidade=grade, cache=None)
+        yield f'criar_dashboard/grade={lado}x{lado}', dashboard
+
+
+def comparar(resultados, baseline, limiar):
+    """Lista as métricas que pioraram mais que o limiar em relação à baseline"""
+    regressoes = []
+    for nome, medicao in resultados.items():
+        referencia = baseline.get(nome)
+        if referencia is None:
+            continue
+        for metrica in METRICAS:
+            if metrica not in medicao or metrica not in referencia:
+                continue
+            anterior, atual = referencia[metrica], medicao[metrica]
+            # Ignora medições muito pequenas, dominadas por ruído
+            piso = 1e-3 if metrica.startswith('tempo') else 0.5
+            if max(anterior, atual) >= piso and atual > anterior * (1 + limiar):
+                regressoes.append((nome, metrica, anterior, atual))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baseline', default=BASELINE_PADRAO)
+    parser.add_argument('--salvar-baseline', action='store_true', help="grava os resultados como baseline")
+    parser.add_argument('--limiar', type=float, default=0.25, help="piora relativa aceita (0.25 = 25%%)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--rapido', action='store_true', help="só as instâncias menores")
+    parser.add_argument('--filtro', default='', help="roda só os casos cujo nome contém o texto")
+    parser.add_argument('--saida', help="grava os resultados desta execução em JSON")
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for nome, funcao in casos(args.rapido):
+        if args.filtro not in nome:
+            continue
+        medicao = medir(funcao, args.repeticoes)
+        resultados[nome] = medicao
+        detalhes = ''.join(f"  {m[6:]}={medicao[m] * 1000:.1f}ms"
+                           for m in ('tempo_montagem', 'tempo_solver') if m in medicao)
+        print(f"{nome:<55} {medicao['tempo_total'] * 1000:>10.1f} ms {medicao['pico_memoria_mb']:>8.1f} MB{detalhes}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"💾 Baseline gravada em '{args.baseline}'")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ Sem baseline para comparar; rode com --salvar-baseline")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as arquivo:
+        regressoes = comparar(resultados, json.load(arquivo), args.limiar)
+    for nome, metrica, anterior, atual in regressoes:
+        print(f"❌ {nome} {metrica}: {anterior:.4g} -> {atual:.4g} (+{(atual / anterior - 1):.0%})")
+    if not regressoes:
+        print(f"✅ Nenhuma regressão acima de {args.limiar:.0%}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark de inicialização a frio da CLI (main.py)
+
+Executa cada subcomando leve em processos novos, mede o tempo de parede e
+usa `python -X importtime` para conferir quais módulos foram importados.
+Sai com código 1 se um módulo pesado aparecer onde não deveria ou se a
+mediana passar do limite, para pegar regressões de tempo de import.
+
+Uso (a partir de expo/):
+    python benchmarks/inicializacao.py [--repeticoes 10] [--limite-ms 150]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências que cada subcomando NÃO pode importar
+MODULOS_PESADOS = ('numpy', 'pulp', 'scipy', 'pandas', 'plotly', 'matplotlib', 'seaborn')
+
+COMANDOS = {
+    'minimum': ['minimum'],
+    'help': ['--help'],
+}
+
+PROIBIDOS = {
+    'minimum': MODULOS_PESADOS,
+    'help': MODULOS_PESADOS,
+}
+
+
+def medir(argumentos, repeticoes):
+    """Mediana do tempo de parede (ms) de `python main.py <argumentos>`"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py', *argumentos], cwd=DIRETORIO_PROJETO,
+                       check=True, stdout=subprocess.DEVNULL)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def modulos_importados(argumentos):
+    """Módulos de topo importados pelo comando, segundo -X importtime"""
+    processo = subprocess.run([sys.executable, '-X', 'importtime', 'main.py', *argumentos],
+                              cwd=DIRETORIO_PROJETO, check=True, capture_output=True, text=True)
+    modulos = set()
+    for linha in processo.stderr.splitlines():
+        if linha.startswith('import time:') and '|' in linha:
+            nome = linha.rsplit('|', 1)[1].strip()
+            modulos.add(nome.split('.')[0])
+    return modulos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeticoes', type=int, default=10)
+    parser.add_argument('--limite-ms', type=float, default=150.0,
+                        help="mediana máxima aceita para cada comando leve")
+    args = parser.parse_args(argv)
+
+    referencia = medir_interpretador(args.repeticoes)
+    print(f"Interpretador vazio: {referencia:.0f} ms")
+
+    falhas = []
+    for nome, argumentos in COMANDOS.items():
+        mediana = medir(argumentos, args.repeticoes)
+        pesados = sorted(modulos_importados(argumentos) & set(PROIBIDOS[nome]))
+        print(f"{nome:>10}: {mediana:.0f} ms (+{mediana - referencia:.0f} ms sobre o interpretador)"
+              + (f"  ⚠️ importou {', '.join(pesados)}" if pesados else ""))
+        if pesados:
+            falhas.append(f"{nome} importou {', '.join(pesados)}")
+        if mediana - referencia > args.limite_ms:
+            falhas.append(f"{nome} levou {mediana - referencia:.0f} ms além do interpretador "
+                          f"(limite {args.limite_ms:.0f} ms)")
+
+    for falha in falhas:
+        print(f"❌ {falha}")
+    return 1 if falhas else 0
+
+
+def medir_interpretador(repeticoes):
+    """Mediana (ms) de um interpretador que não faz nada, como referência"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
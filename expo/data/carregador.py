@@ -0,0 +1,179 @@
+"""
+Carga em massa de conjuntos de parâmetros (CSV, JSON/JSON lines, Parquet)
+Cada bloco vira um array estruturado do NumPy, com uma linha por conjunto
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from data.parametros import PARAMETROS
+
+# Campos numéricos de PARAMETROS e seus tipos no array estruturado
+TIPOS_PARAMETROS = {
+    'taxa_producao': 'f8',
+    'horas_maximas': 'f8',
+    'horas_efetivas': 'f8',
+    'operarios_maximos': 'i8',
+    'meta_diaria': 'f8',
+    'custo_hora': 'f8',
+}
+
+# Colunas acrescentadas pelo carregador (não são identificadores)
+COLUNAS_CONTROLE = ('indice', 'valido')
+
+
+def ler_blocos(caminho, tamanho_bloco=10_000, padroes=None):
+    """Lê o arquivo em blocos de até tamanho_bloco linhas (arrays estruturados)
+
+    O formato vem da extensão: .csv, .json (lista de objetos), .jsonl/.ndjson
+    ou .parquet (requer pyarrow). Colunas de PARAMETROS ausentes usam os
+    `padroes` (PARAMETROS); as demais colunas viram identificadores de texto.
+    Cada bloco tem também 'indice', a posição da linha no arquivo, e 'valido':
+    False quando algum campo numérico não pôde ser lido ou, nos campos
+    inteiros, não é um inteiro não negativo (o campo fica com o padrão e a
+    linha segue no bloco). Só um bloco fica na memória por vez
+    (JSON comum é a exceção: é lido inteiro).
+    """
+    padroes = PARAMETROS if padroes is None else padroes
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.parquet':
+        yield from _blocos_parquet(caminho, tamanho_bloco, padroes)
+        return
+    if extensao == '.csv':
+        cabecalho, registros = _registros_csv(caminho)
+    elif extensao in ('.jsonl', '.ndjson'):
+        cabecalho, registros = _registros_jsonl(caminho)
+    elif extensao == '.json':
+        cabecalho, registros = _registros_json(caminho)
+    else:
+        raise ValueError(f"Formato não suportado: '{extensao}' (use .csv, .json, .jsonl ou .parquet)")
+
+    indice = 0
+    while True:
+        linhas = [linha for _, linha in zip(range(tamanho_bloco), registros)]
+        if not linhas:
+            return
+        yield _estruturar({coluna: [linha.get(coluna) for linha in linhas] for coluna in cabecalho},
+                          indice, padroes)
+        indice += len(linhas)
+
+
+def carregar_parametros(caminho, padroes=None):
+    """Lê o arquivo inteiro em um único array estruturado"""
+    blocos = list(ler_blocos(caminho, padroes=padroes))
+    if not blocos:
+        return _estruturar({}, 0, PARAMETROS if padroes is None else padroes)
+    return np.concatenate(blocos)
+
+
+def parametros_da_linha(linha, padroes=None):
+    """Dicionário no formato de PARAMETROS para uma linha do array estruturado
+
+    Os campos não numéricos (ex.: opcoes_horas) vêm dos `padroes` (PARAMETROS).
+    """
+    padroes = PARAMETROS if padroes is None else padroes
+    return {**padroes, **{campo: linha[campo].item() for campo in TIPOS_PARAMETROS}}
+
+
+def identificadores(bloco):
+    """Nomes das colunas de identificação de um bloco"""
+    return [campo for campo in bloco.dtype.names if campo not in COLUNAS_CONTROLE and campo not in TIPOS_PARAMETROS]
+
+
+def _estruturar(colunas, indice_inicial, padroes):
+    """{coluna: valores} -> array estruturado com tipos fixos"""
+    n = len(next(iter(colunas.values()))) if colunas else 0
+    extras = [coluna for coluna in colunas if coluna not in TIPOS_PARAMETROS and coluna not in COLUNAS_CONTROLE]
+    # Identificadores (planta, família de produto...) viram texto do tamanho
+    # do maior valor do bloco, para não serem cortados
+    textos = {coluna: ['' if valor is None else str(valor) for valor in colunas[coluna]] for coluna in extras}
+    tipo = np.dtype([('indice', 'i8'), ('valido', '?')] + list(TIPOS_PARAMETROS.items()) +
+                    [(coluna, f'U{max(map(len, textos[coluna]), default=0) or 1}') for coluna in extras])
+    bloco = np.empty(n, dtype=tipo)
+    bloco['indice'] = np.arange(indice_inicial, indice_inicial + n)
+    bloco['valido'] = True
+    for campo, tipo_campo in TIPOS_PARAMETROS.items():
+        if campo not in colunas:
+            bloco[campo] = padroes[campo]
+            continue
+        valores = _numeros(colunas[campo], padroes[campo])
+        invalidos = ~np.isfinite(valores)
+        if np.dtype(tipo_campo).kind == 'i':
+            # Inteiros: frações ou negativos seriam truncados em silêncio
+            with np.errstate(invalid='ignore'):
+                invalidos |= (valores != np.round(valores)) | (valores < 0)
+        if invalidos.any():
+            bloco['valido'] &= ~invalidos
+            valores[invalidos] = padroes[campo]
+        bloco[campo] = valores.astype(tipo_campo, casting='unsafe')
+    for coluna in extras:
+        bloco[coluna] = textos[coluna]
+    return bloco
+
+
+def _numeros(valores, padrao):
+    """Valores de uma coluna numérica como float; NaN onde o valor não é número"""
+    valores = [padrao if valor is None or valor == '' else valor for valor in valores]
+    try:
+        return np.asarray(valores, dtype=float)
+    except (TypeError, ValueError):
+        pass
+    numeros = np.empty(len(valores))
+    for i, valor in enumerate(valores):
+        try:
+            numeros[i] = float(valor)
+        except (TypeError, ValueError):
+            numeros[i] = np.nan
+    return numeros
+
+
+def _registros_csv(caminho):
+    arquivo = open(caminho, newline='', encoding='utf-8')
+    leitor = csv.DictReader(arquivo)
+    cabecalho = [campo.strip() for campo in leitor.fieldnames or []]
+    leitor.fieldnames = cabecalho
+
+    def registros():
+        with arquivo:
+            yield from leitor
+    return cabecalho, registros()
+
+
+def _registros_jsonl(caminho):
+    # As colunas vêm da primeira linha; chaves novas depois dela são ignoradas
+    arquivo = open(caminho, encoding='utf-8')
+    linhas = (json.loads(linha) for linha in arquivo if linha.strip())
+    primeira = next(linhas, None)
+    if primeira is None:
+        arquivo.close()
+        return [], iter(())
+
+    def registros():
+        with arquivo:
+            yield primeira
+            yield from linhas
+    return list(primeira), registros()
+
+
+def _registros_json(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+    if isinstance(dados, dict):
+        dados = [dados]
+    cabecalho = list(dict.fromkeys(chave for linha in dados for chave in linha))
+    return cabecalho, iter(dados)
+
+
+def _blocos_parquet(caminho, tamanho_bloco, padroes):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Leitura de Parquet requer o pacote pyarrow (pip install pyarrow)") from None
+
+    indice = 0
+    for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco):
+        yield _estruturar(lote.to_pydict(), indice, padroes)
+        indice += lote.num_rows
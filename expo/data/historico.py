@@ -0,0 +1,240 @@
+"""
+Histórico de execuções: metadados em SQLite e conjuntos colunares em .npy
+Consultas por hash dos parâmetros e por data; fatias lidas sob demanda (mmap)
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from models.cache import CacheSolucoes, _valor_nativo
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    comando TEXT NOT NULL,
+    chave_parametros TEXT NOT NULL,
+    criado_em REAL NOT NULL,
+    parametros TEXT NOT NULL,
+    resultado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_chave ON execucoes (chave_parametros, criado_em);
+CREATE INDEX IF NOT EXISTS idx_execucoes_data ON execucoes (criado_em);
+CREATE TABLE IF NOT EXISTS segmentos (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes (id),
+    conjunto TEXT NOT NULL,
+    segmento INTEGER NOT NULL,
+    inicio INTEGER NOT NULL,
+    linhas INTEGER NOT NULL,
+    colunas TEXT NOT NULL,
+    PRIMARY KEY (execucao_id, conjunto, segmento)
+);
+"""
+
+
+class HistoricoExecucoes:
+    """Guarda cada execução (comando, parâmetros, resultado) e seus conjuntos de dados.
+
+    Metadados ficam em `historico.sqlite`, indexados por hash dos parâmetros
+    (o mesmo hash canônico do cache de soluções) e por data. Conjuntos
+    grandes (cenários, grades de sensibilidade) ficam em formato colunar,
+    um .npy por coluna e por segmento:
+        colunas/<execucao>/<conjunto>/<coluna>.<segmento>.npy
+    Acrescentar um bloco cria um segmento novo e nunca reescreve os
+    anteriores; a leitura abre os segmentos com mmap e copia só a fatia pedida.
+    """
+
+    def __init__(self, diretorio='historico'):
+        self.diretorio = diretorio
+        os.makedirs(os.path.join(diretorio, 'colunas'), exist_ok=True)
+        self._conexao = sqlite3.connect(os.path.join(diretorio, 'historico.sqlite'))
+        self._conexao.row_factory = sqlite3.Row
+        self._conexao.executescript(ESQUEMA)
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    @staticmethod
+    def chave_parametros(parametros):
+        return CacheSolucoes.chave('parametros', parametros)
+
+    def registrar(self, comando, parametros, resultado=None, conjuntos=None):
+        """Cria uma execução e grava seus conjuntos; retorna o id
+
+        conjuntos: {nome: dados}, com dados em formato colunar ({coluna: array}),
+        lista de dicionários (ex.: simular_cenarios) ou um iterável de blocos
+        colunares (ex.: simular_grade com tamanho_bloco).
+        """
+        with self._conexao:
+            cursor = self._conexao.execute(
+                "INSERT INTO execucoes (comando, chave_parametros, criado_em, parametros, resultado) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (comando, self.chave_parametros(parametros), time.time(),
+                 json.dumps(parametros, default=_valor_nativo),
+                 None if resultado is None else json.dumps(resultado, default=_valor_nativo)))
+        execucao = cursor.lastrowid
+        for nome, dados in (conjuntos or {}).items():
+            for bloco in _blocos(dados):
+                self.acrescentar(execucao, nome, bloco)
+        return execucao
+
+    def acrescentar(self, execucao, conjunto, bloco):
+        """Acrescenta um bloco colunar ao conjunto como um segmento novo"""
+        bloco = _colunar(bloco)
+        if not bloco:
+            return None
+        linhas = {len(valores) for valores in bloco.values()}
+        if len(linhas) != 1:
+            raise ValueError(f"Colunas com tamanhos diferentes em '{conjunto}': {sorted(linhas)}")
+        linhas = linhas.pop()
+
+        anterior = self._conexao.execute(
+            "SELECT segmento, inicio, linhas, colunas FROM segmentos WHERE execucao_id = ? AND conjunto = ? "
+            "ORDER BY segmento DESC LIMIT 1", (execucao, conjunto)).fetchone()
+        if anterior is not None and set(json.loads(anterior['colunas'])) != set(bloco):
+            raise ValueError(f"Colunas do bloco diferem das já gravadas em '{conjunto}'")
+        segmento = 0 if anterior is None else anterior['segmento'] + 1
+        inicio = 0 if anterior is None else anterior['inicio'] + anterior['linhas']
+
+        pasta = self._pasta(execucao, conjunto)
+        os.makedirs(pasta, exist_ok=True)
+        for coluna, valores in bloco.items():
+            caminho = os.path.join(pasta, f'{coluna}.{segmento}.npy')
+            temporario = f'{caminho}.{os.getpid()}.tmp'
+            with open(temporario, 'wb') as arquivo:
+                np.save(arquivo, valores, allow_pickle=False)
+            os.replace(temporario, caminho)
+
+        # O segmento só passa a existir para as leituras depois dos arquivos gravados
+        with self._conexao:
+            self._conexao.execute(
+                "INSERT INTO segmentos (execucao_id, conjunto, segmento, inicio, linhas, colunas) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (execucao, conjunto, segmento, inicio, linhas, json.dumps(list(bloco))))
+        return segmento
+
+    def execucoes(self, parametros=None, comando=None, desde=None, ate=None, limite=None):
+        """Execuções mais recentes primeiro, sem o resultado nem os conjuntos
+
+        parametros filtra pelo hash (usa o índice); desde/ate aceitam
+        timestamp ou data ISO ('2026-10-18').
+        """
+        condicoes, valores = [], []
+        if parametros is not None:
+            condicoes.append("chave_parametros = ?")
+            valores.append(self.chave_parametros(parametros))
+        if comando is not None:
+            condicoes.append("comando = ?")
+            valores.append(comando)
+        if desde is not None:
+            condicoes.append("criado_em >= ?")
+            valores.append(_timestamp(desde))
+        if ate is not None:
+            condicoes.append("criado_em < ?")
+            valores.append(_timestamp(ate))
+        consulta = "SELECT id, comando, chave_parametros, criado_em FROM execucoes"
+        if condicoes:
+            consulta += " WHERE " + " AND ".join(condicoes)
+        consulta += " ORDER BY criado_em DESC, id DESC"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            valores.append(int(limite))
+        return [dict(linha) for linha in self._conexao.execute(consulta, valores)]
+
+    def obter(self, execucao):
+        """Metadados, parâmetros, resultado e tamanho de cada conjunto da execução"""
+        linha = self._conexao.execute("SELECT * FROM execucoes WHERE id = ?", (execucao,)).fetchone()
+        if linha is None:
+            raise KeyError(f"Execução {execucao} não encontrada")
+        dados = dict(linha)
+        dados['parametros'] = json.loads(dados['parametros'])
+        dados['resultado'] = None if dados['resultado'] is None else json.loads(dados['resultado'])
+        dados['conjuntos'] = self.conjuntos(execucao)
+        return dados
+
+    def conjuntos(self, execucao):
+        """{conjunto: {'linhas', 'colunas'}} sem ler nenhum dado"""
+        conjuntos = {}
+        for linha in self._conexao.execute(
+                "SELECT conjunto, SUM(linhas) AS linhas, MIN(colunas) AS colunas FROM segmentos "
+                "WHERE execucao_id = ? GROUP BY conjunto", (execucao,)):
+            conjuntos[linha['conjunto']] = {'linhas': linha['linhas'], 'colunas': json.loads(linha['colunas'])}
+        return conjuntos
+
+    def carregar(self, execucao, conjunto, colunas=None, inicio=0, fim=None, passo=1):
+        """Lê as linhas [inicio:fim:passo] das colunas pedidas, em formato colunar
+
+        Só os segmentos que cruzam a fatia são abertos (mmap), e só as linhas
+        selecionadas são copiadas para a memória.
+        """
+        segmentos = self._conexao.execute(
+            "SELECT segmento, inicio, linhas, colunas FROM segmentos WHERE execucao_id = ? AND conjunto = ? "
+            "ORDER BY segmento", (execucao, conjunto)).fetchall()
+        if not segmentos:
+            raise KeyError(f"Conjunto '{conjunto}' não encontrado na execução {execucao}")
+        colunas = json.loads(segmentos[0]['colunas']) if colunas is None else list(colunas)
+        total = segmentos[-1]['inicio'] + segmentos[-1]['linhas']
+        inicio, fim, passo = slice(inicio, fim, passo).indices(total)
+        if passo <= 0:
+            raise ValueError("passo deve ser positivo")
+
+        pasta = self._pasta(execucao, conjunto)
+        partes = {coluna: [] for coluna in colunas}
+        for segmento in segmentos:
+            comeco, tamanho = segmento['inicio'], segmento['linhas']
+            if comeco + tamanho <= inicio or comeco >= fim:
+                continue
+            # Primeira linha da fatia dentro do segmento, mantendo o passo global
+            primeira = max(inicio, comeco)
+            primeira += (inicio - primeira) % passo
+            if primeira >= min(fim, comeco + tamanho):
+                continue
+            fatia = slice(primeira - comeco, min(fim, comeco + tamanho) - comeco, passo)
+            for coluna in colunas:
+                valores = np.load(os.path.join(pasta, f"{coluna}.{segmento['segmento']}.npy"),
+                                  mmap_mode='r', allow_pickle=False)
+                partes[coluna].append(np.array(valores[fatia]))
+
+        return {coluna: np.concatenate(blocos) if blocos else np.empty(0) for coluna, blocos in partes.items()}
+
+    def _pasta(self, execucao, conjunto):
+        return os.path.join(self.diretorio, 'colunas', str(int(execucao)), conjunto)
+
+
+def _blocos(dados):
+    """Normaliza os formatos aceitos em registrar() para uma sequência de blocos"""
+    if isinstance(dados, dict):
+        return [dados]
+    if isinstance(dados, list) and all(isinstance(linha, dict) and not any(np.ndim(v) for v in linha.values())
+                                       for linha in dados[:1]):
+        return [dados]  # lista de registros
+    return dados
+
+
+def _colunar(bloco):
+    """Lista de dicionários ou dicionário de sequências -> {coluna: array sem objetos}"""
+    if isinstance(bloco, list):
+        nomes = list(bloco[0]) if bloco else []
+        bloco = {nome: [linha[nome] for linha in bloco] for nome in nomes}
+    colunar = {}
+    for coluna, valores in bloco.items():
+        valores = np.asarray(valores)
+        if valores.dtype == object:
+            raise TypeError(f"Coluna '{coluna}' não tem tipo homogêneo para o formato colunar")
+        colunar[coluna] = valores
+    return colunar
+
+
+def _timestamp(valor):
+    if isinstance(valor, str):
+        return time.mktime(time.strptime(valor[:10], '%Y-%m-%d'))
+    return float(valor)
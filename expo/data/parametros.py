@@ -11,8 +11,46 @@ PARAMETROS = {
     'custo_hora': 18.00        # R$/hora por operário
 }
 
-def mostrar_parametros():
+# Distribuições para a simulação estocástica (Monte Carlo) de turnos.
+# Cada entrada é (distribuição, *argumentos); veja models/simulacao.py
+PARAMETROS_ESTOCASTICOS = {
+    'produtividade': ('normal', 1.0, 0.10),   # fator sobre taxa_producao, por operário
+    'absenteismo': ('bernoulli', 0.05),       # probabilidade de falta de cada operário
+    'parada': ('exponencial', 0.5)            # horas de máquina parada no turno
+}
+
+# Planejamento de vários dias (models/horizonte.py)
+PARAMETROS_HORIZONTE = {
+    'horas_extra_maximas': 2.0,     # horas extras por operário por dia
+    'horas_extra_semanais': 40.0,   # horas extras somadas de todos os operários por semana
+    'fator_hora_extra': 1.5,        # custo da hora extra sobre custo_hora
+    'custo_estoque': 0.05,          # R$ por unidade guardada de um dia para o outro
+    'capacidade_estoque': 5000,     # unidades
+    'penalidade_falta': 5.0,        # R$ por unidade de demanda não atendida
+}
+
+# Linha de engrenagens para a simulação de eventos discretos (models/eventos.py).
+# Tempos em horas; distribuições no mesmo formato de PARAMETROS_ESTOCASTICOS.
+# Soma dos ciclos nominais = 36 s por engrenagem, ou seja, 100 un./hora/operário.
+LINHA_ENGRENAGENS = {
+    'estacoes': [
+        {'nome': 'Torneamento', 'maquinas': 2, 'ciclo': ('lognormal', 10 / 3600, 2 / 3600),
+         'lote': 1000, 'setup': ('triangular', 0.10, 0.15, 0.30),
+         'mtbf': ('exponencial', 10.0), 'mttr': ('lognormal', 0.30, 0.15)},
+        {'nome': 'Fresagem dos dentes', 'maquinas': 3, 'ciclo': ('lognormal', 14 / 3600, 3 / 3600),
+         'lote': 1000, 'setup': ('triangular', 0.15, 0.25, 0.40),
+         'mtbf': ('exponencial', 8.0), 'mttr': ('lognormal', 0.50, 0.25)},
+        {'nome': 'Rebarbação', 'maquinas': 2, 'ciclo': ('lognormal', 6 / 3600, 1 / 3600),
+         'mtbf': ('exponencial', 20.0), 'mttr': ('lognormal', 0.15, 0.05)},
+        {'nome': 'Inspeção', 'maquinas': 2, 'ciclo': ('lognormal', 6 / 3600, 2 / 3600)},
+    ],
+    'capacidade_buffer': 40,    # peças entre duas estações
+    'wip_inicial': 20,          # peças em cada buffer no início do turno
+    'pausas': [(2.0, 1 / 6), (4.0, 2 / 3), (6.0, 1 / 6)],  # (início, duração) em horas
+}
+
+def mostrar_parametros(parametros=None):
     """Exibe os parâmetros atuais do problema"""
     print("📊 PARÂMETROS DO PROBLEMA:")
-    for key, value in PARAMETROS.items():
+    for key, value in (PARAMETROS if parametros is None else parametros).items():
         print(f"  {key}: {value}")
\ No newline at end of file
@@ -1,69 +1,582 @@
 """
 Projeto de Otimização de Produção
 Sistema de decisão para maximizar produção em fábrica de engrenagens
+
+Uso:
+    python main.py                      # fluxo completo (otimização, cenários e dashboard)
+    python main.py optimize [--metodo variaveis|robusto] [--json]
+    python main.py simulate [--monte-carlo N] [--json]
+    python main.py minimum [--json]
+    python main.py dashboard [--exportar relatorio.html]
+    python main.py report --saida relatorio.html [--json-figuras figuras.json] [--pareto N]
+    python main.py serve [--porta 8765 | --unix /tmp/otimizacao.sock]
+    python main.py stream [contagens.csv | -] [--seguir] [--json]
+    python main.py calibrate [--turnos 66] [--semente 0] [--json]
+    python main.py plan [--dias 28 | --demanda demanda.csv] [--janela 14] [--fixar 7] [--json]
+    python main.py batch plantas.csv --saida resultados.csv [--metodo variaveis] [--processos N]
+    python main.py history [--comando optimize] [--mesmos-parametros] [--mostrar ID]
+
+Opções globais: --param chave=valor (repetível) sobrescreve PARAMETROS;
+--metricas-jsonl/--metricas-prom exportam o tempo de cada etapa e --perfil DIR
+grava um cProfile por etapa (veja models/instrumentacao.py); --historico DIR
+grava cada execução de optimize/simulate/calibrate (veja data/historico.py).
+As dependências pesadas (NumPy, PuLP, SciPy, pandas, Plotly) só são importadas
+pelo subcomando que precisa delas; `minimum` não importa nenhuma.
 """
 
+import argparse
+import json
+import os
+import sys
+
 from data.parametros import PARAMETROS, mostrar_parametros
-from models.otimizacao import OtimizadorProducao
-from models.simulacao import SimuladorCenarios
-from visualization.dashboard import criar_dashboard
 
-def main():
+def main(argv=None):
+    args = _criar_parser().parse_args(argv)
+    parametros = _aplicar_sobrescritas(PARAMETROS, args.param)
+
+    if not (args.metricas_jsonl or args.metricas_prom or args.perfil):
+        return _executar(args, parametros)
+
+    from models import instrumentacao
+
+    instrumentacao.ativar(args.perfil)
+    try:
+        return _executar(args, parametros)
+    finally:
+        if args.metricas_jsonl:
+            instrumentacao.exportar_jsonl(args.metricas_jsonl)
+        if args.metricas_prom:
+            instrumentacao.exportar_prometheus(args.metricas_prom)
+
+def _executar(args, parametros):
+    if args.comando is None:
+        return executar_completo(parametros)
+    return args.funcao(args, parametros)
+
+def executar_completo(parametros=PARAMETROS):
+    """Fluxo completo original: otimização, cenários e dashboard no navegador"""
+    from models.instrumentacao import etapa
+    from models.otimizacao import OtimizadorProducao
+    from models.simulacao import SimuladorCenarios
+    from visualization.dashboard import criar_dashboard
+
     print("🏭 SISTEMA DE OTIMIZAÇÃO DE PRODUÇÃO")
     print("=" * 50)
-    
+
     # Mostrar parâmetros
-    mostrar_parametros()
-    
+    mostrar_parametros(parametros)
+
     # Otimização principal
     print("\n🔧 OTIMIZANDO PRODUÇÃO...")
-    otimizador = OtimizadorProducao(PARAMETROS)
-    resultado = otimizador.otimizar_producao()
-    
+    otimizador = OtimizadorProducao(parametros)
+    with etapa('otimizacao'):
+        resultado = otimizador.otimizar_producao()
+
     # Mostrar resultados
-    print("\n📈 RESULTADO DA OTIMIZAÇÃO:")
-    print(f"Operários ideais: {resultado['operarios_ideais']}")
-    print(f"Horas ideais: {resultado['horas_ideais']:.2f}")
-    print(f"Produção máxima: {resultado['producao_maxima']:.0f} unidades")
-    print(f"Meta atingida: {'✅ SIM' if resultado['meta_atingida'] else '❌ NÃO'}")
-    print(f"Status: {resultado['status']}")
-    
+    _mostrar_resultado(resultado)
+
     # Calcular custo
     custo = otimizador.calcular_custo(resultado['operarios_ideais'], resultado['horas_ideais'])
     print(f"Custo total: R$ {custo:.2f}")
-    
+
     # Método alternativo
     print("\n🔄 TESTANDO MÉTODO ALTERNATIVO...")
-    resultado_alternativo = otimizador.otimizar_com_horas_variaveis()
-    
+    with etapa('otimizacao_horas_variaveis'):
+        resultado_alternativo = otimizador.otimizar_com_horas_variaveis()
+
     if resultado_alternativo:
         print(f"Melhor cenário alternativo: {resultado_alternativo['producao_maxima']:.0f} unidades")
-    
+
     # Cálculo da meta mínima
     meta_minima = otimizador.calcular_meta_minima()
     print(f"Operários mínimos para meta: {meta_minima['operarios_minimos']}")
-    
+
     # Simular cenários
     print("\n🔄 SIMULANDO CENÁRIOS...")
-    simulador = SimuladorCenarios(PARAMETROS)
-    cenarios = simulador.simular_cenarios()
-    
+    simulador = SimuladorCenarios(parametros)
+    with etapa('simulacao'):
+        cenarios = simulador.simular_cenarios()
+
     print("\n📊 COMPARAÇÃO DE CENÁRIOS:")
     for cenario in cenarios:
         print(f"  {cenario['nome']}: {cenario['producao']:.0f} unidades")
-    
+
     # DASHBOARD INTERATIVO UNIFICADO
     print("\n📱 CRIANDO DASHBOARD INTERATIVO UNIFICADO...")
     try:
-        criar_dashboard(resultado, cenarios, PARAMETROS)
+        with etapa('dashboard'):
+            criar_dashboard(resultado, cenarios, parametros)
         print("✅ Dashboard interativo criado com sucesso!")
     except Exception as e:
         print(f"❌ Erro no dashboard: {e}")
-    
+
     print("\n" + "=" * 50)
     print("✅ PROJETO CONCLUÍDO COM SUCESSO!")
     print("🌐 Dashboard interativo aberto no navegador")
     print("=" * 50)
+    return 0
+
+def comando_optimize(args, parametros):
+    """Subcomando optimize: resolve e mostra o resultado"""
+    from models.instrumentacao import etapa
+    from models.otimizacao import OtimizadorProducao
+
+    from models.solvers import DivergenciaBackends
+
+    _conferir_backend(args)
+    otimizador = OtimizadorProducao(parametros, backend=args.backend, verificar=args.verificar)
+    try:
+        with etapa('otimizacao', metodo=args.metodo):
+            if args.metodo == 'variaveis':
+                resultado = otimizador.otimizar_com_horas_variaveis()
+            elif args.metodo == 'robusto':
+                resultado = otimizador.otimizar_producao_robusta(args.probabilidade, args.cenarios,
+                                                                 opcoes_horas=otimizador.opcoes_horas,
+                                                                 semente=args.semente)
+            else:
+                resultado = otimizador.otimizar_producao()
+    except DivergenciaBackends as erro:
+        raise SystemExit(f"❌ Verificação com --verificar {args.verificar} falhou: {erro}")
+
+    if resultado is None:
+        print("❌ Nenhuma opção de horas atinge a meta", file=sys.stderr)
+        return 1
+
+    resultado['custo_total'] = otimizador.calcular_custo(resultado['operarios_ideais'],
+                                                         resultado['horas_ideais'])
+    _registrar(args, 'optimize', parametros, resultado)
+    if args.json:
+        _imprimir_json(resultado)
+    else:
+        _mostrar_resultado(resultado)
+        print(f"Custo total: R$ {resultado['custo_total']:.2f}")
+        if 'probabilidade_meta' in resultado:
+            print(f"P(meta) nos cenários: {resultado['probabilidade_meta']:.1%} "
+                  f"(alvo {resultado['probabilidade_alvo']:.0%}, {resultado['n_cenarios']} cenários)")
+    return 0 if resultado['status'] == 'Optimal' else 1
+
+def comando_simulate(args, parametros):
+    """Subcomando simulate: cenários determinísticos ou Monte Carlo"""
+    from models.instrumentacao import etapa
+    from models.simulacao import SimuladorCenarios
+
+    simulador = SimuladorCenarios(parametros)
+    if args.monte_carlo:
+        with etapa('simulacao', tipo='monte_carlo'):
+            resumo = simulador.simular_monte_carlo(args.monte_carlo, semente=args.semente,
+                                                   n_processos=args.processos)
+        _registrar(args, 'simulate', parametros, resumo)
+        if args.json:
+            _imprimir_json(resumo)
+        else:
+            print(f"P(meta): {resumo['prob_meta']:.1%} em {resumo['n_amostras']} turnos")
+            print(f"Produção média: {resumo['producao_media']:.0f} ± {resumo['producao_desvio']:.0f}")
+            for q, valor in resumo['percentis'].items():
+                print(f"  P{q}: {valor:.0f} unidades")
+            print(f"Custo esperado: R$ {resumo['custo_esperado']:.2f}")
+        return 0
+
+    with etapa('simulacao', tipo='cenarios'):
+        cenarios = simulador.simular_cenarios()
+    conjuntos = {'cenarios': cenarios}
+    if args.grade:
+        if not args.historico:
+            raise SystemExit("--grade grava a grade no histórico: informe --historico DIR")
+        import numpy as np
+
+        # Blocos gravados à medida que são avaliados; a grade nunca fica inteira na memória
+        conjuntos['grade'] = simulador.simular_grade(operarios=np.arange(1, args.grade + 1),
+                                                     horas=np.linspace(4, 12, args.grade),
+                                                     tamanho_bloco=1_000_000)
+    with etapa('historico'):
+        _registrar(args, 'simulate', parametros, conjuntos=conjuntos)
+    if args.json:
+        _imprimir_json(cenarios)
+    else:
+        print("📊 COMPARAÇÃO DE CENÁRIOS:")
+        for cenario in cenarios:
+            print(f"  {cenario['nome']}: {cenario['producao']:.0f} unidades")
+    return 0
+
+def comando_minimum(args, parametros):
+    """Subcomando minimum: forma fechada, sem dependências pesadas"""
+    from models.analitico import calcular_meta_minima
+
+    meta_minima = calcular_meta_minima(parametros)
+    if args.json:
+        _imprimir_json(meta_minima)
+    else:
+        print(meta_minima['operarios_minimos'])
+    return 0
+
+def comando_dashboard(args, parametros):
+    """Subcomando dashboard: abre no navegador ou exporta o HTML"""
+    resultado, cenarios = _resultado_e_cenarios(parametros)
+    from models.instrumentacao import etapa
+    from visualization.dashboard import criar_dashboard
+
+    with etapa('dashboard'):
+        criar_dashboard(resultado, cenarios, parametros, exportar=args.exportar)
+    return 0
+
+def comando_report(args, parametros):
+    """Subcomando report: relatório HTML único, sem abrir navegador"""
+    if args.execucao is not None:
+        return _relatorio_historico(args)
+    resultado, cenarios = _resultado_e_cenarios(parametros)
+    from models.instrumentacao import etapa
+    from visualization.dashboard import criar_dashboard
+
+    fronteira = None
+    if args.pareto:
+        from models.otimizacao import OtimizadorProducao
+
+        with etapa('fronteira_pareto'):
+            fronteira = OtimizadorProducao(parametros).fronteira_pareto(args.pareto)
+    with etapa('dashboard'):
+        criar_dashboard(resultado, cenarios, parametros, exportar=args.saida,
+                        exportar_json=args.json_figuras, fronteira=fronteira)
+    return 0
+
+def _relatorio_historico(args):
+    """Relatório de uma execução gravada: cenários e grade lidos do histórico"""
+    if not args.historico:
+        raise SystemExit("--execucao exige --historico DIR")
+    from data.historico import HistoricoExecucoes
+    from models.instrumentacao import etapa
+    from visualization.dashboard import criar_dashboard
+
+    with HistoricoExecucoes(args.historico) as historico:
+        execucao = historico.obter(args.execucao)
+        parametros = execucao['parametros']
+        resultado, cenarios = _resultado_e_cenarios(parametros)
+        if 'cenarios' in execucao['conjuntos']:
+            cenarios = historico.carregar(args.execucao, 'cenarios')
+        with etapa('dashboard'):
+            criar_dashboard(resultado, cenarios, parametros, exportar=args.saida,
+                            exportar_json=args.json_figuras, historico=historico,
+                            execucao=args.execucao)
+    return 0
+
+def comando_plan(args, parametros):
+    """Subcomando plan: plano de vários dias por horizonte rolante"""
+    from models.horizonte import demanda_exemplo
+    from models.instrumentacao import etapa
+    from models.otimizacao import OtimizadorProducao
+
+    if args.demanda:
+        with open(args.demanda, encoding='utf-8') as arquivo:
+            texto = arquivo.read()
+        demanda = json.loads(texto) if texto.lstrip().startswith('[') else [
+            float(linha.split(',')[-1]) for linha in texto.splitlines()
+            if linha.strip() and not linha.startswith('#') and linha.split(',')[-1].strip()[:1].isdigit()]
+    else:
+        demanda = demanda_exemplo(parametros, args.dias, semente=args.semente)
+
+    with etapa('otimizacao', metodo=f'horizonte_{args.modo}'):
+        plano = OtimizadorProducao(parametros, backend=args.backend).planejar_horizonte(
+            demanda, modo=args.modo, janela=args.janela, fixar=args.fixar,
+            estoque_inicial=args.estoque_inicial, n_processos=args.processos)
+    dias = plano.pop('plano')
+    _registrar(args, 'plan', parametros, plano, conjuntos={'plano': dias})
+
+    if args.json:
+        _imprimir_json({**plano, 'plano': dias})
+        return 0 if plano['status'] == 'Optimal' else 1
+    print(f"📅 PLANO DE {len(dias['dia'])} DIAS ({plano['metodo']}, {plano['janelas']} janelas, "
+          f"{plano['resolucoes']} resoluções em {plano['rodadas']} rodadas, {plano['tempo']:.2f}s):")
+    for i in range(len(dias['dia'])):
+        falta = f" | falta {dias['falta'][i]:.0f}" if dias['falta'][i] > 0.5 else ''
+        print(f"  Dia {int(dias['dia'][i]) + 1:3d}: demanda {dias['demanda'][i]:5.0f} | "
+              f"{dias['operarios'][i]:.0f} operários + {dias['horas_extra'][i]:4.1f}h extra | "
+              f"produção {dias['producao'][i]:5.0f} | estoque {dias['estoque'][i]:5.0f}{falta}")
+    print(f"Custo total: R$ {plano['custo_total']:.2f} (mão de obra R$ {plano['custo_mao_obra']:.2f}, "
+          f"hora extra R$ {plano['custo_hora_extra']:.2f}, estoque R$ {plano['custo_estoque']:.2f})")
+    print(f"Falta total: {plano['falta_total']:.0f} de {plano['demanda_total']:.0f} unidades")
+    return 0 if plano['status'] == 'Optimal' else 1
+
+def comando_batch(args, parametros):
+    """Subcomando batch: otimiza cada conjunto de parâmetros de um arquivo"""
+    from models.lote import otimizar_arquivo
+
+    def progresso(resumo):
+        print(f"⏳ {resumo['conjuntos']} conjuntos ({resumo['blocos']} blocos) em {resumo['tempo']:.1f}s",
+              file=sys.stderr, flush=True)
+
+    _conferir_backend(args)
+    try:
+        resumo = otimizar_arquivo(args.entrada, args.saida, metodo=args.metodo, n_processos=args.processos,
+                                  tamanho_bloco=args.bloco, backend=args.backend, padroes=parametros,
+                                  progresso=None if args.json else progresso)
+    except (OSError, ValueError, ImportError) as erro:
+        raise SystemExit(f"❌ {erro}")
+    if args.json:
+        _imprimir_json(resumo)
+    else:
+        invalidos = f", {resumo['invalidos']} inválidos" if resumo['invalidos'] else ''
+        print(f"✅ {resumo['conjuntos']} conjuntos otimizados em {resumo['tempo']:.1f}s "
+              f"({resumo['viaveis']} viáveis{invalidos}), resultados em '{args.saida}'")
+    return 0
+
+def comando_history(args, parametros):
+    """Subcomando history: lista ou mostra execuções gravadas"""
+    from datetime import datetime
+
+    from data.historico import HistoricoExecucoes
+
+    if not args.historico:
+        raise SystemExit("history exige --historico DIR (ou OTIMIZACAO_HISTORICO)")
+    with HistoricoExecucoes(args.historico) as historico:
+        if args.mostrar is not None:
+            _imprimir_json(historico.obter(args.mostrar))
+            return 0
+        execucoes = historico.execucoes(parametros=parametros if args.mesmos_parametros else None,
+                                        comando=args.filtro_comando, desde=args.desde, limite=args.limite)
+        for execucao in execucoes:
+            execucao['conjuntos'] = historico.conjuntos(execucao['id'])
+
+    if args.json:
+        _imprimir_json(execucoes)
+        return 0
+    print(f"🗄️ {len(execucoes)} execuções em '{args.historico}':")
+    for execucao in execucoes:
+        data = datetime.fromtimestamp(execucao['criado_em']).strftime('%Y-%m-%d %H:%M:%S')
+        conjuntos = ', '.join(f"{nome} ({dados['linhas']} linhas)"
+                              for nome, dados in execucao['conjuntos'].items())
+        print(f"  #{execucao['id']} {data} {execucao['comando']} "
+              f"parâmetros {execucao['chave_parametros'][:12]}{' | ' + conjuntos if conjuntos else ''}")
+    return 0
+
+def comando_serve(args, parametros):
+    """Subcomando serve: serviço local com processos aquecidos (veja servico.py)"""
+    from servico import servir
+
+    return servir(parametros, host=args.host, porta=args.porta, caminho_unix=args.unix,
+                  n_processos=args.processos, janela=args.janela_ms / 1000,
+                  limite_fila=args.fila)
+
+def comando_stream(args, parametros):
+    """Subcomando stream: acompanha o turno a partir de contagens de produção"""
+    from models.acompanhamento import acompanhar, ler_registros
+
+    registros = ler_registros(args.arquivo, seguir=args.seguir)
+    for situacao in acompanhar(parametros, registros, suavizacao=args.suavizacao,
+                               tolerancia=args.tolerancia):
+        if args.json:
+            _imprimir_json(situacao)
+            continue
+        necessarios = situacao['operarios_necessarios']
+        print(f"⏱️ {situacao['hora']:.2f}h | {situacao['producao_acumulada']:.0f} un. | "
+              f"previsão {situacao['previsao_final']:.0f} "
+              f"{'✅' if situacao['meta_prevista'] else '⚠️'} | "
+              f"operários necessários: {necessarios if necessarios is not None else 'meta inviável'}"
+              f"{' | 🔁 reotimizado' if situacao['reotimizado'] else ''}", flush=True)
+    return 0
+
+def comando_calibrate(args, parametros):
+    """Subcomando calibrate: mede a linha por eventos discretos e reotimiza"""
+    from models.eventos import SimuladorEventos
+    from models.instrumentacao import etapa
+    from models.otimizacao import OtimizadorProducao
+    from models.simulacao import SimuladorCenarios
+
+    with etapa('simulacao', tipo='eventos'):
+        medicao = SimuladorEventos(parametros).calibrar(args.turnos, semente=args.semente,
+                                                        n_processos=args.processos)
+    calibrados = medicao['parametros_calibrados']
+    with etapa('otimizacao'):
+        resultado = OtimizadorProducao(calibrados).otimizar_producao()
+    cenarios = SimuladorCenarios(calibrados).simular_cenarios()
+    _registrar(args, 'calibrate', parametros, {'medicao': medicao, 'resultado': resultado},
+               conjuntos={'cenarios': cenarios})
+
+    if args.json:
+        _imprimir_json({'medicao': medicao, 'resultado': resultado, 'cenarios': cenarios})
+        return 0
+    print(f"🏭 {medicao['n_turnos']} turnos simulados ({medicao['eventos']} eventos)")
+    print(f"Produção média: {medicao['producao_media']:.0f} ± {medicao['producao_desvio']:.0f} "
+          f"| P(meta): {medicao['prob_meta']:.1%}")
+    print(f"Horas efetivas: {parametros['horas_efetivas']} → {medicao['horas_efetivas']:.2f}")
+    print(f"Taxa de produção: {parametros['taxa_producao']} → {medicao['taxa_producao']:.1f}")
+    print("⏱️ Horas-operário do turno:")
+    for situacao, fracao in medicao['uso_operarios'].items():
+        print(f"  {situacao}: {fracao:.1%}")
+    print(f"WIP médio: {medicao['wip_medio']:.1f} peças | falhas por turno: {medicao['falhas_por_turno']:.1f}")
+    _mostrar_resultado(resultado)
+    print("📊 CENÁRIOS CALIBRADOS:")
+    for cenario in cenarios:
+        print(f"  {cenario['nome']}: {cenario['producao']:.0f} unidades")
+    return 0 if resultado['status'] == 'Optimal' else 1
+
+def _registrar(args, comando, parametros, resultado=None, conjuntos=None):
+    """Grava a execução no histórico, se --historico foi informado"""
+    if not args.historico:
+        return None
+    from data.historico import HistoricoExecucoes
+
+    with HistoricoExecucoes(args.historico) as historico:
+        execucao = historico.registrar(comando, parametros, resultado, conjuntos)
+    print(f"🗄️ Execução #{execucao} gravada em '{args.historico}'", file=sys.stderr)
+    return execucao
+
+def _resultado_e_cenarios(parametros):
+    from models.instrumentacao import etapa
+    from models.otimizacao import OtimizadorProducao
+    from models.simulacao import SimuladorCenarios
+
+    with etapa('otimizacao'):
+        resultado = OtimizadorProducao(parametros).otimizar_producao()
+    with etapa('simulacao'):
+        cenarios = SimuladorCenarios(parametros).simular_cenarios()
+    return resultado, cenarios
+
+def _mostrar_resultado(resultado):
+    print("\n📈 RESULTADO DA OTIMIZAÇÃO:")
+    print(f"Operários ideais: {resultado['operarios_ideais']}")
+    print(f"Horas ideais: {resultado['horas_ideais']:.2f}")
+    print(f"Produção máxima: {resultado['producao_maxima']:.0f} unidades")
+    print(f"Meta atingida: {'✅ SIM' if resultado['meta_atingida'] else '❌ NÃO'}")
+    print(f"Status: {resultado['status']}")
+
+def _imprimir_json(dados):
+    print(json.dumps(dados, ensure_ascii=False, default=_valor_json))
+
+def _valor_json(valor):
+    # Escalares/arrays NumPy sem importar NumPy aqui
+    if hasattr(valor, 'tolist'):
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+def _conferir_backend(args):
+    """O backend analítico só resolve o modelo de uma variável (horas fixas)"""
+    if args.backend == 'analitico' and args.metodo != 'fixas':
+        raise SystemExit(f"--backend analitico só resolve --metodo fixas, não '{args.metodo}' "
+                         f"(use auto, highs ou cbc)")
+
+def _aplicar_sobrescritas(parametros, sobrescritas):
+    """Aplica --param chave=valor sobre uma cópia dos parâmetros"""
+    parametros = dict(parametros)
+    for item in sobrescritas or []:
+        chave, separador, valor = item.partition('=')
+        if not separador:
+            raise SystemExit(f"--param espera chave=valor, recebeu '{item}'")
+        parametros[chave] = json.loads(valor)
+    return parametros
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(description="Sistema de otimização de produção")
+    parser.add_argument('--param', action='append', metavar='CHAVE=VALOR',
+                        help="sobrescreve um item de PARAMETROS (valor em JSON)")
+    parser.add_argument('--metricas-jsonl', metavar='ARQUIVO',
+                        help="acrescenta os eventos de cada etapa em JSON lines")
+    parser.add_argument('--metricas-prom', metavar='ARQUIVO',
+                        help="grava as métricas no formato texto do Prometheus")
+    parser.add_argument('--perfil', metavar='DIR', help="grava um cProfile (.prof) por etapa")
+    parser.add_argument('--historico', metavar='DIR', default=os.environ.get('OTIMIZACAO_HISTORICO'),
+                        help="grava as execuções (SQLite + colunas .npy) neste diretório")
+    subparsers = parser.add_subparsers(dest='comando')
+
+    optimize = subparsers.add_parser('optimize', help="resolve o modelo de produção")
+    optimize.add_argument('--metodo', choices=['fixas', 'variaveis', 'robusto'], default='fixas')
+    optimize.add_argument('--probabilidade', type=float, default=0.95,
+                          help="probabilidade alvo de atingir a meta (método robusto)")
+    optimize.add_argument('--cenarios', type=int, default=10_000, help="cenários sorteados (método robusto)")
+    optimize.add_argument('--semente', type=int, default=0)
+    optimize.add_argument('--backend', default='auto', choices=['auto', 'analitico', 'highs', 'cbc'])
+    optimize.add_argument('--verificar', choices=['highs', 'cbc'],
+                          help="resolve também com este backend e falha se os resultados divergirem")
+    optimize.add_argument('--json', action='store_true')
+    optimize.set_defaults(funcao=comando_optimize)
+
+    simulate = subparsers.add_parser('simulate', help="simula cenários de produção")
+    simulate.add_argument('--monte-carlo', type=int, metavar='N', help="número de turnos sorteados")
+    simulate.add_argument('--semente', type=int)
+    simulate.add_argument('--processos', type=int)
+    simulate.add_argument('--grade', type=int, metavar='N',
+                          help="grava no histórico a grade N operários x N jornadas (4-12 h)")
+    simulate.add_argument('--json', action='store_true')
+    simulate.set_defaults(funcao=comando_simulate)
+
+    minimum = subparsers.add_parser('minimum', help="operários mínimos para a meta")
+    minimum.add_argument('--json', action='store_true')
+    minimum.set_defaults(funcao=comando_minimum)
+
+    dashboard = subparsers.add_parser('dashboard', help="dashboard interativo")
+    dashboard.add_argument('--exportar', metavar='HTML', help="grava o HTML em vez de abrir o navegador")
+    dashboard.set_defaults(funcao=comando_dashboard)
+
+    report = subparsers.add_parser('report', help="relatório HTML único (headless)")
+    report.add_argument('--saida', default='relatorio.html')
+    report.add_argument('--json-figuras', metavar='JSON')
+    report.add_argument('--pareto', type=int, metavar='N',
+                        help="inclui a fronteira de Pareto produção x custo com N níveis")
+    report.add_argument('--execucao', type=int, metavar='ID',
+                        help="relatório de uma execução gravada no histórico")
+    report.set_defaults(funcao=comando_report)
+
+    serve = subparsers.add_parser('serve', help="serviço HTTP local com lotes e processos aquecidos")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--porta', type=int, default=8765)
+    serve.add_argument('--unix', metavar='CAMINHO', help="escuta num socket Unix em vez de TCP")
+    serve.add_argument('--processos', type=int)
+    serve.add_argument('--janela-ms', type=float, default=5.0, help="janela de agrupamento dos lotes")
+    serve.add_argument('--fila', type=int, default=1024, help="requisições em espera antes do 503")
+    serve.set_defaults(funcao=comando_serve)
+
+    stream = subparsers.add_parser('stream', help="acompanha o turno a partir de contagens de produção")
+    stream.add_argument('arquivo', nargs='?', default='-',
+                        help="CSV hora,producao[,operarios] ou JSON lines ('-' = stdin)")
+    stream.add_argument('--seguir', action='store_true', help="continua lendo o arquivo (tail -f)")
+    stream.add_argument('--suavizacao', type=float, default=0.3, help="peso da média móvel da taxa")
+    stream.add_argument('--tolerancia', type=float, default=0.02,
+                        help="folga (em operários) antes de reotimizar")
+    stream.add_argument('--json', action='store_true')
+    stream.set_defaults(funcao=comando_stream)
+
+    calibrate = subparsers.add_parser('calibrate',
+                                      help="calibra horas efetivas e taxa por simulação de eventos discretos")
+    calibrate.add_argument('--turnos', type=int, default=66, help="turnos simulados (66 ≈ 3 meses)")
+    calibrate.add_argument('--semente', type=int, default=0)
+    calibrate.add_argument('--processos', type=int)
+    calibrate.add_argument('--json', action='store_true')
+    calibrate.set_defaults(funcao=comando_calibrate)
+
+    plan = subparsers.add_parser('plan', help="plano de vários dias com estoque e horas extras")
+    plan.add_argument('--dias', type=int, default=28, help="dias com demanda de exemplo (sem --demanda)")
+    plan.add_argument('--demanda', metavar='ARQUIVO',
+                      help="demanda diária: lista JSON ou CSV com a demanda na última coluna")
+    plan.add_argument('--modo', choices=['rolante', 'monolitico'], default='rolante')
+    plan.add_argument('--janela', type=int, default=14, help="dias por janela do horizonte rolante")
+    plan.add_argument('--fixar', type=int, default=7, help="dias fixados de cada janela")
+    plan.add_argument('--estoque-inicial', type=float, default=0.0)
+    plan.add_argument('--semente', type=int, default=0)
+    plan.add_argument('--processos', type=int)
+    plan.add_argument('--backend', default='auto', choices=['auto', 'highs', 'cbc'])
+    plan.add_argument('--json', action='store_true')
+    plan.set_defaults(funcao=comando_plan)
+
+    batch = subparsers.add_parser('batch', help="otimiza em lote os parâmetros de um arquivo")
+    batch.add_argument('entrada', help="CSV, JSON, JSON lines ou Parquet; colunas ausentes usam PARAMETROS")
+    batch.add_argument('--saida', required=True, help="resultados em .csv, .jsonl ou .parquet")
+    batch.add_argument('--metodo', choices=['fixas', 'variaveis'], default='fixas')
+    batch.add_argument('--processos', type=int)
+    batch.add_argument('--bloco', type=int, default=500, help="conjuntos por bloco enviado aos processos")
+    batch.add_argument('--backend', default='auto', choices=['auto', 'analitico', 'highs', 'cbc'])
+    batch.add_argument('--json', action='store_true')
+    batch.set_defaults(funcao=comando_batch)
+
+    history = subparsers.add_parser('history', help="consulta as execuções gravadas com --historico")
+    history.add_argument('--comando', dest='filtro_comando', help="só execuções deste subcomando")
+    history.add_argument('--mesmos-parametros', action='store_true',
+                         help="só execuções com os parâmetros atuais (mesmo hash)")
+    history.add_argument('--desde', metavar='AAAA-MM-DD')
+    history.add_argument('--limite', type=int, default=20)
+    history.add_argument('--mostrar', type=int, metavar='ID', help="mostra parâmetros, resultado e conjuntos")
+    history.add_argument('--json', action='store_true')
+    history.set_defaults(funcao=comando_history)
+
+    return parser
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Acompanhamento do turno em tempo real a partir de contagens de produção
+Totais incrementais e reotimização só das horas restantes quando a decisão muda
+"""
+
+import json
+import math
+import sys
+import time
+
+from models.otimizacao import OtimizadorProducao
+
+
+class AcompanhadorTurno:
+    """Mantém o estado do turno com custo O(1) por registro.
+
+    Cada registro informa a hora decorrida desde o início do turno, as unidades
+    produzidas desde o registro anterior e, opcionalmente, os operários em
+    serviço. A taxa por operário-hora é estimada por média móvel exponencial
+    (suavizacao) e a previsão do fim do turno usa essa taxa.
+
+    O otimizador só é chamado de novo quando a carga restante
+        (meta - produzido) / (taxa estimada * horas restantes)
+    sai da faixa que sustenta a decisão atual de operários necessários
+    (com folga de `tolerancia`), ou seja, quando a decisão mudaria.
+    Registros que não avançam a hora (repetidos, fora de ordem ou o marco
+    zero do turno) são ignorados e contados em `ignorados`.
+    """
+
+    def __init__(self, parametros, suavizacao=0.3, tolerancia=0.02, backend='auto'):
+        self.parametros = parametros
+        self.suavizacao = suavizacao
+        self.tolerancia = tolerancia
+        self.backend = backend
+
+        self.hora = 0.0
+        self.producao = 0.0
+        self.registros = 0
+        self.ignorados = 0
+        self.reotimizacoes = 0
+        self.taxa_estimada = float(parametros['taxa_producao'])
+        self.decisao = self._reotimizar(parametros['meta_diaria'], parametros['horas_efetivas'])
+        # Sem contagem de operários nos registros, supõe a escala completa
+        self.operarios = float(parametros['operarios_maximos'])
+
+    def atualizar(self, hora, producao, operarios=None):
+        """Incorpora um registro e retorna a situação atualizada do turno
+
+        Retorna None (e ignora o registro) se a hora não avançar.
+        """
+        intervalo = hora - self.hora
+        if intervalo <= 0:
+            self.ignorados += 1
+            return None
+
+        operarios = self.operarios if operarios is None else operarios
+        if operarios > 0:
+            taxa = producao / (operarios * intervalo)
+            self.taxa_estimada += self.suavizacao * (taxa - self.taxa_estimada)
+
+        self.hora = hora
+        self.producao += producao
+        self.operarios = operarios
+        self.registros += 1
+
+        restantes = max(0.0, self.parametros['horas_efetivas'] - hora)
+        faltante = max(0.0, self.parametros['meta_diaria'] - self.producao)
+        carga = _carga(faltante, self.taxa_estimada, restantes)
+
+        reotimizado = False
+        inferior, superior = self.decisao['faixa_carga']
+        if restantes > 0 and not inferior - self.tolerancia < carga <= superior + self.tolerancia:
+            self.decisao = self._reotimizar(faltante, restantes)
+            reotimizado = True
+
+        if restantes == 0:
+            # Turno encerrado: não há mais o que decidir
+            self.decisao = dict(self.decisao, operarios_necessarios=0 if faltante == 0 else None,
+                                meta_atingivel=faltante == 0)
+
+        previsao = self.producao + self.taxa_estimada * operarios * restantes
+        return {
+            'hora': hora,
+            'producao_acumulada': self.producao,
+            'taxa_estimada': self.taxa_estimada,
+            'horas_restantes': restantes,
+            'producao_faltante': faltante,
+            'previsao_final': previsao,
+            'meta_prevista': previsao >= self.parametros['meta_diaria'],
+            'operarios_atuais': operarios,
+            'operarios_necessarios': self.decisao['operarios_necessarios'],
+            'meta_atingivel': self.decisao['meta_atingivel'],
+            'reotimizado': reotimizado,
+        }
+
+    def _reotimizar(self, faltante, restantes):
+        """Menor número de operários que produz o que falta nas horas restantes
+
+        Resolve o modelo de horas fixas só para as horas restantes, com a taxa
+        estimada e o objetivo invertido (minimizar operários); a solução é a
+        nova decisão de operários necessários (None se a meta ficou inviável).
+        """
+        self.reotimizacoes += 1
+        carga = _carga(faltante, self.taxa_estimada, restantes)
+
+        necessarios = None
+        if math.isfinite(carga):
+            parametros = dict(self.parametros, taxa_producao=self.taxa_estimada,
+                              horas_efetivas=restantes, meta_diaria=faltante)
+            otimizador = OtimizadorProducao(parametros, cache=False, backend=self.backend)
+            problema = otimizador.modelo_horas_fixas(restantes)
+            solucao = otimizador._resolver(problema.copiar(c=-problema.c, nome='Minimizar_Operarios'))
+            if solucao['status'] == 'Optimal':
+                necessarios = int(round(solucao['x'][0]))
+
+        # Faixa de carga em que a decisão de operários necessários continua a mesma
+        if necessarios is None:
+            faixa = (self.parametros['operarios_maximos'], math.inf)
+        else:
+            faixa = (necessarios - 1, necessarios)
+
+        return {
+            'operarios_necessarios': necessarios,
+            'meta_atingivel': necessarios is not None,
+            'faixa_carga': faixa,
+        }
+
+
+def _carga(faltante, taxa, horas):
+    """Operários necessários (fracionários) para produzir o que falta"""
+    if faltante <= 0:
+        return 0.0
+    if taxa <= 0 or horas <= 0:
+        return math.inf
+    return faltante / (taxa * horas)
+
+
+def ler_registros(caminho='-', seguir=False, intervalo=0.5):
+    """Lê registros de um arquivo (ou '-' para stdin), uma linha por registro.
+
+    Aceita CSV `hora,producao[,operarios]` ou JSON {"hora", "producao", "operarios"}.
+    Linhas vazias, comentários (#) e cabeçalho são ignorados; linhas malformadas
+    são ignoradas com um aviso em stderr. Com seguir=True,
+    continua lendo o que for acrescentado ao arquivo, como `tail -f`.
+    """
+    arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8')
+    pendente = ''
+    try:
+        while True:
+            linha = pendente + arquivo.readline()
+            seguindo = seguir and arquivo is not sys.stdin
+            if not linha.endswith('\n') and seguindo:
+                # Linha ainda sendo gravada: espera o resto
+                pendente = linha
+                time.sleep(intervalo)
+                continue
+            pendente = ''
+            if not linha:
+                return
+            registro = _interpretar(linha)
+            if registro is not None:
+                yield registro
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def _interpretar(linha):
+    linha = linha.strip()
+    if not linha or linha.startswith('#'):
+        return None
+    if linha.startswith('{'):
+        try:
+            dados = json.loads(linha)
+            return {'hora': float(dados['hora']), 'producao': float(dados['producao']),
+                    'operarios': dados.get('operarios')}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return _malformada(linha)
+
+    campos = [campo.strip() for campo in linha.split(',')]
+    try:
+        valores = [float(campo) for campo in campos if campo]
+    except ValueError:
+        return None  # cabeçalho
+    if len(valores) < 2:
+        return _malformada(linha)
+    return {'hora': valores[0], 'producao': valores[1],
+            'operarios': valores[2] if len(valores) > 2 else None}
+
+
+def _malformada(linha):
+    print(f"⚠️ Registro malformado ignorado: {linha}", file=sys.stderr)
+    return None
+
+
+def acompanhar(parametros, registros, **opcoes):
+    """Gera a situação do turno a cada registro recebido"""
+    acompanhador = AcompanhadorTurno(parametros, **opcoes)
+    for registro in registros:
+        situacao = acompanhador.atualizar(registro['hora'], registro['producao'], registro['operarios'])
+        if situacao is not None:
+            yield situacao
@@ -0,0 +1,25 @@
+"""
+Cálculos em forma fechada do problema de uma linha
+Sem dependências externas, para poderem ser usados sem importar NumPy/PuLP
+"""
+
+import math
+
+
+def calcular_meta_minima(parametros):
+    """Calcula a configuração mínima para atingir a meta"""
+
+    # Operários mínimos para atingir a meta
+    operarios_minimos = math.ceil(parametros['meta_diaria'] /
+                                  (parametros['taxa_producao'] * parametros['horas_efetivas']))
+
+    return {
+        'operarios_minimos': int(operarios_minimos),
+        'horas_necessarias': parametros['horas_efetivas'],
+        'producao_estimada': parametros['taxa_producao'] * operarios_minimos * parametros['horas_efetivas']
+    }
+
+
+def calcular_custo(parametros, operarios, horas):
+    """Calcula o custo total da produção"""
+    return operarios * horas * parametros['custo_hora']
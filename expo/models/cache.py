@@ -0,0 +1,161 @@
+"""
+Cache de soluções do otimizador (memória LRU + disco opcional)
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+
+# Guardado no lugar de None (problema inviável ou sem solução), para que a
+# repetição da consulta também seja um acerto; sobrevive à ida e volta em JSON
+SEM_SOLUCAO = {'sem_solucao': True}
+
+
+class CacheSolucoes:
+    """Memoriza resultados de otimização pela chave (método, parâmetros).
+
+    A camada em memória é um LRU com no máximo `capacidade` entradas. Se
+    `diretorio` for informado, os resultados também são gravados em disco
+    (um JSON por chave) e os arquivos menos usados são removidos quando o
+    total passa de `tamanho_maximo_disco` bytes. As duas camadas guardam o
+    resultado serializado em JSON: todo acerto devolve uma cópia nova, com
+    tipos nativos (listas no lugar de arrays NumPy), venha da memória ou do disco.
+    """
+
+    def __init__(self, capacidade=256, diretorio=None, tamanho_maximo_disco=50 * 1024 * 1024):
+        self.capacidade = capacidade
+        self.diretorio = diretorio
+        self.tamanho_maximo_disco = tamanho_maximo_disco
+        self._memoria = OrderedDict()
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    @staticmethod
+    def chave(metodo, parametros, **extras):
+        """Hash canônico do método, dos parâmetros e de argumentos extras"""
+        conteudo = {'metodo': metodo, 'parametros': parametros, 'extras': extras}
+        texto = json.dumps(_canonizar(conteudo), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def obter(self, chave):
+        """Retorna uma cópia do resultado guardado, ou None se não houver"""
+        if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            self.hits += 1
+            return json.loads(self._memoria[chave])
+
+        texto = self._ler_disco(chave)
+        if texto is not None:
+            self.hits += 1
+            self.hits_disco += 1
+            self._guardar_memoria(chave, texto)
+            return json.loads(texto)
+
+        self.misses += 1
+        return None
+
+    def guardar(self, chave, resultado):
+        """Guarda uma cópia do resultado nas camadas de memória e disco"""
+        texto = json.dumps(resultado, default=_valor_nativo)
+        self._guardar_memoria(chave, texto)
+        if self.diretorio:
+            self._gravar_disco(chave, texto)
+
+    def limpar(self, disco=False):
+        """Esvazia a memória (e opcionalmente o disco) e zera os contadores"""
+        self._memoria.clear()
+        self.hits = self.hits_disco = self.misses = 0
+        if disco and self.diretorio:
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith('.json'):
+                    os.remove(os.path.join(self.diretorio, nome))
+
+    def estatisticas(self):
+        """Contadores de acerto/erro para acompanhar o cache em produção"""
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'hits_disco': self.hits_disco,
+            'misses': self.misses,
+            'taxa_acerto': self.hits / consultas if consultas else 0.0,
+            'entradas_memoria': len(self._memoria),
+        }
+
+    def _guardar_memoria(self, chave, texto):
+        self._memoria[chave] = texto
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.capacidade:
+            self._memoria.popitem(last=False)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f'{chave}.json')
+
+    def _ler_disco(self, chave):
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                texto = arquivo.read()
+            json.loads(texto)
+        except (OSError, ValueError):
+            return None
+        # Atualiza o mtime para que a remoção por tamanho siga a ordem de uso
+        os.utime(caminho)
+        return texto
+
+    def _gravar_disco(self, chave, texto):
+        caminho = self._caminho(chave)
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+        os.replace(temporario, caminho)
+        self._remover_excedente()
+
+    def _remover_excedente(self):
+        """Remove os arquivos menos usados até o total caber no limite"""
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith('.json'):
+                info = entrada.stat()
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.tamanho_maximo_disco:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            total -= tamanho
+
+
+def _valor_nativo(valor):
+    """Converte escalares e arrays NumPy para tipos nativos na serialização JSON"""
+    if hasattr(valor, 'tolist'):
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _canonizar(valor):
+    """Converte tipos NumPy e números equivalentes (7 e 7.0) para uma forma única"""
+    if isinstance(valor, dict):
+        return {str(k): _canonizar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_canonizar(v) for v in valor]
+    if hasattr(valor, 'tolist'):
+        # Escalares e arrays NumPy viram números e listas nativos
+        return _canonizar(valor.tolist())
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+# Cache compartilhado pelos otimizadores do processo. Defina a variável de
+# ambiente OTIMIZACAO_CACHE_DIR para habilitar também a camada em disco.
+CACHE_PADRAO = CacheSolucoes(diretorio=os.environ.get('OTIMIZACAO_CACHE_DIR'))
@@ -0,0 +1,384 @@
+"""
+Escala semanal de operários nomeados em turnos e linhas
+Modo exato (MILP esparso) para instâncias pequenas e heurística construtiva +
+busca local para instâncias grandes, com o gap de otimalidade entre os dois
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+
+from models.solvers import ProblemaLinear, resolver
+
+
+class EscalonadorTurnos:
+    """Atribui operários a (turno, linha) minimizando custo + penalidade por falta.
+
+    Instância (dicionário, arrays NumPy):
+      nomes_operarios   O nomes
+      taxas             matriz O x L em unidades/hora; zero = sem habilidade na linha
+      custo_hora        escalar ou vetor O (R$/hora)
+      disponibilidade   matriz booleana O x T (turnos em que o operário pode trabalhar)
+      max_turnos        escalar ou vetor O (turnos por semana)
+      horas_turno       vetor T com as horas efetivas de cada turno
+      postos            vetor L com o máximo de operários por linha em cada turno
+      demanda           matriz T x L com a produção mínima de cada linha em cada turno
+      penalidade_falta  (opcional) R$ por unidade de demanda não atendida
+      nomes_turnos, nomes_linhas (opcionais)
+
+    Cada operário trabalha em no máximo uma linha por turno. Só os trios
+    (operário, turno, linha) elegíveis (habilidade e disponibilidade) viram
+    variáveis, então o tamanho acompanha o número de atribuições possíveis.
+    """
+
+    def __init__(self, instancia, backend='auto', verificar=None):
+        self.instancia = instancia
+        self.backend = backend
+        self.verificar = verificar
+
+        taxas = np.asarray(instancia['taxas'], dtype=float)
+        disponibilidade = np.asarray(instancia['disponibilidade'], dtype=bool)
+        self.n_operarios, self.n_linhas = taxas.shape
+        self.n_turnos = disponibilidade.shape[1]
+        self.horas = np.broadcast_to(np.asarray(instancia['horas_turno'], dtype=float), self.n_turnos)
+        self.custo_hora = np.broadcast_to(np.asarray(instancia['custo_hora'], dtype=float),
+                                          self.n_operarios)
+        self.max_turnos = np.broadcast_to(np.asarray(instancia['max_turnos']), self.n_operarios)
+        self.postos = np.broadcast_to(np.asarray(instancia['postos']), self.n_linhas)
+        self.demanda = np.asarray(instancia['demanda'], dtype=float).reshape(self.n_turnos, self.n_linhas)
+        self.penalidade = instancia.get('penalidade_falta')
+        if self.penalidade is None:
+            # Bem acima do custo da unidade mais cara: só falta demanda se não houver quem escalar
+            self.penalidade = 10 * float(self.custo_hora.max()) / float(taxas[taxas > 0].min())
+
+        # Trios elegíveis, em ordem (operário, turno, linha)
+        operario, turno, linha = np.nonzero(disponibilidade[:, :, None] & (taxas[:, None, :] > 0))
+        self.operario, self.turno, self.linha = operario, turno, linha
+        self.producao_trio = taxas[operario, linha] * self.horas[turno]
+        self.custo_trio = self.custo_hora[operario] * self.horas[turno]
+
+    @property
+    def n_trios(self):
+        return len(self.operario)
+
+    def montar_modelo(self):
+        """ProblemaLinear com matriz CSR: [x por trio elegível | falta por (turno, linha)]"""
+        K, T, L = self.n_trios, self.n_turnos, self.n_linhas
+        col_trios = np.arange(K)
+        col_falta = K + np.arange(T * L)
+        celula = self.turno * L + self.linha
+
+        # Linhas: uma linha por turno por operário | max_turnos | postos | demanda
+        linhas_matriz = [self.operario * T + self.turno,
+                         self.n_operarios * T + self.operario,
+                         self.n_operarios * (T + 1) + celula,
+                         self.n_operarios * (T + 1) + T * L + celula,
+                         self.n_operarios * (T + 1) + T * L + np.arange(T * L)]
+        colunas_matriz = [col_trios, col_trios, col_trios, col_trios, col_falta]
+        valores = [np.ones(K), np.ones(K), np.ones(K), self.producao_trio, np.ones(T * L)]
+        n_restricoes = self.n_operarios * (T + 1) + 2 * T * L
+
+        matriz = sparse.csr_array(
+            (np.concatenate(valores), (np.concatenate(linhas_matriz), np.concatenate(colunas_matriz))),
+            shape=(n_restricoes, K + T * L))
+
+        problema = ProblemaLinear(
+            c=-np.concatenate([self.custo_trio, np.full(T * L, self.penalidade)]),
+            A=matriz,
+            lb_restricoes=np.concatenate([np.full(self.n_operarios * (T + 1) + T * L, -np.inf),
+                                          self.demanda.ravel()]),
+            ub_restricoes=np.concatenate([np.ones(self.n_operarios * T),
+                                          self.max_turnos.astype(float),
+                                          np.tile(self.postos.astype(float), T),
+                                          np.full(T * L, np.inf)]),
+            lb=np.zeros(K + T * L),
+            ub=np.concatenate([np.ones(K), np.full(T * L, np.inf)]),
+            inteiras=np.concatenate([np.ones(K, dtype=bool), np.zeros(T * L, dtype=bool)]),
+            nome='Escala_Semanal'
+        )
+        return problema
+
+    def resolver_exato(self, limite_tempo=None):
+        """MILP completo; com limite_tempo pode voltar a melhor escala encontrada"""
+        inicio = time.perf_counter()
+        solucao = resolver(self.montar_modelo(), backend=self.backend, verificar=self.verificar,
+                           limite_tempo=limite_tempo)
+        if solucao['x'] is None:
+            escolhidos = np.zeros(self.n_trios, dtype=bool)
+        else:
+            escolhidos = solucao['x'][:self.n_trios] > 0.5
+        return self._escala(escolhidos, solucao['status'], 'exato', time.perf_counter() - inicio)
+
+    def resolver_heuristico(self, limite_tempo=5.0):
+        """Construção gulosa por custo por unidade seguida de busca local
+
+        Movimentos da busca local (primeira melhora, até não haver melhora ou
+        acabar o tempo): remover uma atribuição, trocar o operário de uma
+        atribuição por outro livre no turno, levar o operário para outra linha
+        ou outro turno, trocar duas atribuições da mesma (turno, linha) por uma
+        e acrescentar um operário onde ainda falta produção. Cada
+        movimento é avaliado em O(1) com a produção por (turno, linha) e os
+        contadores por operário mantidos incrementalmente.
+
+        A escala sempre é viável (a falta de demanda é penalizada, não
+        proibida), então o status segue o PuLP ('Optimal': há solução) e
+        otimalidade_comprovada fica False.
+        """
+        inicio = time.perf_counter()
+        estado = _EstadoEscala(self)
+        estado.construir()
+        estado.buscar(inicio + limite_tempo)
+        return self._escala(estado.escolhidos, 'Optimal', 'heuristico', time.perf_counter() - inicio)
+
+    def comparar(self, limite_tempo_exato=None, limite_tempo_heuristico=5.0):
+        """Roda os dois modos e informa o gap relativo da heurística ao MILP
+
+        gap = (objetivo heurístico - objetivo exato) / objetivo exato. Se o MILP
+        parou no limite de tempo sem provar otimalidade, o gap é medido contra a
+        melhor escala que ele encontrou e gap_comprovado fica False.
+        """
+        exato = self.resolver_exato(limite_tempo_exato)
+        heuristico = self.resolver_heuristico(limite_tempo_heuristico)
+        gap = None
+        if exato['atribuicoes'] or exato['status'] == 'Optimal':
+            gap = (heuristico['objetivo'] - exato['objetivo']) / max(abs(exato['objetivo']), 1e-9)
+        return {'exato': exato, 'heuristico': heuristico, 'gap': gap,
+                'gap_comprovado': exato['otimalidade_comprovada']}
+
+    def _escala(self, escolhidos, status, metodo, tempo):
+        """Converte a seleção de trios no resultado da escala
+
+        status segue os nomes do PuLP; metodo ('exato' ou 'heuristico') e
+        otimalidade_comprovada dizem como a escala foi obtida.
+        """
+        producao = np.zeros((self.n_turnos, self.n_linhas))
+        np.add.at(producao, (self.turno[escolhidos], self.linha[escolhidos]),
+                  self.producao_trio[escolhidos])
+        falta = np.clip(self.demanda - producao, 0, None)
+        custo = float(self.custo_trio[escolhidos].sum())
+
+        nomes = _nomes(self.instancia.get('nomes_operarios'), 'Operario_', self.n_operarios)
+        turnos = _nomes(self.instancia.get('nomes_turnos'), 'T', self.n_turnos)
+        linhas = _nomes(self.instancia.get('nomes_linhas'), 'Linha_', self.n_linhas)
+        atribuicoes = [(nomes[o], turnos[t], linhas[l]) for o, t, l in
+                       zip(self.operario[escolhidos], self.turno[escolhidos], self.linha[escolhidos])]
+
+        return {
+            'atribuicoes': atribuicoes,
+            'custo': custo,
+            'falta_total': float(falta.sum()),
+            'objetivo': custo + self.penalidade * float(falta.sum()),
+            'producao': producao,
+            'falta': falta,
+            'turnos_por_operario': np.bincount(self.operario[escolhidos], minlength=self.n_operarios),
+            'status': status,
+            'metodo': metodo,
+            'otimalidade_comprovada': metodo == 'exato' and status == 'Optimal',
+            'tempo': tempo,
+        }
+
+
+class _EstadoEscala:
+    """Escala em construção com os agregados usados para avaliar movimentos em O(1)"""
+
+    def __init__(self, escalonador):
+        self.e = escalonador
+        self.escolhidos = np.zeros(escalonador.n_trios, dtype=bool)
+        self.producao = np.zeros((escalonador.n_turnos, escalonador.n_linhas))
+        self.ocupados = np.zeros((escalonador.n_turnos, escalonador.n_linhas), dtype=int)
+        self.turnos_operario = np.zeros(escalonador.n_operarios, dtype=int)
+        # Trio em que o operário está em cada turno (-1 = livre)
+        self.alocacao = np.full((escalonador.n_operarios, escalonador.n_turnos), -1)
+
+        # Índices por (turno, linha) e por (operário, turno)
+        celula = escalonador.turno * escalonador.n_linhas + escalonador.linha
+        ordem = np.argsort(celula, kind='stable')
+        limites = np.searchsorted(celula[ordem], np.arange(escalonador.n_turnos * escalonador.n_linhas + 1))
+        self.trios_celula = [ordem[a:b] for a, b in zip(limites[:-1], limites[1:])]
+        # Os trios já vêm ordenados por operário
+        limites = np.searchsorted(escalonador.operario, np.arange(escalonador.n_operarios + 1))
+        self.trios_operario = [np.arange(a, b) for a, b in zip(limites[:-1], limites[1:])]
+
+    def _falta(self, t, l, producao):
+        return max(0.0, self.e.demanda[t, l] - producao)
+
+    def delta_adicionar(self, k):
+        e = self.e
+        t, l = e.turno[k], e.linha[k]
+        antes = self._falta(t, l, self.producao[t, l])
+        depois = self._falta(t, l, self.producao[t, l] + e.producao_trio[k])
+        return e.custo_trio[k] + e.penalidade * (depois - antes)
+
+    def delta_remover(self, k):
+        e = self.e
+        t, l = e.turno[k], e.linha[k]
+        antes = self._falta(t, l, self.producao[t, l])
+        depois = self._falta(t, l, self.producao[t, l] - e.producao_trio[k])
+        return -e.custo_trio[k] + e.penalidade * (depois - antes)
+
+    def pode_adicionar(self, k):
+        e = self.e
+        o, t, l = e.operario[k], e.turno[k], e.linha[k]
+        return (self.alocacao[o, t] < 0 and self.turnos_operario[o] < e.max_turnos[o]
+                and self.ocupados[t, l] < e.postos[l])
+
+    def adicionar(self, k):
+        e = self.e
+        o, t, l = e.operario[k], e.turno[k], e.linha[k]
+        self.escolhidos[k] = True
+        self.producao[t, l] += e.producao_trio[k]
+        self.ocupados[t, l] += 1
+        self.turnos_operario[o] += 1
+        self.alocacao[o, t] = k
+
+    def remover(self, k):
+        e = self.e
+        o, t, l = e.operario[k], e.turno[k], e.linha[k]
+        self.escolhidos[k] = False
+        self.producao[t, l] -= e.producao_trio[k]
+        self.ocupados[t, l] -= 1
+        self.turnos_operario[o] -= 1
+        self.alocacao[o, t] = -1
+
+    def construir(self):
+        """Gulosa: trios em ordem de custo por unidade, enquanto reduzirem o objetivo"""
+        e = self.e
+        for k in np.argsort(e.custo_trio / e.producao_trio, kind='stable'):
+            if self.pode_adicionar(k) and self.delta_adicionar(k) < -1e-9:
+                self.adicionar(k)
+
+    def buscar(self, prazo):
+        melhorou = True
+        while melhorou and time.perf_counter() < prazo:
+            melhorou = False
+            for k in np.flatnonzero(self.escolhidos):
+                if time.perf_counter() >= prazo:
+                    break
+                if self.escolhidos[k] and self._melhorar_atribuicao(k):
+                    melhorou = True
+            for t in range(self.e.n_turnos):
+                for l in range(self.e.n_linhas):
+                    if time.perf_counter() >= prazo:
+                        return
+                    if self._fundir_celula(t, l, prazo) or self._completar_celula(t, l):
+                        melhorou = True
+
+    def _melhorar_atribuicao(self, k):
+        """Tenta remover, trocar de operário ou trocar de linha a atribuição k"""
+        e = self.e
+        o, t, l = e.operario[k], e.turno[k], e.linha[k]
+
+        delta_remocao = self.delta_remover(k)
+        if delta_remocao < -1e-9:
+            self.remover(k)
+            return True
+
+        # Troca de operário na mesma (turno, linha)
+        self.remover(k)
+        melhor, melhor_delta = None, -delta_remocao - 1e-9
+        for candidato in self.trios_celula[t * e.n_linhas + l]:
+            if candidato != k and self.pode_adicionar(candidato):
+                delta = self.delta_adicionar(candidato)
+                if delta < melhor_delta:
+                    melhor, melhor_delta = candidato, delta
+
+        # O mesmo operário em outra linha ou outro turno
+        for candidato in self.trios_operario[o]:
+            if candidato != k and self.pode_adicionar(candidato):
+                delta = self.delta_adicionar(candidato)
+                if delta < melhor_delta:
+                    melhor, melhor_delta = candidato, delta
+
+        if melhor is None:
+            self.adicionar(k)
+            return False
+        self.adicionar(melhor)
+        return True
+
+    def _fundir_celula(self, t, l, prazo):
+        """Troca duas atribuições da (turno, linha) por uma só, se compensar
+
+        O número de pares cresce com o quadrado dos atribuídos à célula, então
+        o prazo é conferido a cada par.
+        """
+        if self.producao[t, l] <= self.e.demanda[t, l]:
+            return False  # sem excesso, a fusão só criaria falta
+        trios = self.trios_celula[t * self.e.n_linhas + l]
+        atribuidos = trios[self.escolhidos[trios]]
+        for i, a in enumerate(atribuidos):
+            for b in atribuidos[i + 1:]:
+                if time.perf_counter() >= prazo:
+                    return False
+                delta = self.delta_remover(a)
+                self.remover(a)
+                delta += self.delta_remover(b)
+                self.remover(b)
+
+                melhor, melhor_delta = None, -delta - 1e-9
+                for candidato in trios:
+                    if self.pode_adicionar(candidato):
+                        delta_candidato = self.delta_adicionar(candidato)
+                        if delta_candidato < melhor_delta:
+                            melhor, melhor_delta = candidato, delta_candidato
+
+                if melhor is not None:
+                    self.adicionar(melhor)
+                    return True
+                self.adicionar(a)
+                self.adicionar(b)
+        return False
+
+    def _completar_celula(self, t, l):
+        """Acrescenta o melhor operário livre onde ainda falta produção"""
+        e = self.e
+        if self.producao[t, l] >= e.demanda[t, l] or self.ocupados[t, l] >= e.postos[l]:
+            return False
+        melhor, melhor_delta = None, -1e-9
+        for candidato in self.trios_celula[t * e.n_linhas + l]:
+            if self.pode_adicionar(candidato):
+                delta = self.delta_adicionar(candidato)
+                if delta < melhor_delta:
+                    melhor, melhor_delta = candidato, delta
+        if melhor is None:
+            return False
+        self.adicionar(melhor)
+        return True
+
+
+def _nomes(nomes, prefixo, n):
+    """Nomes informados na instância (lista ou array) ou gerados com o prefixo"""
+    if nomes is None:
+        return [f'{prefixo}{i}' for i in range(n)]
+    return nomes.tolist() if isinstance(nomes, np.ndarray) else list(nomes)
+
+
+def instancia_escala(n_operarios, n_dias=7, turnos_por_dia=2, n_linhas=4, semente=0):
+    """Gera uma semana sintética com operários de taxas, habilidades e folgas diferentes"""
+    rng = np.random.default_rng(semente)
+    n_turnos = n_dias * turnos_por_dia
+
+    # Cada operário domina a linha principal e, com 40% de chance, cada uma das outras
+    habilidades = rng.random((n_operarios, n_linhas)) < 0.4
+    habilidades[np.arange(n_operarios), rng.integers(0, n_linhas, n_operarios)] = True
+    taxas = np.where(habilidades, rng.uniform(70, 130, (n_operarios, n_linhas)), 0.0)
+    disponibilidade = rng.random((n_operarios, n_turnos)) < 0.7
+    horas_turno = np.full(n_turnos, 7.0)
+
+    # Demanda: ~45% da capacidade disponível de cada turno, repartida entre as linhas
+    capacidade_turno = (disponibilidade * taxas.mean(axis=1)[:, None]).sum(axis=0) * horas_turno
+    pesos = rng.uniform(0.5, 1.5, (n_turnos, n_linhas))
+    demanda = 0.45 * capacidade_turno[:, None] * pesos / pesos.sum(axis=1, keepdims=True)
+
+    return {
+        'nomes_operarios': [f'Operario_{o:04d}' for o in range(n_operarios)],
+        'taxas': taxas,
+        'custo_hora': rng.uniform(16, 24, n_operarios).round(2),
+        'disponibilidade': disponibilidade,
+        'max_turnos': 5,
+        'horas_turno': horas_turno,
+        'postos': np.full(n_linhas, max(1, n_operarios // (2 * n_linhas))),
+        'demanda': demanda,
+        'nomes_turnos': [f'Dia{d + 1}_T{s + 1}' for d in range(n_dias) for s in range(turnos_por_dia)],
+        'nomes_linhas': [f'Linha_{l + 1}' for l in range(n_linhas)],
+    }
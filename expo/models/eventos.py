@@ -0,0 +1,308 @@
+"""
+Simulação de eventos discretos da linha de engrenagens
+Mede as horas efetivas e a taxa de produção reais (pausas, setups, quebras e
+filas de WIP) e devolve PARAMETROS calibrados para o otimizador e a simulação
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from data.parametros import LINHA_ENGRENAGENS
+from models.simulacao import PERCENTIS_PADRAO, amostrar
+
+# Tipos de evento
+FIM_CICLO, FALHA, REPARO, INICIO_PAUSA, FIM_PAUSA, FIM_TURNO = range(6)
+
+# Colunas por turno retornadas por SimuladorEventos.simular_turnos
+COLUNAS_TURNO = ('producao', 'pecas_processadas', 'horas_processamento', 'horas_setup',
+                 'horas_espera_reparo', 'horas_pausa', 'horas_ociosas', 'wip_medio',
+                 'falhas', 'eventos')
+
+
+class Evento:
+    """Registro compacto de um evento da fila"""
+    __slots__ = ('tempo', 'tipo', 'maquina', 'versao')
+
+    def __init__(self, tempo, tipo, maquina=-1, versao=0):
+        self.tempo = tempo
+        self.tipo = tipo
+        self.maquina = maquina
+        self.versao = versao
+
+
+class SimuladorEventos:
+    """Simula turnos da linha (LINHA_ENGRENAGENS) evento a evento.
+
+    As peças passam pelas estações em série, com buffers de capacidade
+    limitada entre elas. Cada ciclo ocupa uma máquina livre da estação e um
+    operário do grupo (operarios_maximos, por padrão); a cada `lote` peças
+    a máquina faz um setup. As máquinas quebram pelo relógio (mtbf) e, se
+    estavam em ciclo, o operário espera o reparo (mttr). Uma máquina que
+    termina sem espaço no buffer seguinte fica bloqueada segurando a peça.
+    Durante as pausas nenhum ciclo começa. O despacho puxa a produção: as
+    estações mais adiante têm prioridade no próximo operário livre.
+
+    Só o fim de cada ciclo, falhas, reparos, pausas e o fim do turno passam
+    pela fila (heapq); os inícios acontecem no despacho, sem evento.
+    """
+
+    def __init__(self, parametros, linha=None):
+        self.parametros = parametros
+        self.linha = LINHA_ENGRENAGENS if linha is None else linha
+
+    def simular_turnos(self, n_turnos=66, operarios=None, semente=None, n_processos=None,
+                       tamanho_bloco=16):
+        """Simula n_turnos independentes; retorna um dicionário colunar por turno.
+
+        Os turnos são divididos em blocos com fluxos aleatórios próprios
+        (SeedSequence), então o resultado só depende da semente e de
+        tamanho_bloco, não de n_processos.
+        """
+        operarios = self.parametros['operarios_maximos'] if operarios is None else operarios
+        sequencia = np.random.SeedSequence(semente)
+        tamanhos = [min(tamanho_bloco, n_turnos - inicio) for inicio in range(0, n_turnos, tamanho_bloco)]
+        tarefas = [(self.linha, int(operarios), self.parametros['horas_maximas'], filha, tamanho)
+                   for filha, tamanho in zip(sequencia.spawn(len(tamanhos)), tamanhos)]
+
+        if n_processos == 1 or len(tarefas) <= 1:
+            blocos = list(map(_simular_bloco_turnos, tarefas))
+        else:
+            n_processos = min(len(tarefas), n_processos or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                blocos = list(executor.map(_simular_bloco_turnos, tarefas))
+
+        colunas = {coluna: np.concatenate([bloco[coluna] for bloco in blocos]) for coluna in COLUNAS_TURNO}
+        colunas['semente'] = sequencia.entropy
+        return colunas
+
+    def calibrar(self, n_turnos=66, operarios=None, semente=None, n_processos=None,
+                 percentis=PERCENTIS_PADRAO):
+        """Mede a linha e devolve o resumo com PARAMETROS calibrados.
+
+        taxa_producao = peças por hora de processamento de um operário (ciclos
+        concluídos / n_estacoes / horas de processamento); horas_efetivas =
+        produção média / (taxa * operários). Assim a conta do otimizador,
+        taxa * operários * horas, reproduz a produção média simulada para o
+        número de operários simulado.
+        """
+        operarios = self.parametros['operarios_maximos'] if operarios is None else operarios
+        turnos = self.simular_turnos(n_turnos, operarios, semente, n_processos)
+        n_estacoes = len(self.linha['estacoes'])
+
+        producao = turnos['producao']
+        processamento = turnos['horas_processamento'].sum()
+        taxa = turnos['pecas_processadas'].sum() / n_estacoes / processamento if processamento > 0 else 0.0
+        horas_efetivas = producao.mean() / (taxa * operarios) if taxa > 0 and operarios > 0 else 0.0
+        horas_operario = operarios * self.parametros['horas_maximas']
+
+        return {
+            'n_turnos': n_turnos,
+            'operarios': operarios,
+            'semente': turnos['semente'],
+            'producao_media': float(producao.mean()),
+            'producao_desvio': float(producao.std(ddof=1)) if n_turnos > 1 else 0.0,
+            'percentis': {q: float(np.percentile(producao, q)) for q in percentis},
+            'prob_meta': float((producao >= self.parametros['meta_diaria']).mean()),
+            'taxa_producao': float(taxa),
+            'horas_efetivas': float(horas_efetivas),
+            # Fração das horas-operário do turno em cada situação
+            'uso_operarios': {
+                chave: float(turnos[f'horas_{chave}'].mean() / horas_operario)
+                for chave in ('processamento', 'setup', 'espera_reparo', 'pausa', 'ociosas')
+            },
+            'wip_medio': float(turnos['wip_medio'].mean()),
+            'falhas_por_turno': float(turnos['falhas'].mean()),
+            'eventos': int(turnos['eventos'].sum()),
+            'parametros_calibrados': dict(self.parametros, taxa_producao=float(taxa),
+                                          horas_efetivas=float(horas_efetivas)),
+        }
+
+
+def calibrar_parametros(parametros, n_turnos=66, **opcoes):
+    """PARAMETROS com horas_efetivas e taxa_producao medidas na simulação de eventos"""
+    return SimuladorEventos(parametros).calibrar(n_turnos, **opcoes)['parametros_calibrados']
+
+
+def _fluxo(rng, especificacao, tamanho=4096):
+    """Sorteios não negativos em lotes, consumidos um a um com next()"""
+    while True:
+        yield from np.clip(amostrar(rng, especificacao, tamanho), 0, None).tolist()
+
+
+def _simular_bloco_turnos(tarefa):
+    """Simula um bloco de turnos (executado nos processos) em formato colunar"""
+    linha, operarios, horas, semente, tamanho = tarefa
+    rng = np.random.default_rng(semente)
+    linhas = [simular_turno(linha, operarios, horas, rng) for _ in range(tamanho)]
+    return {coluna: np.array([turno[coluna] for turno in linhas], dtype=float) for coluna in COLUNAS_TURNO}
+
+
+def simular_turno(linha, operarios, horas, rng):
+    """Simula um turno de `horas` horas; retorna os totais do turno"""
+    estacoes = linha['estacoes']
+    n_estacoes = len(estacoes)
+    capacidade = linha['capacidade_buffer']
+    ultima = n_estacoes - 1
+
+    # Máquinas numeradas em sequência, estação por estação
+    estacao = [s for s, dados in enumerate(estacoes) for _ in range(dados['maquinas'])]
+    n_maquinas = len(estacao)
+    ciclo = [_fluxo(rng, dados['ciclo']) for dados in estacoes]
+    setup = [_fluxo(rng, dados['setup']) if dados.get('setup') else None for dados in estacoes]
+    lote = [dados.get('lote') or 0 for dados in estacoes]
+    mtbf = [_fluxo(rng, dados['mtbf']) if dados.get('mtbf') else None for dados in estacoes]
+    mttr = [_fluxo(rng, dados['mttr']) if dados.get('mtbf') else None for dados in estacoes]
+
+    livres = [[] for _ in range(n_estacoes)]           # máquinas prontas para um ciclo
+    for m, s in enumerate(estacao):
+        livres[s].append(m)
+    bloqueadas = [[] for _ in range(n_estacoes)]       # máquinas da estação s-1 esperando espaço em s
+    # Peças à espera de cada estação; a estação 0 tem matéria-prima à vontade
+    entrada = [0] + [linha.get('wip_inicial', 0)] * (n_estacoes - 1)
+    ocupada = [False] * n_maquinas
+    quebrada = [False] * n_maquinas
+    bloqueada = [False] * n_maquinas
+    versao = [0] * n_maquinas
+    fim = [0.0] * n_maquinas
+    feitas = [0] * n_maquinas                          # peças desde o último setup
+    ciclo_atual = [0.0] * n_maquinas
+    setup_atual = [0.0] * n_maquinas
+    espera_atual = [0.0] * n_maquinas
+
+    fila = []
+    contador = 0
+
+    def agendar(tempo, tipo, maquina=-1, versao_evento=0):
+        nonlocal contador
+        contador += 1
+        heapq.heappush(fila, (tempo, contador, Evento(tempo, tipo, maquina, versao_evento)))
+
+    agendar(horas, FIM_TURNO)
+    for inicio, duracao in linha.get('pausas', ()):
+        if inicio < horas:
+            agendar(inicio, INICIO_PAUSA)
+            agendar(min(inicio + duracao, horas), FIM_PAUSA)
+    for m, s in enumerate(estacao):
+        if mtbf[s] is not None:
+            agendar(next(mtbf[s]), FALHA, m)
+
+    operarios_livres = operarios
+    em_pausa = False
+    wip = sum(entrada)
+    producao = pecas = falhas = eventos = 0
+    horas_processamento = horas_setup = horas_espera = horas_pausa = horas_ociosas = wip_horas = 0.0
+    ultimo = 0.0
+
+    def despachar(agora):
+        nonlocal operarios_livres, wip
+        if em_pausa or not operarios_livres:
+            return
+        for s in range(ultima, -1, -1):
+            maquinas_livres = livres[s]
+            while operarios_livres and maquinas_livres and (s == 0 or entrada[s]):
+                if s:
+                    entrada[s] -= 1
+                    wip -= 1
+                    if bloqueadas[s]:
+                        # A vaga aberta libera uma máquina bloqueada da estação anterior
+                        anterior = bloqueadas[s].pop(0)
+                        bloqueada[anterior] = False
+                        entrada[s] += 1
+                        wip += 1
+                        if not quebrada[anterior]:
+                            livres[s - 1].append(anterior)
+                m = maquinas_livres.pop()
+                operarios_livres -= 1
+                duracao = ciclo_atual[m] = next(ciclo[s])
+                setup_atual[m] = 0.0
+                if lote[s]:
+                    if feitas[m] >= lote[s]:
+                        setup_atual[m] = next(setup[s])
+                        duracao += setup_atual[m]
+                        feitas[m] = 0
+                    feitas[m] += 1
+                espera_atual[m] = 0.0
+                ocupada[m] = True
+                fim[m] = agora + duracao
+                agendar(fim[m], FIM_CICLO, m, versao[m])
+
+    despachar(0.0)
+    while fila:
+        agora, _, evento = heapq.heappop(fila)
+        eventos += 1
+        intervalo = agora - ultimo
+        if intervalo > 0:
+            if em_pausa:
+                horas_pausa += intervalo * operarios_livres
+            else:
+                horas_ociosas += intervalo * operarios_livres
+            wip_horas += intervalo * wip
+            ultimo = agora
+
+        tipo = evento.tipo
+        m = evento.maquina
+        if tipo == FIM_CICLO:
+            if evento.versao != versao[m]:
+                continue  # adiado por uma quebra
+            s = estacao[m]
+            ocupada[m] = False
+            operarios_livres += 1
+            pecas += 1
+            horas_processamento += ciclo_atual[m]
+            horas_setup += setup_atual[m]
+            horas_espera += espera_atual[m]
+            if s == ultima:
+                producao += 1
+                livres[s].append(m)
+            elif entrada[s + 1] < capacidade:
+                entrada[s + 1] += 1
+                wip += 1
+                livres[s].append(m)
+            else:
+                bloqueada[m] = True
+                bloqueadas[s + 1].append(m)
+            despachar(agora)
+        elif tipo == FALHA:
+            s = estacao[m]
+            falhas += 1
+            quebrada[m] = True
+            reparo = next(mttr[s])
+            agendar(agora + reparo, REPARO, m)
+            if ocupada[m]:
+                # O ciclo (e o operário) esperam o reparo
+                versao[m] += 1
+                fim[m] += reparo
+                espera_atual[m] += reparo
+                agendar(fim[m], FIM_CICLO, m, versao[m])
+            elif not bloqueada[m]:
+                livres[s].remove(m)
+        elif tipo == REPARO:
+            s = estacao[m]
+            quebrada[m] = False
+            if not ocupada[m] and not bloqueada[m]:
+                livres[s].append(m)
+            agendar(agora + next(mtbf[s]), FALHA, m)
+            despachar(agora)
+        elif tipo == INICIO_PAUSA:
+            em_pausa = True
+        elif tipo == FIM_PAUSA:
+            em_pausa = False
+            despachar(agora)
+        elif tipo == FIM_TURNO:
+            break
+
+    return {
+        'producao': producao,
+        'pecas_processadas': pecas,
+        'horas_processamento': horas_processamento,
+        'horas_setup': horas_setup,
+        'horas_espera_reparo': horas_espera,
+        'horas_pausa': horas_pausa,
+        'horas_ociosas': horas_ociosas,
+        'wip_medio': wip_horas / horas if horas > 0 else 0.0,
+        'falhas': falhas,
+        'eventos': eventos,
+    }
@@ -0,0 +1,272 @@
+"""
+Planejamento de produção de vários dias por horizonte rolante
+Estoque entre dias, limites de hora extra e demanda diária variável
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from data.parametros import PARAMETROS_HORIZONTE
+from models.solvers import ProblemaLinear, resolver
+
+# Colunas do plano diário retornado por PlanejadorHorizonte
+COLUNAS_PLANO = ('dia', 'demanda', 'operarios', 'horas_extra', 'producao', 'estoque', 'falta', 'custo')
+
+
+class PlanejadorHorizonte:
+    """Plano diário de operários e horas extras para um horizonte de dias.
+
+    Cada dia d decide operarios_d (inteiro, até operarios_maximos, jornada
+    horas_efetivas) e horas_extra_d (horas-operário, até horas_extra_maximas
+    por operário escalado). Produção = taxa * (operarios * horas_efetivas +
+    horas_extra); o estoque passa para o dia seguinte com custo_estoque e a
+    demanda não atendida paga penalidade_falta. Em cada semana (blocos de 7
+    dias a partir do dia 0) as horas extras somam no máximo horas_extra_semanais.
+    Minimiza mão de obra + hora extra + estoque + falta.
+
+    modo='rolante': janelas de `janela` dias, das quais só os `fixar`
+    primeiros entram no plano; a janela seguinte começa do estado (estoque e
+    horas extras da semana) deixado por elas. O custo de cada janela é fixo,
+    então o tempo cresce linearmente com o horizonte. Com um só processo,
+    cada janela é resolvida uma vez, em ordem, a partir do estado real. Com
+    vários, cada rodada resolve em paralelo até n_processos janelas a partir
+    da primeira ainda não confirmada: ela com o estado real e as seguintes com
+    estados estimados (o fim da janela anterior na rodada anterior, ou o
+    estado inicial); as janelas cujo estimado coincidiu com o real ficam
+    confirmadas (estados iguais a menos de 1e-6). O plano é o da execução
+    sequencial, a menos do ruído numérico do solver.
+    modo='monolitico': um único MILP com o horizonte inteiro (referência).
+    """
+
+    def __init__(self, parametros, demanda, estoque_inicial=0.0, horizonte=None,
+                 backend='auto', verificar=None):
+        self.parametros = parametros
+        self.demanda = np.asarray(demanda, dtype=float)
+        self.estoque_inicial = float(estoque_inicial)
+        self.horizonte = {**PARAMETROS_HORIZONTE, **(horizonte or {})}
+        self.backend = backend
+        self.verificar = verificar
+
+    @property
+    def n_dias(self):
+        return len(self.demanda)
+
+    def planejar(self, modo='rolante', janela=14, fixar=7, n_processos=None):
+        """Resolve o horizonte e retorna o plano diário em formato colunar"""
+        inicio = time.perf_counter()
+        if modo == 'monolitico':
+            solucao = _resolver_janela((self.parametros, self.horizonte, self.demanda, 0,
+                                        self._estado_inicial(), self.backend, self.verificar))
+            plano, resolucoes, rodadas, n_janelas = solucao['plano'], 1, 1, 1
+            status = solucao['status']
+        elif modo == 'rolante':
+            if not 0 < fixar <= janela:
+                raise ValueError("fixar deve estar entre 1 e janela")
+            plano, status, resolucoes, rodadas, n_janelas = self._planejar_rolante(janela, fixar, n_processos)
+        else:
+            raise ValueError(f"Modo desconhecido: {modo}")
+
+        custos = _custos(self.parametros, self.horizonte, plano)
+        return {
+            'plano': plano,
+            'custo_total': float(plano['custo'].sum()),
+            **custos,
+            'producao_total': float(plano['producao'].sum()),
+            'demanda_total': float(self.demanda.sum()),
+            'falta_total': float(plano['falta'].sum()),
+            'status': status,
+            'metodo': f'horizonte_{modo}',
+            'janelas': n_janelas,
+            'rodadas': rodadas,
+            'resolucoes': resolucoes,
+            'tempo': time.perf_counter() - inicio,
+        }
+
+    def _estado_inicial(self):
+        return {'estoque': self.estoque_inicial, 'extra_semana': 0.0}
+
+    def _planejar_rolante(self, janela, fixar, n_processos):
+        inicios = list(range(0, self.n_dias, fixar))
+        n_janelas = len(inicios)
+        n_processos = min(n_janelas, n_processos or os.cpu_count() or 1)
+
+        def tarefa(k, estado):
+            dia = inicios[k]
+            return (self.parametros, self.horizonte, self.demanda[dia:dia + janela], dia, estado,
+                    self.backend, self.verificar)
+
+        def estado_real(k):
+            return self._estado_inicial() if k == 0 else _estado_final(solucoes[k - 1], inicios[k - 1], fixar)
+
+        solucoes = [None] * n_janelas
+        if n_processos == 1:
+            # Sem processos para especular: cada janela uma vez, a partir do estado real
+            for k in range(n_janelas):
+                solucoes[k] = _resolver_janela(tarefa(k, estado_real(k)))
+            return self._montar_plano(solucoes, fixar, n_janelas, n_janelas, n_janelas)
+
+        estados = [self._estado_inicial() for _ in inicios]
+        resolucoes = rodadas = confirmadas = 0
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            while confirmadas < n_janelas:
+                lote = range(confirmadas, min(confirmadas + n_processos, n_janelas))
+                for k in lote:
+                    if k == confirmadas:
+                        estados[k] = estado_real(k)
+                    elif solucoes[k - 1] is not None:
+                        # Estimativa: o fim da janela anterior na rodada anterior
+                        estados[k] = _estado_final(solucoes[k - 1], inicios[k - 1], fixar)
+                novas = list(executor.map(_resolver_janela, [tarefa(k, estados[k]) for k in lote]))
+                for k, solucao in zip(lote, novas):
+                    solucoes[k] = solucao
+                resolucoes += len(novas)
+                rodadas += 1
+
+                # Confirma em ordem enquanto o estado estimado coincidir com o real
+                confirmadas += 1
+                while confirmadas < lote.stop and _mesmo_estado(estado_real(confirmadas), estados[confirmadas]):
+                    confirmadas += 1
+
+        return self._montar_plano(solucoes, fixar, resolucoes, rodadas, n_janelas)
+
+    @staticmethod
+    def _montar_plano(solucoes, fixar, resolucoes, rodadas, n_janelas):
+        plano = {coluna: np.concatenate([solucao['plano'][coluna][:fixar] for solucao in solucoes])
+                 for coluna in COLUNAS_PLANO}
+        status = 'Optimal' if all(solucao['status'] == 'Optimal' for solucao in solucoes) else 'Not Solved'
+        return plano, status, resolucoes, rodadas, n_janelas
+
+
+def modelo_janela(parametros, horizonte, demanda, dia_inicial, estado):
+    """MILP esparso de uma janela de dias, a partir de um estado (estoque, horas extras da semana)
+
+    Variáveis por dia, em blocos: [operarios | horas_extra | estoque | falta].
+    """
+    n = len(demanda)
+    taxa = float(parametros['taxa_producao'])
+    horas = float(parametros['horas_efetivas'])
+    custo_hora = float(parametros['custo_hora'])
+    identidade = sparse.eye_array(n, format='csr')
+    anterior = sparse.eye_array(n, k=-1, format='csr')
+    nula = sparse.csr_array((n, n))
+
+    # Balanço: estoque_d - estoque_d-1 - produção_d - falta_d = -demanda_d
+    balanco = sparse.hstack([-taxa * horas * identidade, -taxa * identidade, identidade - anterior,
+                             -identidade])
+    rhs_balanco = -np.asarray(demanda, dtype=float)
+    rhs_balanco[0] += estado['estoque']
+
+    # Hora extra só para operários escalados: horas_extra_d <= máximo * operarios_d
+    ligacao = sparse.hstack([-horizonte['horas_extra_maximas'] * identidade, identidade, nula, nula])
+
+    # Limite semanal, descontado o que os dias já fixados da semana usaram
+    semanas = (dia_inicial + np.arange(n)) // 7
+    semanas_unicas = np.unique(semanas)
+    indicador = sparse.csr_array((np.ones(n), (np.searchsorted(semanas_unicas, semanas), np.arange(n))),
+                                 shape=(len(semanas_unicas), n))
+    semanal = sparse.hstack([sparse.csr_array((len(semanas_unicas), n)), indicador,
+                             sparse.csr_array((len(semanas_unicas), 2 * n))])
+    disponivel = np.full(len(semanas_unicas), float(horizonte['horas_extra_semanais']))
+    if dia_inicial % 7:
+        disponivel[0] = max(0.0, disponivel[0] - estado['extra_semana'])
+
+    A = sparse.vstack([balanco, ligacao, semanal]).tocsr()
+    custos = np.concatenate([
+        np.full(n, custo_hora * horas),
+        np.full(n, custo_hora * horizonte['fator_hora_extra']),
+        np.full(n, float(horizonte['custo_estoque'])),
+        np.full(n, float(horizonte['penalidade_falta'])),
+    ])
+    dias = [f'{dia_inicial + d + 1}' for d in range(n)]
+    return ProblemaLinear(
+        c=-custos,
+        A=A,
+        lb_restricoes=np.concatenate([rhs_balanco, np.full(n, -np.inf), np.full(len(disponivel), -np.inf)]),
+        ub_restricoes=np.concatenate([rhs_balanco, np.zeros(n), disponivel]),
+        lb=np.zeros(4 * n),
+        ub=np.concatenate([np.full(n, float(parametros['operarios_maximos'])),
+                           np.full(n, np.inf),
+                           np.full(n, float(horizonte['capacidade_estoque'])),
+                           np.asarray(demanda, dtype=float)]),
+        inteiras=np.concatenate([np.ones(n, dtype=bool), np.zeros(3 * n, dtype=bool)]),
+        nome='Planejamento_Horizonte',
+        nomes_variaveis=([f'Operarios_{d}' for d in dias] + [f'Horas_Extra_{d}' for d in dias] +
+                         [f'Estoque_{d}' for d in dias] + [f'Falta_{d}' for d in dias]),
+        nomes_restricoes=([f'Balanco_{d}' for d in dias] + [f'Extra_Operarios_{d}' for d in dias] +
+                          [f'Extra_Semana_{s + 1}' for s in semanas_unicas])
+    )
+
+
+def demanda_exemplo(parametros, n_dias, semente=0):
+    """Demanda diária variável em torno da meta, sem produção aos domingos"""
+    rng = np.random.default_rng(semente)
+    dias = np.arange(n_dias)
+    sazonal = 1 + 0.15 * np.sin(2 * np.pi * dias / 28)
+    demanda = parametros['meta_diaria'] * sazonal * rng.uniform(0.7, 1.4, n_dias)
+    demanda[dias % 7 == 6] = 0.0
+    return np.round(demanda)
+
+
+def _resolver_janela(tarefa):
+    """Resolve uma janela (executado nos processos) e devolve o plano por dia"""
+    parametros, horizonte, demanda, dia_inicial, estado, backend, verificar = tarefa
+    n = len(demanda)
+    solucao = resolver(modelo_janela(parametros, horizonte, demanda, dia_inicial, estado),
+                       backend=backend, verificar=verificar)
+    if solucao['x'] is None:
+        x = np.zeros(4 * n)
+        x[3 * n:] = demanda  # sem solução: tudo vira falta
+    else:
+        x = np.maximum(np.asarray(solucao['x'], dtype=float), 0.0)  # limpa -0.0 e ruído do solver
+    operarios = np.round(x[:n])
+    horas_extra, estoque, falta = x[n:2 * n], x[2 * n:3 * n], x[3 * n:]
+    producao = parametros['taxa_producao'] * (operarios * parametros['horas_efetivas'] + horas_extra)
+    plano = {
+        'dia': dia_inicial + np.arange(n),
+        'demanda': np.asarray(demanda, dtype=float),
+        'operarios': operarios,
+        'horas_extra': horas_extra,
+        'producao': producao,
+        'estoque': estoque,
+        'falta': falta,
+    }
+    plano['custo'] = _custo_diario(parametros, horizonte, plano)
+    return {'plano': plano, 'status': solucao['status'], 'estado': estado}
+
+
+def _custo_diario(parametros, horizonte, plano):
+    return (parametros['custo_hora'] * (plano['operarios'] * parametros['horas_efetivas'] +
+                                        horizonte['fator_hora_extra'] * plano['horas_extra']) +
+            horizonte['custo_estoque'] * plano['estoque'] + horizonte['penalidade_falta'] * plano['falta'])
+
+
+def _custos(parametros, horizonte, plano):
+    return {
+        'custo_mao_obra': float((parametros['custo_hora'] * parametros['horas_efetivas'] *
+                                 plano['operarios']).sum()),
+        'custo_hora_extra': float((parametros['custo_hora'] * horizonte['fator_hora_extra'] *
+                                   plano['horas_extra']).sum()),
+        'custo_estoque': float((horizonte['custo_estoque'] * plano['estoque']).sum()),
+        'custo_falta': float((horizonte['penalidade_falta'] * plano['falta']).sum()),
+    }
+
+
+def _estado_final(solucao, dia_inicial, fixar):
+    """Estado ao fim dos dias fixados de uma janela"""
+    plano = solucao['plano']
+    fixados = min(fixar, len(plano['dia']))
+    fim = dia_inicial + fixados
+    # Horas extras já usadas na semana em que começa a próxima janela
+    semana = plano['dia'][:fixados] // 7 == fim // 7
+    extra_semana = float(plano['horas_extra'][:fixados][semana].sum())
+    if fim % 7 and dia_inicial // 7 == fim // 7:
+        extra_semana += solucao['estado']['extra_semana']
+    return {'estoque': float(plano['estoque'][fixados - 1]), 'extra_semana': extra_semana}
+
+
+def _mesmo_estado(a, b, tolerancia=1e-6):
+    return all(abs(a[chave] - b[chave]) <= tolerancia for chave in ('estoque', 'extra_semana'))
@@ -0,0 +1,167 @@
+"""
+Modelo PuLP incremental para análises "e se": alterações no lugar e warm start
+"""
+
+import time
+
+import numpy as np
+import pulp
+
+from models.instrumentacao import contar, etapa
+from models.otimizacao import OtimizadorProducao
+from models.solvers import modelo_pulp
+
+
+class ModeloIncremental:
+    """Mantém um LpProblem montado e aplica alterações nele sem reconstruí-lo.
+
+    metodo='horas_fixas' usa o modelo de otimizar_producao; 'horas_selecionadas'
+    usa o MILP de otimizar_com_horas_variaveis (com as opcoes_horas fixadas na
+    criação). Cada resolver() passa a solução anterior ao CBC como warm start.
+
+    Alterações de baixo nível (por nome de variável/restrição do ProblemaLinear):
+        alterar_limites('Operarios', ub=8)
+        alterar_restricao('Meta_Minima', lb=3500)
+        alterar_coeficiente('Meta_Minima', 'Operarios', 800)
+        alterar_objetivo('Operarios', 800)
+    E por parâmetro de PARAMETROS: alterar_parametros(meta_diaria=3500).
+    """
+
+    def __init__(self, parametros, metodo='horas_fixas', opcoes_horas=None, limite_tempo=None):
+        self.metodo = metodo
+        self.limite_tempo = limite_tempo
+        self.otimizador = OtimizadorProducao(parametros, cache=False)
+        self.opcoes_horas = self.otimizador._opcoes_horas(opcoes_horas)
+        self.resolucoes = 0
+
+        with etapa('montagem_modelo', modelo=f'incremental_{metodo}'):
+            self.problema = self._montar_problema(self.otimizador)
+            self._prob, self._variaveis = modelo_pulp(self.problema)
+        self._indice_variavel = {nome: j for j, nome in enumerate(self.problema.nomes_variaveis)}
+        self._indice_restricao = {nome: i for i, nome in enumerate(self.problema.nomes_restricoes)}
+        # Matriz densa espelhada: o diff de alterar_parametros compara com ela
+        self._A = _densa(self.problema.A)
+
+    @property
+    def parametros(self):
+        return self.otimizador.parametros
+
+    def _montar_problema(self, otimizador):
+        if self.metodo == 'horas_fixas':
+            return otimizador.modelo_horas_fixas(otimizador.parametros['horas_efetivas'])
+        if self.metodo == 'horas_selecionadas':
+            return otimizador.modelo_horas_selecionadas(self.opcoes_horas)
+        raise ValueError(f"Método desconhecido: {self.metodo}")
+
+    def alterar_limites(self, variavel, lb=None, ub=None):
+        """Novo limite inferior e/ou superior de uma variável"""
+        j = self._indice_variavel[variavel]
+        if lb is not None:
+            self.problema.lb[j] = lb
+            self._variaveis[j].lowBound = None if np.isinf(lb) else lb
+        if ub is not None:
+            self.problema.ub[j] = ub
+            self._variaveis[j].upBound = None if np.isinf(ub) else ub
+
+    def alterar_restricao(self, restricao, lb=None, ub=None):
+        """Novo lado direito (limite inferior e/ou superior) de uma restrição"""
+        i = self._indice_restricao[restricao]
+        if lb is not None:
+            self.problema.lb_restricoes[i] = lb
+        if ub is not None:
+            self.problema.ub_restricoes[i] = ub
+        for restricao_pulp, limite in self._restricoes_pulp(i):
+            restricao_pulp.changeRHS(limite)
+
+    def alterar_coeficiente(self, restricao, variavel, valor):
+        """Novo coeficiente da variável na restrição"""
+        i, j = self._indice_restricao[restricao], self._indice_variavel[variavel]
+        self._A[i, j] = valor
+        variavel_pulp = self._variaveis[j]
+        for restricao_pulp, _ in self._restricoes_pulp(i):
+            # Só get/addInPlace: a estrutura interna de LpConstraint muda entre versões do PuLP
+            atual = restricao_pulp.get(variavel_pulp, 0.0) or 0.0
+            restricao_pulp.addInPlace(float(valor - atual) * variavel_pulp)
+
+    def alterar_objetivo(self, variavel, valor):
+        """Novo coeficiente da variável no objetivo"""
+        j = self._indice_variavel[variavel]
+        self.problema.c[j] = valor
+        self._prob.objective[self._variaveis[j]] = valor
+
+    def alterar_parametros(self, **alteracoes):
+        """Aplica mudanças em PARAMETROS alterando só as entradas afetadas do modelo
+
+        Os coeficientes novos vêm dos mesmos métodos modelo_* do otimizador (uma
+        conta NumPy barata); o LpProblem não é reconstruído. Retorna o número
+        de entradas alteradas.
+        """
+        otimizador = OtimizadorProducao(dict(self.parametros, **alteracoes), cache=False)
+        novo = self._montar_problema(otimizador)
+        nomes_variaveis = self.problema.nomes_variaveis
+        nomes_restricoes = self.problema.nomes_restricoes
+        alteradas = 0
+
+        for j in np.flatnonzero(novo.c != self.problema.c):
+            self.alterar_objetivo(nomes_variaveis[j], novo.c[j])
+            alteradas += 1
+        for j in np.flatnonzero((novo.lb != self.problema.lb) | (novo.ub != self.problema.ub)):
+            self.alterar_limites(nomes_variaveis[j], novo.lb[j], novo.ub[j])
+            alteradas += 1
+        for i in np.flatnonzero((novo.lb_restricoes != self.problema.lb_restricoes) |
+                                (novo.ub_restricoes != self.problema.ub_restricoes)):
+            self.alterar_restricao(nomes_restricoes[i], novo.lb_restricoes[i], novo.ub_restricoes[i])
+            alteradas += 1
+        for i, j in zip(*np.nonzero(_densa(novo.A) != self._A)):
+            self.alterar_coeficiente(nomes_restricoes[i], nomes_variaveis[j], novo.A[i, j])
+            alteradas += 1
+
+        self.otimizador = otimizador
+        contar('alteracoes_incrementais', alteradas)
+        return alteradas
+
+    def resolver(self):
+        """Resolve com a solução anterior como ponto de partida; mesmo contrato do otimizador"""
+        inicio = time.perf_counter()
+        with etapa('solver', backend='cbc_incremental'):
+            self._prob.solve(pulp.PULP_CBC_CMD(msg=False, warmStart=self.resolucoes > 0,
+                                               timeLimit=self.limite_tempo))
+        self.resolucoes += 1
+
+        status = pulp.LpStatus[self._prob.status]
+        x = None
+        if status == 'Optimal':
+            x = np.array([variavel.value() or 0.0 for variavel in self._variaveis])
+        solucao = {'status': status, 'x': x,
+                   'objetivo': None if x is None else float(self.problema.c @ x),
+                   'backend': 'cbc', 'tempo_solver': time.perf_counter() - inicio}
+
+        if self.metodo == 'horas_fixas':
+            return self.otimizador.resultado_horas_fixas(solucao, self.parametros['horas_efetivas'])
+        return self.otimizador.resultado_horas_selecionadas(solucao, self.opcoes_horas)
+
+    def _restricoes_pulp(self, i):
+        """Restrições PuLP da linha i com o limite que cada uma representa"""
+        lb, ub = self.problema.lb_restricoes[i], self.problema.ub_restricoes[i]
+        restricoes = self._prob.constraints
+        if f'R_{i}' in restricoes:
+            # Linha criada como igualdade; continua igualdade só se lb == ub
+            if lb != ub:
+                raise ValueError("Não é possível transformar uma igualdade em intervalo no lugar")
+            return [(restricoes[f'R_{i}'], lb)]
+        pares = []
+        for sufixo, limite in (('inf', lb), ('sup', ub)):
+            nome = f'R_{i}_{sufixo}'
+            if nome in restricoes:
+                if not np.isfinite(limite):
+                    raise ValueError(f"Limite de {self.problema.nomes_restricoes[i]} ficou infinito: "
+                                     "remover a restrição exige remontar o modelo")
+                pares.append((restricoes[nome], limite))
+            elif np.isfinite(limite):
+                raise ValueError(f"Limite novo em {self.problema.nomes_restricoes[i]}: "
+                                 "a restrição não existe no modelo montado")
+        return pares
+
+
+def _densa(A):
+    return A.toarray() if hasattr(A, 'toarray') else np.array(A, dtype=float)
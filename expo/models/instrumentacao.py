@@ -0,0 +1,181 @@
+"""
+Instrumentação das etapas do pipeline: cronômetros, contadores e cProfile opcional
+Exporta em JSON lines e no formato texto do Prometheus (textfile do node exporter)
+
+Desligada por padrão: etapa() devolve um contexto vazio compartilhado e
+contar() retorna na primeira linha, então o custo é uma chamada de função.
+Liga com ativar() ou com a variável de ambiente OTIMIZACAO_METRICAS=1.
+As medições feitas dentro de processos filhos (ProcessPoolExecutor) não
+voltam para o processo principal.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import re
+import time
+
+# Prefixo das métricas no formato do Prometheus
+PREFIXO = 'otimizacao'
+
+_NULO = contextlib.nullcontext()
+
+_estado = {
+    'ativo': os.environ.get('OTIMIZACAO_METRICAS', '') not in ('', '0'),
+    'diretorio_perfis': None,
+    'perfilando': False,
+}
+_eventos = []
+_duracoes = {}
+_contadores = {}
+
+
+def ativar(diretorio_perfis=None):
+    """Liga a coleta; com diretorio_perfis, grava um .prof (cProfile) por etapa
+
+    Só há um profiler ativo por vez: as etapas aninhadas entram no .prof da
+    etapa mais externa em andamento.
+    """
+    _estado['ativo'] = True
+    _estado['diretorio_perfis'] = diretorio_perfis
+    if diretorio_perfis:
+        os.makedirs(diretorio_perfis, exist_ok=True)
+
+
+def desativar():
+    _estado['ativo'] = False
+    _estado['diretorio_perfis'] = None
+
+
+def ativo():
+    return _estado['ativo']
+
+
+def limpar():
+    """Descarta os eventos e agregados coletados até aqui"""
+    _eventos.clear()
+    _duracoes.clear()
+    _contadores.clear()
+
+
+def etapa(nome, **rotulos):
+    """Contexto que cronometra uma etapa (e a perfila, se pedido)
+
+        with etapa('solver', backend='highs'):
+            ...
+    """
+    if not _estado['ativo']:
+        return _NULO
+    return _medir(nome, rotulos)
+
+
+def contar(nome, valor=1, **rotulos):
+    """Soma valor ao contador (nome, rótulos)"""
+    if not _estado['ativo']:
+        return
+    chave = (nome, _rotulos_ordenados(rotulos))
+    _contadores[chave] = _contadores.get(chave, 0) + valor
+    _eventos.append({'tipo': 'contador', 'nome': nome, 'rotulos': rotulos, 'valor': valor,
+                     'instante': time.time()})
+
+
+@contextlib.contextmanager
+def _medir(nome, rotulos):
+    perfil = None
+    if _estado['diretorio_perfis'] and not _estado['perfilando']:
+        perfil = cProfile.Profile()
+        perfil.enable()
+        _estado['perfilando'] = True
+    instante = time.time()
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        yield
+    except BaseException as excecao:
+        erro = type(excecao).__name__
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        if perfil is not None:
+            perfil.disable()
+            _estado['perfilando'] = False
+            perfil.dump_stats(os.path.join(_estado['diretorio_perfis'],
+                                           f"{_nome_arquivo(nome, rotulos)}-{len(_eventos)}.prof"))
+        chave = (nome, _rotulos_ordenados(rotulos))
+        soma, contagem = _duracoes.get(chave, (0.0, 0))
+        _duracoes[chave] = (soma + duracao, contagem + 1)
+        evento = {'tipo': 'etapa', 'nome': nome, 'rotulos': rotulos, 'instante': instante,
+                  'duracao': duracao}
+        if erro:
+            evento['erro'] = erro
+        _eventos.append(evento)
+
+
+def resumo():
+    """Agregados por etapa e por contador: {'etapas': [...], 'contadores': [...]}"""
+    return {
+        'etapas': [{'nome': nome, 'rotulos': dict(rotulos), 'total': soma, 'chamadas': contagem}
+                   for (nome, rotulos), (soma, contagem) in _duracoes.items()],
+        'contadores': [{'nome': nome, 'rotulos': dict(rotulos), 'valor': valor}
+                       for (nome, rotulos), valor in _contadores.items()],
+    }
+
+
+def exportar_jsonl(caminho):
+    """Acrescenta os eventos coletados ao arquivo, um JSON por linha"""
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        for evento in _eventos:
+            arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+
+
+def exportar_prometheus(caminho):
+    """Grava os agregados no formato texto do Prometheus
+
+    A escrita é atômica (arquivo temporário + os.replace), como pede o
+    coletor textfile do node exporter.
+    """
+    linhas = [
+        f'# HELP {PREFIXO}_etapa_segundos Tempo gasto em cada etapa do pipeline',
+        f'# TYPE {PREFIXO}_etapa_segundos summary',
+    ]
+    for (nome, rotulos), (soma, contagem) in sorted(_duracoes.items()):
+        texto = _rotulos_prometheus((('etapa', nome),) + rotulos)
+        linhas.append(f'{PREFIXO}_etapa_segundos_sum{texto} {soma:.9f}')
+        linhas.append(f'{PREFIXO}_etapa_segundos_count{texto} {contagem}')
+
+    nomes = sorted({nome for nome, _ in _contadores})
+    for nome in nomes:
+        metrica = f'{PREFIXO}_{_nome_metrica(nome)}_total'
+        linhas.append(f'# TYPE {metrica} counter')
+        for (nome_contador, rotulos), valor in sorted(_contadores.items()):
+            if nome_contador == nome:
+                linhas.append(f'{metrica}{_rotulos_prometheus(rotulos)} {valor}')
+
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas) + '\n')
+    os.replace(temporario, caminho)
+
+
+def _rotulos_ordenados(rotulos):
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def _rotulos_prometheus(rotulos):
+    if not rotulos:
+        return ''
+    pares = []
+    for chave, valor in rotulos:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{_nome_metrica(chave)}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+
+def _nome_metrica(nome):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', nome)
+
+
+def _nome_arquivo(nome, rotulos):
+    partes = [nome] + [f'{chave}={valor}' for chave, valor in _rotulos_ordenados(rotulos)]
+    return re.sub(r'[^a-zA-Z0-9_=.-]', '_', '_'.join(partes))
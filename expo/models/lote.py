@@ -0,0 +1,190 @@
+"""
+Otimização em lote de muitos conjuntos de parâmetros lidos de arquivo
+Blocos distribuídos entre processos; resultados gravados à medida que ficam prontos
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from data.carregador import identificadores, ler_blocos, parametros_da_linha
+from models.otimizacao import OtimizadorProducao
+
+# Colunas de resultado gravadas para cada conjunto de parâmetros
+COLUNAS_RESULTADO = ('operarios_ideais', 'horas_ideais', 'producao_maxima', 'meta_atingida',
+                     'custo_total', 'status')
+
+
+def otimizar_arquivo(entrada, saida, metodo='fixas', n_processos=None, tamanho_bloco=500,
+                     blocos_pendentes=None, backend='auto', padroes=None, progresso=None):
+    """Otimiza cada linha de `entrada` e grava os resultados em `saida`.
+
+    entrada: .csv, .json, .jsonl ou .parquet (veja data/carregador.py).
+    saida: .csv, .jsonl ou .parquet (requer pyarrow); uma linha por conjunto,
+    com 'indice' (linha de entrada), os identificadores e COLUNAS_RESULTADO.
+    Linhas com valores ilegíveis ficam com status 'Invalido' e as inviáveis
+    com 'Infeasible'; nas duas, as colunas numéricas saem vazias (CSV), null
+    (JSON lines) ou NaN (Parquet). Os blocos são gravados na ordem em que
+    terminam, não na de entrada.
+
+    No máximo `blocos_pendentes` blocos (padrão: 2 por processo) ficam lidos
+    e não gravados ao mesmo tempo, então a memória não cresce com o tamanho
+    da entrada. progresso(resumo) é chamado após cada bloco gravado.
+    """
+    n_processos = n_processos or os.cpu_count() or 1
+    blocos_pendentes = blocos_pendentes or 2 * n_processos
+    blocos = ler_blocos(entrada, tamanho_bloco, padroes)
+    resumo = {'conjuntos': 0, 'blocos': 0, 'viaveis': 0, 'invalidos': 0, 'tempo': 0.0}
+    inicio = time.perf_counter()
+
+    def registrar(resultado):
+        escritor.gravar(resultado)
+        resumo['conjuntos'] += len(resultado)
+        resumo['blocos'] += 1
+        resumo['viaveis'] += int((resultado['status'] == 'Optimal').sum())
+        resumo['invalidos'] += int((resultado['status'] == 'Invalido').sum())
+        resumo['tempo'] = time.perf_counter() - inicio
+        if progresso is not None:
+            progresso(dict(resumo))
+
+    with _Escritor.abrir(saida) as escritor:
+        if n_processos == 1:
+            for bloco in blocos:
+                registrar(_otimizar_bloco((bloco, metodo, backend, padroes)))
+            return resumo
+
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            pendentes = set()
+            for bloco in blocos:
+                pendentes.add(executor.submit(_otimizar_bloco, (bloco, metodo, backend, padroes)))
+                if len(pendentes) >= blocos_pendentes:
+                    prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        registrar(futuro.result())
+            while pendentes:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    registrar(futuro.result())
+    return resumo
+
+
+def _otimizar_bloco(tarefa):
+    """Otimiza as linhas de um bloco (executado nos processos)"""
+    bloco, metodo, backend, padroes = tarefa
+    nomes = identificadores(bloco)
+    tipo = np.dtype([('indice', 'i8')] + [(nome, bloco.dtype[nome]) for nome in nomes] +
+                    [('operarios_ideais', 'f8'), ('horas_ideais', 'f8'), ('producao_maxima', 'f8'),
+                     ('meta_atingida', '?'), ('custo_total', 'f8'), ('status', 'U16')])
+    resultado = np.zeros(len(bloco), dtype=tipo)
+    resultado['indice'] = bloco['indice']
+    for nome in nomes:
+        resultado[nome] = bloco[nome]
+    for coluna in ('operarios_ideais', 'horas_ideais', 'producao_maxima', 'custo_total'):
+        resultado[coluna] = np.nan
+
+    for i, linha in enumerate(bloco):
+        if not linha['valido']:
+            resultado['status'][i] = 'Invalido'
+            continue
+        # Sem cache: milhares de conjuntos distintos só ocupariam memória
+        otimizador = OtimizadorProducao(parametros_da_linha(linha, padroes), cache=False,
+                                        backend=backend)
+        if metodo == 'variaveis':
+            saida = otimizador.otimizar_com_horas_variaveis()
+        else:
+            saida = otimizador.otimizar_producao()
+        if saida is None or saida['status'] != 'Optimal':
+            resultado['status'][i] = 'Infeasible' if saida is None else saida['status']
+            continue
+        for coluna in COLUNAS_RESULTADO:
+            if coluna != 'custo_total':
+                resultado[coluna][i] = saida[coluna]
+        resultado['custo_total'][i] = otimizador.calcular_custo(saida['operarios_ideais'],
+                                                                saida['horas_ideais'])
+    return resultado
+
+
+def _linhas(bloco):
+    """Linhas do bloco como tuplas nativas, com None no lugar de NaN"""
+    for linha in bloco.tolist():
+        yield tuple(None if isinstance(valor, float) and valor != valor else valor for valor in linha)
+
+
+class _Escritor:
+    """Grava blocos de resultado (arrays estruturados) em CSV, JSON lines ou Parquet"""
+
+    @staticmethod
+    def abrir(caminho):
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao == '.csv':
+            return _EscritorCSV(caminho)
+        if extensao in ('.jsonl', '.ndjson'):
+            return _EscritorJSONL(caminho)
+        if extensao == '.parquet':
+            return _EscritorParquet(caminho)
+        raise ValueError(f"Formato de saída não suportado: '{extensao}' (use .csv, .jsonl ou .parquet)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+class _EscritorCSV(_Escritor):
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+        self._csv = csv.writer(self._arquivo)
+        self._cabecalho = False
+
+    def gravar(self, bloco):
+        if not self._cabecalho:
+            self._csv.writerow(bloco.dtype.names)
+            self._cabecalho = True
+        self._csv.writerows(_linhas(bloco))
+        self._arquivo.flush()
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class _EscritorJSONL(_Escritor):
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+
+    def gravar(self, bloco):
+        nomes = bloco.dtype.names
+        self._arquivo.writelines(json.dumps(dict(zip(nomes, linha)), ensure_ascii=False) + '\n'
+                                 for linha in _linhas(bloco))
+        self._arquivo.flush()
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class _EscritorParquet(_Escritor):
+    """Cada bloco vira um row group do mesmo arquivo"""
+
+    def __init__(self, caminho):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Gravação de Parquet requer o pacote pyarrow (pip install pyarrow)") from None
+        self._pa, self._pq = pa, pq
+        self._caminho = caminho
+        self._escritor = None
+
+    def gravar(self, bloco):
+        tabela = self._pa.table({nome: bloco[nome] for nome in bloco.dtype.names})
+        if self._escritor is None:
+            self._escritor = self._pq.ParquetWriter(self._caminho, tabela.schema)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
@@ -0,0 +1,181 @@
+"""
+Otimização de produção com várias linhas e vários produtos (SKUs)
+Matriz de restrições montada diretamente em formato esparso (SciPy/HiGHS)
+"""
+
+import numpy as np
+from scipy import sparse
+
+from models.instrumentacao import etapa
+from models.solvers import ProblemaLinear, resolver
+
+
+class OtimizadorMultiLinha:
+    """Aloca operários em L linhas que fabricam P produtos.
+
+    Parâmetros (dicionário):
+      taxas             matriz L x P (densa ou esparsa) em unidades/hora/operário;
+                        zero indica que a linha não fabrica o produto
+      demanda           vetor P com a produção mínima diária de cada produto
+      operarios_maximos escalar ou vetor L
+      horas_efetivas    escalar ou vetor L
+      operarios_totais  (opcional) limite de operários somando todas as linhas
+      custo_hora        R$/hora por operário
+
+    Variáveis: operários inteiros por linha e homem-hora contínuo por par
+    (linha, produto) elegível. Só os pares com taxa > 0 viram colunas, então o
+    tamanho do modelo acompanha o número de pares elegíveis.
+    """
+
+    def __init__(self, parametros, backend='auto', verificar=None):
+        self.parametros = parametros
+        self.backend = backend
+        self.verificar = verificar
+
+    @classmethod
+    def a_partir_de_parametros(cls, parametros):
+        """Constrói o caso de uma linha e um produto a partir de PARAMETROS"""
+        return cls({
+            'taxas': np.array([[parametros['taxa_producao']]], dtype=float),
+            'demanda': np.array([parametros['meta_diaria']], dtype=float),
+            'operarios_maximos': parametros['operarios_maximos'],
+            'horas_efetivas': parametros['horas_efetivas'],
+            'custo_hora': parametros['custo_hora'],
+        })
+
+    def montar_modelo(self):
+        """Monta o ProblemaLinear (matriz CSR) e os metadados para ler a solução"""
+        taxas = sparse.coo_array(self.parametros['taxas'])
+        n_linhas, n_produtos = taxas.shape
+
+        elegiveis = taxas.data > 0
+        linha = taxas.row[elegiveis].astype(np.int64)
+        produto = taxas.col[elegiveis].astype(np.int64)
+        taxa = taxas.data[elegiveis].astype(float)
+        n_pares = len(taxa)
+
+        horas = np.broadcast_to(np.asarray(self.parametros['horas_efetivas'], dtype=float), n_linhas)
+        operarios_maximos = np.broadcast_to(
+            np.asarray(self.parametros['operarios_maximos'], dtype=float), n_linhas)
+        demanda = np.broadcast_to(np.asarray(self.parametros['demanda'], dtype=float), n_produtos)
+
+        # Colunas: [homem-hora por par elegível | operários por linha]
+        col_pares = np.arange(n_pares)
+        col_operarios = n_pares + np.arange(n_linhas)
+
+        # Linhas 0..L-1: soma do homem-hora da linha <= horas * operários da linha
+        # Linhas L..L+P-1: produção de cada produto >= demanda
+        linhas_matriz = [linha, np.arange(n_linhas), n_linhas + produto]
+        colunas_matriz = [col_pares, col_operarios, col_pares]
+        valores = [np.ones(n_pares), -horas, taxa]
+        limite_inferior = [np.full(n_linhas, -np.inf), demanda]
+        limite_superior = [np.zeros(n_linhas), np.full(n_produtos, np.inf)]
+        n_restricoes = n_linhas + n_produtos
+
+        operarios_totais = self.parametros.get('operarios_totais')
+        if operarios_totais is not None:
+            linhas_matriz.append(np.full(n_linhas, n_restricoes))
+            colunas_matriz.append(col_operarios)
+            valores.append(np.ones(n_linhas))
+            limite_inferior.append([-np.inf])
+            limite_superior.append([operarios_totais])
+            n_restricoes += 1
+
+        matriz = sparse.csr_array(
+            (np.concatenate(valores), (np.concatenate(linhas_matriz), np.concatenate(colunas_matriz))),
+            shape=(n_restricoes, n_pares + n_linhas))
+
+        problema = ProblemaLinear(
+            c=np.concatenate([taxa, np.zeros(n_linhas)]),
+            A=matriz,
+            lb_restricoes=np.concatenate(limite_inferior),
+            ub_restricoes=np.concatenate(limite_superior),
+            lb=np.zeros(n_pares + n_linhas),
+            ub=np.concatenate([np.full(n_pares, np.inf), operarios_maximos]),
+            inteiras=np.concatenate([np.zeros(n_pares, dtype=bool), np.ones(n_linhas, dtype=bool)]),
+            nome='Maximizar_Producao_Multi_Linha'
+        )
+
+        return {
+            'problema': problema,
+            'pares': (linha, produto, taxa),
+            'dimensoes': (n_linhas, n_produtos),
+            'horas': horas,
+            'demanda': demanda,
+        }
+
+    def otimizar_producao(self, limite_tempo=None):
+        """Maximiza a produção total atendendo a demanda de cada produto"""
+
+        with etapa('montagem_modelo', modelo='multi_linha'):
+            modelo = self.montar_modelo()
+        solucao = resolver(modelo['problema'], backend=self.backend, verificar=self.verificar,
+                           limite_tempo=limite_tempo)
+
+        return self._resultado(modelo, solucao)
+
+    def _resultado(self, modelo, solucao):
+        """Converte a solução no mesmo contrato de otimizar_producao"""
+        linha, produto, taxa = modelo['pares']
+        n_linhas, n_produtos = modelo['dimensoes']
+        status = solucao['status']
+
+        if solucao['x'] is None:
+            operarios_linha = np.zeros(n_linhas)
+            homem_hora = np.zeros(len(taxa))
+        else:
+            operarios_linha = np.round(solucao['x'][len(taxa):])
+            homem_hora = solucao['x'][:len(taxa)]
+
+        producao_produto = np.bincount(produto, weights=taxa * homem_hora, minlength=n_produtos)
+        operarios_total = float(operarios_linha.sum())
+        horas_pagas = float((operarios_linha * modelo['horas']).sum())
+
+        return {
+            'operarios_ideais': operarios_total,
+            'horas_ideais': horas_pagas / operarios_total if operarios_total else 0.0,
+            'producao_maxima': float(producao_produto.sum()),
+            'meta_atingida': bool(status == 'Optimal' and
+                                  np.all(producao_produto >= modelo['demanda'] - 1e-6)),
+            'status': status,
+            'metodo': 'multi_linha',
+            'operarios_por_linha': operarios_linha,
+            'producao_por_produto': producao_produto,
+        }
+
+    def calcular_custo(self, operarios, horas):
+        """Calcula o custo total da produção"""
+        return operarios * horas * self.parametros['custo_hora']
+
+
+def instancia_sintetica(n_linhas, n_produtos, densidade=0.1, semente=0):
+    """Gera parâmetros aleatórios de uma planta com várias linhas e produtos"""
+    rng = np.random.default_rng(semente)
+
+    # Cada produto tem uma linha garantida, mais pares aleatórios até a densidade
+    # pedida. Os extras saem sem reposição só entre as (n_linhas - 1) linhas não
+    # garantidas de cada produto: sem pares repetidos, que o COO somaria
+    garantidas = rng.integers(0, n_linhas, n_produtos)
+    n_extras = min(max(0, int(densidade * n_linhas * n_produtos) - n_produtos), n_produtos * (n_linhas - 1))
+    extras = rng.choice(n_produtos * (n_linhas - 1), n_extras, replace=False)
+    produtos_extras, outra_linha = np.divmod(extras, max(n_linhas - 1, 1))
+    linhas_extras = outra_linha + (outra_linha >= garantidas[produtos_extras])
+    linhas = np.concatenate([garantidas, linhas_extras])
+    produtos = np.concatenate([np.arange(n_produtos), produtos_extras])
+    taxas = sparse.coo_array((rng.uniform(20, 150, len(linhas)), (linhas, produtos)),
+                             shape=(n_linhas, n_produtos)).tocsr()
+
+    operarios_maximos = rng.integers(4, 12, n_linhas)
+    horas_efetivas = np.full(n_linhas, 7.0)
+    # Demanda folgada: 30% da capacidade da planta na menor taxa, repartida entre os produtos
+    capacidade = float((operarios_maximos * horas_efetivas).sum()) * 20
+    demanda = rng.uniform(0.2, 1.0, n_produtos)
+    demanda *= 0.3 * capacidade / demanda.sum()
+
+    return {
+        'taxas': taxas,
+        'demanda': demanda,
+        'operarios_maximos': operarios_maximos,
+        'horas_efetivas': horas_efetivas,
+        'custo_hora': 18.00,
+    }
@@ -3,101 +3,343 @@ Modelo de otimização de produção usando Programação Linear
 VERSÃO CORRIGIDA - Sem multiplicação de variáveis
 """
 
-import pulp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
+from models import analitico
+from models.cache import CACHE_PADRAO, SEM_SOLUCAO
+from models.instrumentacao import contar, etapa
+from models.solvers import ProblemaLinear, resolver
+
+# Jornadas testadas por otimizar_com_horas_variaveis quando nada é configurado
+OPCOES_HORAS_PADRAO = [6, 7, 8, 9]
+
 class OtimizadorProducao:
-    def __init__(self, parametros):
+    def __init__(self, parametros, cache=True, backend='auto', verificar=None):
         self.parametros = parametros
+        # cache=True usa o cache compartilhado; False desliga; ou uma CacheSolucoes
+        self.cache = CACHE_PADRAO if cache is True else (cache or None)
+        # backend: 'auto', 'analitico', 'highs' ou 'cbc' (veja models/solvers.py);
+        # verificar: outro backend para conferir cada solução
+        self.backend = backend
+        self.verificar = verificar
         
     def otimizar_producao(self):
         """Otimiza a produção usando horas fixas - MÉTODO PRINCIPAL"""
+        return self._com_cache('otimizar_producao', self._resolver_horas_fixas)
+    
+    def _resolver_horas_fixas(self, horas=None, metodo='horas_fixas'):
+        """Monta e resolve o modelo com horas fixas"""
         
-        prob = pulp.LpProblem("Maximizar_Producao", pulp.LpMaximize)
+        # Horas são fixas (por padrão, as horas efetivas disponíveis)
+        horas_fixas = self.parametros['horas_efetivas'] if horas is None else horas
         
-        # Variável: número de operários
-        operarios = pulp.LpVariable('Operarios', lowBound=0, 
-                                  upBound=self.parametros['operarios_maximos'], 
-                                  cat='Integer')
+        with etapa('montagem_modelo', modelo='horas_fixas'):
+            problema = self.modelo_horas_fixas(horas_fixas)
+        solucao = self._resolver(problema)
         
-        # Horas são fixas (usamos as horas efetivas disponíveis)
-        horas_fixas = self.parametros['horas_efetivas']
+        return self.resultado_horas_fixas(solucao, horas_fixas, metodo)
+    
+    def resultado_horas_fixas(self, solucao, horas_fixas, metodo='horas_fixas'):
+        """Converte a solução do modelo de horas fixas no dicionário de resultado"""
+        operarios = float(solucao['x'][0]) if solucao['x'] is not None else 0.0
+        producao = float(self.parametros['taxa_producao'] * operarios * horas_fixas)
+        resultado = {
+            'operarios_ideais': operarios,
+            'horas_ideais': horas_fixas,
+            'producao_maxima': producao,
+            'meta_atingida': producao >= self.parametros['meta_diaria'],
+            'status': solucao['status'],
+            'metodo': metodo
+        }
         
-        # Função objetivo: Maximizar produção (agora é linear)
-        producao_total = self.parametros['taxa_producao'] * operarios * horas_fixas
-        prob += producao_total, "Producao_Total"
+        return resultado
+    
+    def modelo_horas_fixas(self, horas):
+        """Modelo com uma variável (operários) e horas fixas"""
         
-        # Restrição: Produção deve atender meta mínima
-        prob += producao_total >= self.parametros['meta_diaria'], "Meta_Minima"
+        # Produção = taxa * horas * operários, maximizada e limitada pela meta mínima
+        producao_por_operario = self.parametros['taxa_producao'] * horas
+        return ProblemaLinear(
+            c=[producao_por_operario],
+            A=np.array([[producao_por_operario]]),
+            lb_restricoes=[self.parametros['meta_diaria']],
+            ub_restricoes=[np.inf],
+            lb=[0],
+            ub=[self.parametros['operarios_maximos']],
+            inteiras=[True],
+            nome='Maximizar_Producao',
+            nomes_variaveis=['Operarios'],
+            nomes_restricoes=['Meta_Minima']
+        )
+    
+    def otimizar_com_horas_variaveis(self, opcoes_horas=None, modo='milp', n_processos=None):
+        """Alternativa: Escolher a melhor entre várias opções discretas de horas
         
-        # Resolver o problema
-        prob.solve()
+        modo='milp' resolve um único modelo inteiro em que a escolha das horas
+        é feita por variáveis binárias de seleção. modo='decomposicao' resolve
+        um modelo por opção de horas, distribuídos entre n_processos.
+        Retorna None se nenhuma opção atingir a meta.
+        """
+        opcoes_horas = self._opcoes_horas(opcoes_horas)
         
-        # Coletar resultados
-        resultado = {
-            'operarios_ideais': pulp.value(operarios),
-            'horas_ideais': horas_fixas,
-            'producao_maxima': pulp.value(producao_total),
-            'meta_atingida': pulp.value(producao_total) >= self.parametros['meta_diaria'],
-            'status': pulp.LpStatus[prob.status],
-            'metodo': 'horas_fixas'
+        if modo == 'milp':
+            resolver = lambda: self._resolver_horas_selecionadas(opcoes_horas)
+        elif modo == 'decomposicao':
+            resolver = lambda: self._resolver_horas_decompostas(opcoes_horas, n_processos)
+        else:
+            raise ValueError(f"Modo desconhecido: {modo}")
+        
+        return self._com_cache('otimizar_com_horas_variaveis', resolver, opcoes_horas=opcoes_horas)
+    
+    @property
+    def opcoes_horas(self):
+        """Opções de horas do turno: PARAMETROS['opcoes_horas'] ou o padrão, ordenadas"""
+        return sorted(set(self.parametros.get('opcoes_horas', OPCOES_HORAS_PADRAO)))
+
+    def _opcoes_horas(self, opcoes_horas=None):
+        """Opções de horas do turno: argumento ou self.opcoes_horas"""
+        return self.opcoes_horas if opcoes_horas is None else sorted(set(opcoes_horas))
+    
+    def _resolver_horas_selecionadas(self, opcoes_horas):
+        """Um único MILP: uma binária por opção de horas seleciona a jornada"""
+        
+        with etapa('montagem_modelo', modelo='horas_selecionadas'):
+            problema = self.modelo_horas_selecionadas(opcoes_horas)
+        solucao = self._resolver(problema)
+        
+        return self.resultado_horas_selecionadas(solucao, opcoes_horas)
+    
+    def resultado_horas_selecionadas(self, solucao, opcoes_horas):
+        """Converte a solução do MILP de seleção de jornada (None se inviável)"""
+        if solucao['status'] != 'Optimal':
+            return None
+        
+        n_opcoes = len(opcoes_horas)
+        operarios, escolha = solucao['x'][:n_opcoes], solucao['x'][n_opcoes:]
+        indice = int(np.argmax(escolha))
+        horas = opcoes_horas[indice]
+        producao = float(self.parametros['taxa_producao'] * horas * np.round(operarios[indice]))
+        
+        return {
+            'operarios_ideais': float(np.round(operarios[indice])),
+            'horas_ideais': horas,
+            'producao_maxima': producao,
+            'meta_atingida': producao >= self.parametros['meta_diaria'],
+            'status': solucao['status'],
+            'metodo': 'horas_discretas'
         }
+    
+    def modelo_horas_selecionadas(self, opcoes_horas):
+        """MILP de seleção de jornada
         
-        return resultado
+        Variáveis: [operários por opção de horas (k) | escolha binária por opção (k)].
+        Restrições: exatamente uma jornada; operários só na jornada escolhida;
+        produção >= meta.
+        """
+        
+        k = len(opcoes_horas)
+        operarios_maximos = self.parametros['operarios_maximos']
+        producao_por_operario = self.parametros['taxa_producao'] * np.asarray(opcoes_horas, dtype=float)
+        
+        A = np.zeros((k + 2, 2 * k))
+        A[0, k:] = 1                                        # Uma_Jornada
+        A[1:k + 1, :k] = np.eye(k)                          # Ativa_h: operarios_h - max * escolha_h <= 0
+        A[1:k + 1, k:] = -operarios_maximos * np.eye(k)
+        A[k + 1, :k] = producao_por_operario                # Meta_Minima
+        
+        return ProblemaLinear(
+            c=np.concatenate([producao_por_operario, np.zeros(k)]),
+            A=A,
+            lb_restricoes=np.concatenate([[1], np.full(k, -np.inf), [self.parametros['meta_diaria']]]),
+            ub_restricoes=np.concatenate([[1], np.zeros(k), [np.inf]]),
+            lb=np.zeros(2 * k),
+            ub=np.concatenate([np.full(k, operarios_maximos), np.ones(k)]),
+            inteiras=np.ones(2 * k, dtype=bool),
+            nome='Maximizar_Producao_Horas_Variaveis',
+            nomes_variaveis=[f'Operarios_{h}h' for h in opcoes_horas] + [f'Escolha_{h}h' for h in opcoes_horas],
+            nomes_restricoes=['Uma_Jornada'] + [f'Ativa_{h}h' for h in opcoes_horas] + ['Meta_Minima']
+        )
     
-    def otimizar_com_horas_variaveis(self):
-        """Alternativa: Usar diferentes combinações de horas discretas"""
+    def _resolver_horas_decompostas(self, opcoes_horas, n_processos=None):
+        """Resolve um modelo por opção de horas (em paralelo) e fica com o melhor"""
+        
+        tarefas = [(self.parametros, horas, self.backend, self.verificar) for horas in opcoes_horas]
+        if n_processos == 1 or len(tarefas) <= 1:
+            resultados = list(map(_resolver_opcao_horas, tarefas))
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                resultados = list(executor.map(_resolver_opcao_horas, tarefas))
         
         melhor_resultado = None
         melhor_producao = 0
         
-        # Testar diferentes horas discretas
-        for horas in [6, 7, 8, 9]:
-            prob = pulp.LpProblem(f"Maximizar_Producao_{horas}h", pulp.LpMaximize)
-            
-            operarios = pulp.LpVariable('Operarios', lowBound=0, 
-                                      upBound=self.parametros['operarios_maximos'], 
-                                      cat='Integer')
-            
-            # Produção com horas fixas para esta iteração
-            producao_total = self.parametros['taxa_producao'] * operarios * horas
-            prob += producao_total, "Producao_Total"
-            
-            # Restrição de meta
-            prob += producao_total >= self.parametros['meta_diaria'], "Meta_Minima"
-            
-            # Resolver
-            prob.solve()
-            
-            producao_atual = pulp.value(producao_total)
-            
-            # Encontrar a melhor combinação
-            if producao_atual > melhor_producao:
-                melhor_producao = producao_atual
-                melhor_resultado = {
-                    'operarios_ideais': pulp.value(operarios),
-                    'horas_ideais': horas,
-                    'producao_maxima': producao_atual,
-                    'meta_atingida': producao_atual >= self.parametros['meta_diaria'],
-                    'status': pulp.LpStatus[prob.status],
-                    'metodo': 'horas_discretas'
-                }
+        # Encontrar a melhor combinação
+        for resultado in resultados:
+            if resultado['status'] == 'Optimal' and resultado['producao_maxima'] > melhor_producao:
+                melhor_producao = resultado['producao_maxima']
+                melhor_resultado = resultado
         
         return melhor_resultado
     
-    def calcular_meta_minima(self):
-        """Calcula a configuração mínima para atingir a meta"""
+    def otimizar_producao_robusta(self, probabilidade=0.95, n_cenarios=10_000, opcoes_horas=None,
+                                  modo='decomposicao', semente=None, n_processos=None, **opcoes):
+        """Variante estocástica: menor custo que atinge a meta com a probabilidade alvo
+        
+        Usa cenários sorteados de PARAMETROS_ESTOCASTICOS (veja models/robusto.py);
+        modo='decomposicao' escala para muitos cenários, modo='milp' resolve o
+        SAA inteiro. Sem opcoes_horas, a jornada é horas_efetivas.
+        """
+        from models.robusto import otimizar_robusto
+        
+        def resolver_robusto():
+            return otimizar_robusto(self.parametros, probabilidade, n_cenarios, opcoes_horas,
+                                    semente=semente, modo=modo, n_processos=n_processos,
+                                    backend=self.backend, verificar=self.verificar, **opcoes)
+        
+        # Sem semente os cenários mudam a cada chamada: não há o que reaproveitar
+        if semente is None:
+            return resolver_robusto()
+        return self._com_cache('otimizar_producao_robusta', resolver_robusto, probabilidade=probabilidade,
+                               n_cenarios=n_cenarios, opcoes_horas=opcoes_horas, modo=modo,
+                               semente=semente, **opcoes)
+    
+    def planejar_horizonte(self, demanda, modo='rolante', janela=14, fixar=7, estoque_inicial=0.0,
+                           horizonte=None, n_processos=None):
+        """Plano de vários dias com estoque, horas extras e demanda diária variável
+        
+        demanda tem um valor por dia (no lugar de meta_diaria); horizonte
+        sobrescreve PARAMETROS_HORIZONTE. Veja models/horizonte.py.
+        """
+        from models.horizonte import PlanejadorHorizonte
         
-        # Operários mínimos para atingir a meta
-        operarios_minimos = np.ceil(self.parametros['meta_diaria'] / 
-                                  (self.parametros['taxa_producao'] * self.parametros['horas_efetivas']))
+        planejador = PlanejadorHorizonte(self.parametros, demanda, estoque_inicial, horizonte,
+                                         backend=self.backend, verificar=self.verificar)
+        return planejador.planejar(modo, janela, fixar, n_processos)
+    
+    def fronteira_pareto(self, n_pontos=50, opcoes_horas=None, n_processos=None):
+        """Fronteira de Pareto produção x custo pelo método epsilon-restrito
+        
+        Para cada nível de produção epsilon (n_pontos níveis entre a menor e a
+        maior produção possíveis) minimiza o custo com produção >= epsilon,
+        escolhendo operários e jornada entre as opções de horas. Os níveis são
+        divididos em blocos contíguos resolvidos em paralelo; dentro de um bloco,
+        em ordem crescente, a solução anterior é reaproveitada enquanto sua
+        produção já cobre o próximo epsilon (continua ótima) e os níveis cobertos
+        não chamam o solver. Pontos dominados são descartados.
+        
+        Retorna arrays NumPy alinhados: producao, custo, operarios, horas e
+        meta_atingida, ordenados por custo; e 'solves', o total de chamadas ao solver.
+        """
+        opcoes_horas = self._opcoes_horas(opcoes_horas)
+        taxa = self.parametros['taxa_producao']
+        niveis = np.linspace(taxa * min(opcoes_horas),
+                             taxa * max(opcoes_horas) * self.parametros['operarios_maximos'], n_pontos)
+        
+        n_blocos = min(len(niveis), n_processos or os.cpu_count() or 1)
+        tarefas = [(self.parametros, opcoes_horas, bloco, self.backend, self.verificar)
+                   for bloco in np.array_split(niveis, n_blocos)]
+        if n_processos == 1 or n_blocos <= 1:
+            blocos = list(map(_resolver_bloco_pareto, tarefas))
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                blocos = list(executor.map(_resolver_bloco_pareto, tarefas))
         
+        pontos = [ponto for bloco in blocos for ponto in bloco['pontos']]
+        fronteira = _nao_dominados(pontos)
         return {
-            'operarios_minimos': int(operarios_minimos),
-            'horas_necessarias': self.parametros['horas_efetivas'],
-            'producao_estimada': self.parametros['taxa_producao'] * operarios_minimos * self.parametros['horas_efetivas']
+            'producao': np.array([p[0] for p in fronteira], dtype=float),
+            'custo': np.array([p[1] for p in fronteira], dtype=float),
+            'operarios': np.array([p[2] for p in fronteira], dtype=float),
+            'horas': np.array([p[3] for p in fronteira], dtype=float),
+            'meta_atingida': np.array([p[0] >= self.parametros['meta_diaria'] for p in fronteira]),
+            'solves': sum(bloco['solves'] for bloco in blocos),
         }
     
+    def modelo_custo_minimo(self, opcoes_horas, producao_minima):
+        """MILP de seleção de jornada minimizando o custo com produção >= producao_minima"""
+        
+        problema = self.modelo_horas_selecionadas(opcoes_horas)
+        custo_por_operario = self.parametros['custo_hora'] * np.asarray(opcoes_horas, dtype=float)
+        limites = problema.lb_restricoes.copy()
+        limites[-1] = producao_minima                       # Meta_Minima vira o epsilon
+        return problema.copiar(c=np.concatenate([-custo_por_operario, np.zeros(len(opcoes_horas))]),
+                               lb_restricoes=limites, nome='Minimizar_Custo_Producao_Minima')
+    
+    def _resolver(self, problema):
+        """Encaminha o problema para a camada de solvers"""
+        return resolver(problema, backend=self.backend, verificar=self.verificar)
+    
+    def _com_cache(self, metodo, resolver_metodo, **extras):
+        """Consulta o cache antes de chamar o solver; guarda o resultado novo"""
+        if self.cache is None:
+            return resolver_metodo()
+        
+        # O backend e a verificação cruzada fazem parte da chave: um resultado do
+        # CBC não deve dispensar o HiGHS com verificar='cbc' pedido pelo usuário
+        chave = self.cache.chave(metodo, self.parametros, backend=self.backend, verificar=self.verificar,
+                                 **extras)
+        resultado = self.cache.obter(chave)
+        contar('cache', metodo=metodo, resultado='miss' if resultado is None else 'hit')
+        if resultado is None:
+            resultado = resolver_metodo()
+            self.cache.guardar(chave, SEM_SOLUCAO if resultado is None else resultado)
+        elif resultado == SEM_SOLUCAO:
+            return None
+        return resultado
+    
+    def calcular_meta_minima(self):
+        """Calcula a configuração mínima para atingir a meta"""
+        return analitico.calcular_meta_minima(self.parametros)
+    
     def calcular_custo(self, operarios, horas):
         """Calcula o custo total da produção"""
-        return operarios * horas * self.parametros['custo_hora']
\ No newline at end of file
+        return analitico.calcular_custo(self.parametros, operarios, horas)
+
+
+def _resolver_opcao_horas(tarefa):
+    """Subproblema da decomposição por horas (executado nos processos)"""
+    parametros, horas, backend, verificar = tarefa
+    otimizador = OtimizadorProducao(parametros, cache=False, backend=backend, verificar=verificar)
+    return otimizador._resolver_horas_fixas(horas, 'horas_discretas')
+
+
+def _resolver_bloco_pareto(tarefa):
+    """Níveis epsilon de um bloco, em ordem crescente (executado nos processos)"""
+    parametros, opcoes_horas, niveis, backend, verificar = tarefa
+    otimizador = OtimizadorProducao(parametros, cache=False, backend=backend, verificar=verificar)
+    taxa = parametros['taxa_producao']
+    k = len(opcoes_horas)
+    
+    pontos = []
+    solves = 0
+    producao_atual = -np.inf
+    for nivel in niveis:
+        # A solução anterior continua ótima: o custo mínimo não diminui com epsilon
+        if producao_atual >= nivel - 1e-9:
+            continue
+        with etapa('montagem_modelo', modelo='custo_minimo'):
+            problema = otimizador.modelo_custo_minimo(opcoes_horas, nivel)
+        solucao = otimizador._resolver(problema)
+        solves += 1
+        if solucao['status'] != 'Optimal':
+            break  # níveis maiores também são inviáveis
+        operarios = np.round(solucao['x'][:k])
+        indice = int(np.argmax(solucao['x'][k:]))
+        horas = opcoes_horas[indice]
+        producao_atual = float(taxa * horas * operarios[indice])
+        pontos.append((producao_atual, otimizador.calcular_custo(float(operarios[indice]), horas),
+                       float(operarios[indice]), horas))
+    
+    return {'pontos': pontos, 'solves': solves}
+
+
+def _nao_dominados(pontos):
+    """Pontos (producao, custo, ...) que nenhum outro domina, ordenados por custo"""
+    fronteira = []
+    for ponto in sorted(pontos, key=lambda p: (p[1], -p[0])):
+        if not fronteira or ponto[0] > fronteira[-1][0] + 1e-9:
+            fronteira.append(ponto)
+    return fronteira
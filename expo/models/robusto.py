@@ -0,0 +1,189 @@
+"""
+Otimização robusta por cenários (aproximação por média amostral, SAA)
+Escolhe operários e jornada que atingem a meta com uma probabilidade alvo
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from data.parametros import PARAMETROS_ESTOCASTICOS
+from models.simulacao import amostrar
+from models.solvers import ProblemaLinear, resolver
+
+
+def otimizar_robusto(parametros, probabilidade=0.95, n_cenarios=10_000, opcoes_horas=None,
+                     distribuicoes=None, semente=None, modo='decomposicao', n_processos=None,
+                     tamanho_bloco=50_000, backend='auto', verificar=None):
+    """Menor custo de operários x horas com P(produção >= meta) >= probabilidade.
+
+    Cada cenário sorteia produtividade e presença de cada operário escalável
+    e as horas de parada (PARAMETROS_ESTOCASTICOS). Escalar n operários
+    significa escalar os n primeiros, então a produção de um cenário cresce
+    com n e cada cenário tem um n mínimo que atinge a meta.
+
+    modo='decomposicao': calcula o n mínimo de cada cenário em blocos
+    independentes (em paralelo) e só agrega um histograma; o n ótimo é o
+    quantil `probabilidade` desses mínimos, o que é exato para o problema
+    SAA e escala linearmente com n_cenarios.
+    modo='milp': o mesmo SAA como um único MILP com uma binária por cenário
+    (big-M), útil para conferir a decomposição em instâncias pequenas.
+
+    Os cenários dependem só da semente e de tamanho_bloco, então os dois
+    modos e qualquer n_processos veem os mesmos cenários.
+    """
+    if not 0 < probabilidade <= 1:
+        raise ValueError("probabilidade deve estar em (0, 1]")
+    opcoes_horas = sorted(set(opcoes_horas or [parametros['horas_efetivas']]))
+    distribuicoes = {**PARAMETROS_ESTOCASTICOS, **(distribuicoes or {})}
+
+    sequencia = np.random.SeedSequence(semente)
+    tamanhos = [min(tamanho_bloco, n_cenarios - inicio) for inicio in range(0, n_cenarios, tamanho_bloco)]
+    blocos = [(parametros, opcoes_horas, distribuicoes, filha, tamanho)
+              for filha, tamanho in zip(sequencia.spawn(len(tamanhos)), tamanhos)]
+    # Cenários que podem falhar sem violar a probabilidade alvo
+    falhas_permitidas = n_cenarios - math.ceil(probabilidade * n_cenarios - 1e-9)
+
+    if modo == 'decomposicao':
+        contagens = _mapear(_contar_minimos, blocos, n_processos)
+        por_horas = _escolher_por_quantil(sum(contagens), n_cenarios, falhas_permitidas)
+    elif modo == 'milp':
+        capacidades = np.concatenate([_capacidades(bloco) for bloco in blocos], axis=1)
+        por_horas = [_resolver_milp(parametros, capacidades[k], falhas_permitidas, backend, verificar)
+                     for k in range(len(opcoes_horas))]
+    else:
+        raise ValueError(f"Modo desconhecido: {modo}")
+
+    # Melhor jornada: menor custo entre as viáveis (empate: mais horas, mais produção)
+    melhor = None
+    for horas, (operarios, satisfeitos) in zip(opcoes_horas, por_horas):
+        if operarios is None:
+            continue
+        custo = operarios * horas * parametros['custo_hora']
+        if melhor is None or (custo, -horas) < (melhor[0], -melhor[1]):
+            melhor = (custo, horas, operarios, satisfeitos)
+
+    resultado = {
+        'probabilidade_alvo': probabilidade,
+        'n_cenarios': n_cenarios,
+        'semente': sequencia.entropy,
+        'metodo': f'robusto_{modo}',
+        'por_horas': [{'horas': horas, 'operarios': operarios,
+                       'probabilidade_meta': None if satisfeitos is None else satisfeitos / n_cenarios}
+                      for horas, (operarios, satisfeitos) in zip(opcoes_horas, por_horas)],
+    }
+    if melhor is None:
+        resultado.update({'operarios_ideais': 0.0, 'horas_ideais': opcoes_horas[-1], 'producao_maxima': 0.0,
+                          'meta_atingida': False, 'probabilidade_meta': 0.0, 'custo_total': 0.0,
+                          'status': 'Infeasible'})
+        return resultado
+
+    custo, horas, operarios, satisfeitos = melhor
+    resultado.update({
+        'operarios_ideais': float(operarios),
+        'horas_ideais': horas,
+        # Produção nominal (taxa determinística), no mesmo sentido de otimizar_producao
+        'producao_maxima': float(parametros['taxa_producao'] * operarios * horas),
+        'meta_atingida': True,
+        'probabilidade_meta': satisfeitos / n_cenarios,
+        'custo_total': float(custo),
+        'status': 'Optimal',
+    })
+    return resultado
+
+
+def _mapear(funcao, tarefas, n_processos):
+    if n_processos == 1 or len(tarefas) <= 1:
+        return list(map(funcao, tarefas))
+    with ProcessPoolExecutor(max_workers=min(len(tarefas), n_processos or os.cpu_count() or 1)) as executor:
+        return list(executor.map(funcao, tarefas))
+
+
+def _capacidades(bloco):
+    """Produção acumulada ao escalar 1..N operários: array (horas, cenários, N)"""
+    parametros, opcoes_horas, distribuicoes, semente, tamanho = bloco
+    rng = np.random.default_rng(semente)
+    n_maximo = parametros['operarios_maximos']
+
+    produtividade = np.clip(amostrar(rng, distribuicoes['produtividade'], (tamanho, n_maximo)), 0, None)
+    presente = ~amostrar(rng, distribuicoes['absenteismo'], (tamanho, n_maximo)).astype(bool)
+    parada = amostrar(rng, distribuicoes['parada'], tamanho)
+
+    acumulada = np.cumsum(produtividade * presente, axis=1)
+    horas = np.asarray(opcoes_horas, dtype=float)[:, None]
+    horas_produtivas = horas - np.clip(parada[None, :], 0, horas)
+    return parametros['taxa_producao'] * horas_produtivas[:, :, None] * acumulada[None, :, :]
+
+
+def _contar_minimos(bloco):
+    """Histograma do n mínimo por cenário; a classe N+1 marca cenário sem solução"""
+    parametros = bloco[0]
+    n_maximo = parametros['operarios_maximos']
+    atinge = _capacidades(bloco) >= parametros['meta_diaria'] - 1e-9
+    # Primeiro n que atinge a meta (n = 0 só se a meta for nula)
+    minimos = np.where(atinge.any(axis=2), atinge.argmax(axis=2) + 1, n_maximo + 1)
+    if parametros['meta_diaria'] <= 0:
+        minimos[:] = 0
+    return np.stack([np.bincount(linha, minlength=n_maximo + 2) for linha in minimos])
+
+
+def _escolher_por_quantil(contagens, n_cenarios, falhas_permitidas):
+    """(n ótimo, cenários satisfeitos) por opção de horas a partir do histograma"""
+    escolhas = []
+    for linha in contagens:
+        satisfeitos = np.cumsum(linha[:-1])        # cenários com mínimo <= n
+        viaveis = np.flatnonzero(satisfeitos >= n_cenarios - falhas_permitidas)
+        if len(viaveis) == 0:
+            escolhas.append((None, None))
+        else:
+            escolhas.append((int(viaveis[0]), int(satisfeitos[viaveis[0]])))
+    return escolhas
+
+
+def modelo_saa(meta, capacidades, falhas_permitidas):
+    """MILP SAA com big-M para uma jornada
+
+    Variáveis: [y_1..y_N escala (binária, y_i >= y_i+1) | z_s falha do cenário s].
+    Restrições: produção_s(y) + meta * z_s >= meta; Σ z_s <= falhas_permitidas.
+    Minimiza Σ y (operários escalados).
+    """
+    n_cenarios, n_maximo = capacidades.shape
+    # Contribuição do i-ésimo operário em cada cenário
+    contribuicao = np.diff(capacidades, axis=1, prepend=0.0)
+
+    cenarios = sparse.hstack([sparse.csr_array(contribuicao),
+                              sparse.diags_array(np.full(n_cenarios, float(meta)))])
+    ordem = sparse.hstack([sparse.eye_array(n_maximo - 1, n_maximo) -
+                           sparse.eye_array(n_maximo - 1, n_maximo, k=1),
+                           sparse.csr_array((n_maximo - 1, n_cenarios))])
+    orcamento = sparse.hstack([sparse.csr_array((1, n_maximo)),
+                               sparse.csr_array(np.ones((1, n_cenarios)))])
+    A = sparse.vstack([cenarios, ordem, orcamento]).tocsr()
+
+    return ProblemaLinear(
+        c=np.concatenate([-np.ones(n_maximo), np.zeros(n_cenarios)]),
+        A=A,
+        lb_restricoes=np.concatenate([np.full(n_cenarios, float(meta)), np.zeros(n_maximo - 1), [-np.inf]]),
+        ub_restricoes=np.concatenate([np.full(n_cenarios + n_maximo - 1, np.inf), [falhas_permitidas]]),
+        lb=np.zeros(n_maximo + n_cenarios),
+        ub=np.ones(n_maximo + n_cenarios),
+        inteiras=np.ones(n_maximo + n_cenarios, dtype=bool),
+        nome='SAA_Operarios_Minimos',
+        nomes_variaveis=[f'Escala_{i + 1}' for i in range(n_maximo)] + [f'Falha_{s}' for s in range(n_cenarios)],
+        nomes_restricoes=([f'Meta_Cenario_{s}' for s in range(n_cenarios)] +
+                          [f'Ordem_{i + 1}' for i in range(n_maximo - 1)] + ['Falhas_Permitidas'])
+    )
+
+
+def _resolver_milp(parametros, capacidades, falhas_permitidas, backend, verificar):
+    meta = parametros['meta_diaria']
+    solucao = resolver(modelo_saa(meta, capacidades, falhas_permitidas),
+                       backend=backend, verificar=verificar)
+    if solucao['status'] != 'Optimal':
+        return None, None
+    operarios = int(round(solucao['x'][:capacidades.shape[1]].sum()))
+    producao = capacidades[:, operarios - 1] if operarios else np.zeros(len(capacidades))
+    return operarios, int((producao >= meta - 1e-9).sum())
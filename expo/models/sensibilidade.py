@@ -0,0 +1,366 @@
+"""
+Análise de sensibilidade do OtimizadorProducao
+Preços-sombra, custos reduzidos e intervalos de validade pela relaxação linear,
+e varredura paramétrica do problema inteiro reaproveitando soluções
+"""
+
+import numpy as np
+from scipy.optimize import linprog
+
+from models.otimizacao import OtimizadorProducao
+
+# Parâmetros cuja variação só desloca um lado direito/limite de forma monótona
+# (ou não muda o modelo): se a mesma solução inteira é ótima nos dois extremos
+# de um intervalo, ela é ótima em todo o intervalo e não precisa ser recalculada
+PARAMETROS_MONOTONOS = {'meta_diaria', 'operarios_maximos', 'custo_hora'}
+
+TOLERANCIA = 1e-7
+
+# Acima deste módulo o intervalo é considerado ilimitado (o HiGHS trata ~1e20 como infinito)
+LIMITE_INFINITO = 1e12
+
+
+def analisar_lp(problema):
+    """Resolve a relaxação linear e extrai preços-sombra, custos reduzidos e intervalos.
+
+    preco_sombra de uma restrição é a variação do objetivo por unidade de
+    aumento do lado que está ativo; o intervalo é a faixa desse lado em que o
+    preço continua válido. Para cada variável, o intervalo de custo é a faixa
+    do coeficiente no objetivo em que a solução atual continua ótima.
+    """
+    base = _resolver_relaxacao(problema)
+    if base is None:
+        return {'status': 'Infeasible'}
+
+    restricoes = []
+    for i, nome in enumerate(problema.nomes_restricoes):
+        lado = _lado_ativo(problema, i, base)
+        preco = float(base['duais_sup'][i] if lado == 'ub_restricoes' else base['duais_inf'][i])
+        restricoes.append({
+            'nome': nome,
+            'atividade': float(base['atividade'][i]),
+            'lado': 'superior' if lado == 'ub_restricoes' else 'inferior',
+            'preco_sombra': preco,
+            'intervalo': _intervalo_lado_direito(problema, lado, i, base['objetivo'], preco),
+        })
+
+    limites = []
+    for j, nome in enumerate(problema.nomes_variaveis):
+        if not np.isfinite(problema.ub[j]):
+            continue
+        preco = float(base['duais_ub'][j])
+        limites.append({
+            'variavel': nome,
+            'limite': float(problema.ub[j]),
+            'preco_sombra': preco,
+            'intervalo': _intervalo_lado_direito(problema, 'ub', j, base['objetivo'], preco),
+        })
+
+    return {
+        'status': 'Optimal',
+        'objetivo': base['objetivo'],
+        'x': base['x'],
+        'restricoes': restricoes,
+        'limites_superiores': limites,
+        'custos_reduzidos': base['custos_reduzidos'],
+        'intervalos_custo': [_intervalo_custo(problema, j, base['objetivo'], base['x'][j])
+                             for j in range(problema.n_variaveis)],
+    }
+
+
+def derivada_coeficientes(analise, dc, dA):
+    """Derivada do ótimo da relaxação em relação a um parâmetro que muda coeficientes.
+
+    Pelo teorema do envelope: dz/dθ = dc·x − Σ_i preco_sombra_i · (dA_i·x), onde
+    dc e dA são as derivadas de c e de A em relação ao parâmetro.
+    """
+    x = analise['x']
+    precos = np.array([r['preco_sombra'] for r in analise['restricoes']])
+    return float(np.dot(dc, x) - precos @ (np.asarray(dA, dtype=float) @ x))
+
+
+class AnalisadorSensibilidade:
+    """Sensibilidade do modelo de horas fixas de um OtimizadorProducao"""
+
+    def __init__(self, otimizador):
+        self.otimizador = otimizador
+        self.parametros = otimizador.parametros
+
+    def analisar(self, horas=None):
+        """Análise da relaxação linear do modelo com horas fixas"""
+        horas = self.parametros['horas_efetivas'] if horas is None else horas
+        return analisar_lp(self.otimizador.modelo_horas_fixas(horas))
+
+    def valores_marginais(self, horas=None):
+        """Valor marginal de um operário e de uma hora, em unidades e em R$"""
+        horas = self.parametros['horas_efetivas'] if horas is None else horas
+        analise = self.analisar(horas)
+        if analise['status'] != 'Optimal':
+            return {'status': analise['status']}
+
+        taxa = self.parametros['taxa_producao']
+        operarios = analise['limites_superiores'][0]
+        por_hora = derivada_coeficientes(analise, dc=[taxa], dA=[[taxa]])
+
+        return {
+            'status': 'Optimal',
+            'unidades_por_operario': operarios['preco_sombra'],
+            'intervalo_operarios': operarios['intervalo'],
+            'unidades_por_hora': por_hora,
+            'preco_sombra_meta': analise['restricoes'][0]['preco_sombra'],
+            'intervalo_meta': analise['restricoes'][0]['intervalo'],
+            'custo_por_unidade': self.parametros['custo_hora'] / taxa,
+        }
+
+    def varredura(self, parametro, valores, metodo='otimizar_producao', opcoes_horas=None):
+        """Varredura paramétrica do problema inteiro em alta resolução.
+
+        Para parâmetros em PARAMETROS_MONOTONOS, resolve os extremos de cada
+        intervalo e só subdivide onde as soluções diferem; os pontos internos
+        herdam a solução já encontrada. Para os demais parâmetros, cada valor
+        é resolvido. Retorna um dicionário colunar de arrays.
+        """
+        valores = np.sort(np.asarray(valores, dtype=float))
+        solucoes = [None] * len(valores)
+
+        if parametro in PARAMETROS_MONOTONOS and len(valores) > 2:
+            self._varrer_intervalo(parametro, valores, metodo, opcoes_horas, solucoes, 0, len(valores) - 1)
+        else:
+            for i, valor in enumerate(valores):
+                solucoes[i] = self._resolver_ponto(parametro, valor, metodo, opcoes_horas)
+
+        colunas = {'valor': valores}
+        for chave in ('operarios', 'horas', 'producao', 'custo', 'meta_atingida'):
+            colunas[chave] = np.array([solucao[chave] for solucao in solucoes])
+        colunas['status'] = np.array([solucao['status'] for solucao in solucoes])
+        colunas['solves'] = sum(solucao.get('resolvido', False) for solucao in solucoes)
+        return colunas
+
+    def _varrer_intervalo(self, parametro, valores, metodo, opcoes_horas, solucoes, inicio, fim):
+        """Preenche solucoes[inicio..fim] subdividindo só onde os extremos diferem"""
+        pilha = [(inicio, fim)]
+        while pilha:
+            inicio, fim = pilha.pop()
+            for i in (inicio, fim):
+                if solucoes[i] is None:
+                    solucoes[i] = self._resolver_ponto(parametro, valores[i], metodo, opcoes_horas)
+            if fim - inicio < 2:
+                continue
+            if _mesma_solucao(solucoes[inicio], solucoes[fim]):
+                for i in range(inicio + 1, fim):
+                    solucoes[i] = self._avaliar_ponto(parametro, valores[i], solucoes[inicio])
+                continue
+            meio = (inicio + fim) // 2
+            pilha.append((meio, fim))
+            pilha.append((inicio, meio))
+
+    def _resolver_ponto(self, parametro, valor, metodo, opcoes_horas):
+        """Monta e resolve o modelo inteiro com um parâmetro alterado"""
+        otimizador = self._otimizador_com(parametro, valor)
+        if metodo == 'otimizar_producao':
+            horas = otimizador.parametros['horas_efetivas']
+            problema = otimizador.modelo_horas_fixas(horas)
+        elif metodo == 'otimizar_com_horas_variaveis':
+            opcoes = otimizador._opcoes_horas(opcoes_horas)
+            problema = otimizador.modelo_horas_selecionadas(opcoes)
+        else:
+            raise ValueError(f"Método desconhecido: {metodo}")
+
+        solucao = otimizador._resolver(problema)
+        operarios, horas = 0.0, None
+        if solucao['x'] is not None:
+            if metodo == 'otimizar_producao':
+                operarios = float(solucao['x'][0])
+            else:
+                k = len(opcoes)
+                indice = int(np.argmax(solucao['x'][k:]))
+                operarios, horas = float(np.round(solucao['x'][indice])), opcoes[indice]
+
+        ponto = {'x': solucao['x'], 'status': solucao['status'], 'operarios': operarios,
+                 'horas': horas, 'resolvido': True}
+        return self._completar(otimizador, ponto)
+
+    def _avaliar_ponto(self, parametro, valor, referencia):
+        """Reaproveita a solução de um ponto vizinho, recalculando os indicadores"""
+        ponto = {chave: referencia[chave] for chave in ('x', 'status', 'operarios', 'horas')}
+        return self._completar(self._otimizador_com(parametro, valor), ponto)
+
+    def _completar(self, otimizador, ponto):
+        parametros = otimizador.parametros
+        if ponto['horas'] is None:
+            ponto['horas'] = parametros['horas_efetivas']
+        ponto['producao'] = parametros['taxa_producao'] * ponto['operarios'] * ponto['horas']
+        ponto['custo'] = otimizador.calcular_custo(ponto['operarios'], ponto['horas'])
+        ponto['meta_atingida'] = ponto['producao'] >= parametros['meta_diaria']
+        return ponto
+
+    def _otimizador_com(self, parametro, valor):
+        parametros = dict(self.parametros)
+        parametros[parametro] = valor
+        return OtimizadorProducao(parametros, cache=False, backend=self.otimizador.backend)
+
+
+def _mesma_solucao(a, b):
+    if a['status'] != b['status']:
+        return False
+    if a['x'] is None or b['x'] is None:
+        return a['x'] is None and b['x'] is None
+    return np.allclose(a['x'], b['x'])
+
+
+def _resolver_relaxacao(problema):
+    """Resolve a relaxação linear com HiGHS e devolve solução e duais no sentido de max"""
+    A = problema.A
+    lb_r, ub_r = problema.lb_restricoes, problema.ub_restricoes
+    igualdade = lb_r == ub_r
+    superior = np.isfinite(ub_r) & ~igualdade
+    inferior = np.isfinite(lb_r) & ~igualdade
+
+    # linprog: A_ub x <= b_ub (linhas <= e linhas >= negadas) e A_eq x = b_eq
+    A_ub = _empilhar(A[superior], -A[inferior])
+    b_ub = np.concatenate([ub_r[superior], -lb_r[inferior]])
+    resposta = linprog(-problema.c,
+                       A_ub=A_ub if len(b_ub) else None, b_ub=b_ub if len(b_ub) else None,
+                       A_eq=A[igualdade] if igualdade.any() else None,
+                       b_eq=lb_r[igualdade] if igualdade.any() else None,
+                       bounds=list(zip(_finito_ou_none(problema.lb), _finito_ou_none(problema.ub))),
+                       method='highs')
+    if resposta.status != 0:
+        return None
+
+    # Marginais do linprog são d(min)/d(b); para o max, d(z)/d(lado) muda de sinal
+    n = problema.n_restricoes
+    duais_sup, duais_inf = np.zeros(n), np.zeros(n)
+    marginais = resposta.ineqlin.marginals if len(b_ub) else np.empty(0)
+    n_sup = int(superior.sum())
+    duais_sup[superior] = -marginais[:n_sup]
+    duais_inf[inferior] = marginais[n_sup:]
+    if igualdade.any():
+        duais_sup[igualdade] = -resposta.eqlin.marginals
+        duais_inf[igualdade] = -resposta.eqlin.marginals
+
+    return {
+        'x': resposta.x,
+        'objetivo': float(-resposta.fun),
+        'atividade': np.asarray(A @ resposta.x).ravel(),
+        'duais_sup': duais_sup,
+        'duais_inf': duais_inf,
+        'duais_ub': -resposta.upper.marginals,
+        'custos_reduzidos': -(resposta.upper.marginals + resposta.lower.marginals),
+    }
+
+
+def _lado_ativo(problema, i, base):
+    """Lado da restrição a variar: o que tem dual não nulo, senão o finito"""
+    if abs(base['duais_inf'][i]) > TOLERANCIA and np.isfinite(problema.lb_restricoes[i]):
+        return 'lb_restricoes'
+    if np.isfinite(problema.ub_restricoes[i]):
+        return 'ub_restricoes'
+    return 'lb_restricoes'
+
+
+def _intervalo_lado_direito(problema, atributo, indice, objetivo, preco):
+    """Faixa do lado direito (ou limite) em que o preço-sombra continua válido"""
+    valor_atual = float(getattr(problema, atributo)[indice])
+
+    def avaliar(valor):
+        vetor = getattr(problema, atributo).copy()
+        vetor[indice] = valor
+        if atributo != 'ub' and problema.ub_restricoes[indice] == problema.lb_restricoes[indice]:
+            # Restrição de igualdade: os dois lados andam juntos
+            inferior, superior = problema.lb_restricoes.copy(), problema.ub_restricoes.copy()
+            inferior[indice] = superior[indice] = valor
+            alterado = problema.copiar(lb_restricoes=inferior, ub_restricoes=superior)
+        else:
+            alterado = problema.copiar(**{atributo: vetor})
+        base = _resolver_relaxacao(alterado)
+        if base is None:
+            return None
+        if atributo == 'ub':
+            return base['objetivo'], base['duais_ub'][indice]
+        lado = base['duais_sup'] if atributo == 'ub_restricoes' else base['duais_inf']
+        return base['objetivo'], lado[indice]
+
+    return (float(_extremo_linear(avaliar, valor_atual, objetivo, preco, -1)),
+            float(_extremo_linear(avaliar, valor_atual, objetivo, preco, +1)))
+
+
+def _intervalo_custo(problema, j, objetivo, x_j):
+    """Faixa do coeficiente c_j em que a solução atual continua ótima"""
+    valor_atual = float(problema.c[j])
+
+    def avaliar(valor):
+        c = problema.c.copy()
+        c[j] = valor
+        base = _resolver_relaxacao(problema.copiar(c=c))
+        if base is None:
+            return None
+        return base['objetivo'], base['x'][j]
+
+    return (float(_extremo_linear(avaliar, valor_atual, objetivo, x_j, -1)),
+            float(_extremo_linear(avaliar, valor_atual, objetivo, x_j, +1)))
+
+
+def _extremo_linear(avaliar, t0, z0, inclinacao, direcao, maximo_iteracoes=60):
+    """Extremo do trecho linear de uma função linear por partes a partir de t0.
+
+    avaliar(t) devolve (valor, inclinação) ou None se inviável. Avança em
+    passos dobrados até sair da reta z0 + inclinacao*(t - t0); depois localiza a
+    quebra pela interseção das tangentes (método de Eisner-Severance), ou por
+    bisseção quando o problema fica inviável.
+    """
+    passo = max(1.0, abs(t0))
+    dentro = t0
+    fora = None
+    for _ in range(maximo_iteracoes):
+        t = t0 + direcao * passo
+        if abs(t) > LIMITE_INFINITO:
+            break
+        ponto = avaliar(t)
+        if ponto is not None and _na_reta(ponto[0], z0 + inclinacao * (t - t0)):
+            dentro = t
+            passo *= 2
+            continue
+        fora = (t, ponto)
+        break
+    if fora is None:
+        return direcao * np.inf
+
+    for _ in range(maximo_iteracoes):
+        t, ponto = fora
+        candidato = None
+        if ponto is not None and abs(ponto[1] - inclinacao) > TOLERANCIA:
+            # Interseção da reta original com a tangente em t
+            candidato = (ponto[0] - ponto[1] * t - z0 + inclinacao * t0) / (inclinacao - ponto[1])
+            if not min(dentro, t) < candidato < max(dentro, t):
+                candidato = None
+        por_tangente = candidato is not None
+        if not por_tangente:
+            candidato = (dentro + t) / 2
+        if abs(candidato - dentro) <= TOLERANCIA * max(1.0, abs(candidato)):
+            return candidato
+
+        ponto_candidato = avaliar(candidato)
+        if ponto_candidato is not None and _na_reta(ponto_candidato[0], z0 + inclinacao * (candidato - t0)):
+            # Sobre as duas retas de suporte: a função é linear dos dois lados, é a quebra
+            if por_tangente:
+                return candidato
+            dentro = candidato
+        else:
+            fora = (candidato, ponto_candidato)
+    return dentro
+
+
+def _na_reta(valor, esperado):
+    return abs(valor - esperado) <= TOLERANCIA * max(1.0, abs(esperado))
+
+
+def _empilhar(superior, inferior):
+    if hasattr(superior, 'tocsr'):
+        from scipy import sparse
+        return sparse.vstack([superior, inferior]).tocsr()
+    return np.vstack([superior, inferior])
+
+
+def _finito_ou_none(valores):
+    return [None if np.isinf(v) else float(v) for v in valores]
@@ -2,17 +2,29 @@
 Simulação de diferentes cenários de produção
 """
 
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
+from data.parametros import PARAMETROS_ESTOCASTICOS
+
+# Colunas retornadas pelas simulações em lote (formato colunar)
+COLUNAS_LOTE = ('operarios', 'horas', 'taxa_producao', 'meta_diaria', 'custo_hora',
+                'producao', 'custo', 'meta_atingida', 'eficiencia')
+
+# Percentis reportados por padrão na simulação de Monte Carlo
+PERCENTIS_PADRAO = (5, 25, 50, 75, 95)
+
+
 class SimuladorCenarios:
     def __init__(self, parametros):
         self.parametros = parametros
-        
-    def simular_cenarios(self):
+
+    def simular_cenarios(self, horas_extra=9, operarios_extra=8, ganho_produtividade=0.20):
         """Simula diferentes cenários de produção"""
-        
+
         cenarios = []
-        
+
         # Cenário 1: Configuração atual
         cenarios.append({
             'nome': 'Cenário Atual',
@@ -20,29 +32,297 @@ class SimuladorCenarios:
             'horas': self.parametros['horas_efetivas'],
             'producao': self.parametros['taxa_producao'] * self.parametros['operarios_maximos'] * self.parametros['horas_efetivas']
         })
-        
+
         # Cenário 2: Com hora extra
         cenarios.append({
-            'nome': 'Hora Extra (9h)',
+            'nome': f'Hora Extra ({horas_extra}h)',
             'operarios': self.parametros['operarios_maximos'],
-            'horas': 9,
-            'producao': self.parametros['taxa_producao'] * self.parametros['operarios_maximos'] * 9
+            'horas': horas_extra,
+            'producao': self.parametros['taxa_producao'] * self.parametros['operarios_maximos'] * horas_extra
         })
-        
+
         # Cenário 3: Mais operários
         cenarios.append({
-            'nome': 'Mais Operários (8)',
-            'operarios': 8,
+            'nome': f'Mais Operários ({operarios_extra})',
+            'operarios': operarios_extra,
             'horas': self.parametros['horas_efetivas'],
-            'producao': self.parametros['taxa_producao'] * 8 * self.parametros['horas_efetivas']
+            'producao': self.parametros['taxa_producao'] * operarios_extra * self.parametros['horas_efetivas']
         })
-        
+
         # Cenário 4: Maior produtividade
+        taxa_aumentada = self.parametros['taxa_producao'] * (1 + ganho_produtividade)
         cenarios.append({
-            'nome': 'Produtividade +20%',
+            'nome': f'Produtividade +{ganho_produtividade:.0%}',
             'operarios': self.parametros['operarios_maximos'],
             'horas': self.parametros['horas_efetivas'],
-            'producao': 120 * self.parametros['operarios_maximos'] * self.parametros['horas_efetivas']
+            'producao': taxa_aumentada * self.parametros['operarios_maximos'] * self.parametros['horas_efetivas']
+        })
+
+        return cenarios
+
+    def simular_lote(self, operarios=None, horas=None, taxa_producao=None,
+                     meta_diaria=None, custo_hora=None):
+        """Avalia vários cenários de uma vez (arrays alinhados elemento a elemento).
+
+        Cada argumento aceita um escalar ou um array; os valores são combinados
+        por broadcasting do NumPy. Argumentos omitidos usam os PARAMETROS.
+        Retorna um dicionário colunar {coluna: np.ndarray}.
+        """
+        op, hr, taxa, meta, custo = np.broadcast_arrays(*self._valores_padrao(
+            operarios, horas, taxa_producao, meta_diaria, custo_hora))
+        return self._avaliar(op.ravel(), hr.ravel(), taxa.ravel(), meta.ravel(), custo.ravel())
+
+    def simular_grade(self, operarios=None, horas=None, taxa_producao=None,
+                      meta_diaria=None, custo_hora=None, tamanho_bloco=None):
+        """Avalia o produto cartesiano de faixas de parâmetros em uma passada vetorizada.
+
+        Cada argumento aceita um escalar, uma lista/array ou um range. Sem
+        tamanho_bloco retorna um único dicionário colunar com todas as
+        combinações; com tamanho_bloco retorna um gerador de blocos colunares,
+        de modo que grades enormes nunca fiquem inteiras na memória.
+        """
+        eixos = [np.atleast_1d(np.asarray(v, dtype=float)).ravel() for v in self._valores_padrao(
+            operarios, horas, taxa_producao, meta_diaria, custo_hora)]
+        total = int(np.prod([len(eixo) for eixo in eixos]))
+
+        if tamanho_bloco is None:
+            return self._avaliar_fatia_grade(eixos, 0, total)
+        return self._iterar_grade(eixos, total, int(tamanho_bloco))
+
+    def _iterar_grade(self, eixos, total, tamanho_bloco):
+        """Gera os blocos colunares da grade em ordem"""
+        for inicio in range(0, total, tamanho_bloco):
+            yield self._avaliar_fatia_grade(eixos, inicio, min(inicio + tamanho_bloco, total))
+
+    def _avaliar_fatia_grade(self, eixos, inicio, fim):
+        """Avalia as combinações [inicio, fim) da grade sem materializar a grade inteira"""
+        indices = np.unravel_index(np.arange(inicio, fim), [len(eixo) for eixo in eixos])
+        colunas = [eixo[idx] for eixo, idx in zip(eixos, indices)]
+        return self._avaliar(*colunas)
+
+    def simular_monte_carlo(self, n_amostras=1_000_000, operarios=None, horas=None,
+                            distribuicoes=None, semente=None, n_processos=None,
+                            tamanho_bloco=100_000, percentis=PERCENTIS_PADRAO, n_classes=4096):
+        """Simula turnos estocásticos e estima P(meta), percentis e custo esperado.
+
+        Produtividade por operário, absenteísmo e paradas são sorteados das
+        distribuicoes (padrão: PARAMETROS_ESTOCASTICOS). As amostras são
+        processadas em blocos, distribuídos entre processos; cada bloco tem seu
+        próprio fluxo de números aleatórios derivado da semente, então o
+        resultado é reprodutível independente de n_processos. Cada bloco é
+        reduzido a um EstatisticasProducao, e a memória não cresce com n_amostras.
+        """
+        operarios = self.parametros['operarios_maximos'] if operarios is None else operarios
+        horas = self.parametros['horas_efetivas'] if horas is None else horas
+        distribuicoes = {**PARAMETROS_ESTOCASTICOS, **(distribuicoes or {})}
+
+        # Classes do histograma fixas para que os acumuladores possam ser combinados
+        producao_nominal = self.parametros['taxa_producao'] * operarios * horas
+        limite_superior = 2 * producao_nominal if producao_nominal > 0 else 1.0
+
+        sequencia = np.random.SeedSequence(semente)
+        tamanhos = [min(tamanho_bloco, n_amostras - inicio)
+                    for inicio in range(0, n_amostras, tamanho_bloco)]
+        tarefas = [(self.parametros, operarios, horas, distribuicoes, filha, tamanho,
+                    limite_superior, n_classes)
+                   for filha, tamanho in zip(sequencia.spawn(len(tamanhos)), tamanhos)]
+
+        estatisticas = EstatisticasProducao(limite_superior, n_classes)
+        if n_processos == 1 or len(tarefas) <= 1:
+            for parcial in map(_simular_bloco_monte_carlo, tarefas):
+                estatisticas.combinar(parcial)
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                for parcial in executor.map(_simular_bloco_monte_carlo, tarefas):
+                    estatisticas.combinar(parcial)
+
+        resumo = estatisticas.resumo(percentis)
+        resumo.update({
+            'operarios': operarios,
+            'horas': horas,
+            'semente': sequencia.entropy,
         })
-        
-        return cenarios
\ No newline at end of file
+        return resumo
+
+    def _valores_padrao(self, operarios, horas, taxa_producao, meta_diaria, custo_hora):
+        """Preenche os argumentos omitidos com os valores de PARAMETROS"""
+        padroes = (
+            (operarios, 'operarios_maximos'),
+            (horas, 'horas_efetivas'),
+            (taxa_producao, 'taxa_producao'),
+            (meta_diaria, 'meta_diaria'),
+            (custo_hora, 'custo_hora'),
+        )
+        return [self.parametros[chave] if valor is None else valor for valor, chave in padroes]
+
+    def _avaliar(self, operarios, horas, taxa, meta, custo_hora):
+        """Calcula produção, custo, meta e eficiência para arrays alinhados"""
+        operarios = np.asarray(operarios, dtype=float)
+        horas = np.asarray(horas, dtype=float)
+        taxa = np.asarray(taxa, dtype=float)
+        meta = np.asarray(meta, dtype=float)
+        custo_hora = np.asarray(custo_hora, dtype=float)
+
+        homem_hora = operarios * horas
+        producao = taxa * homem_hora
+
+        # Eficiência relativa à capacidade da configuração de referência (mesma
+        # definição usada no dashboard de otimização)
+        capacidade_referencia = (self.parametros['operarios_maximos'] *
+                                 self.parametros['horas_efetivas'] * taxa)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            eficiencia = np.where(capacidade_referencia > 0,
+                                  producao / capacidade_referencia * 100, 0.0)
+
+        return {
+            'operarios': operarios,
+            'horas': horas,
+            'taxa_producao': taxa,
+            'meta_diaria': meta,
+            'custo_hora': custo_hora,
+            'producao': producao,
+            'custo': homem_hora * custo_hora,
+            'meta_atingida': producao >= meta,
+            'eficiencia': eficiencia,
+        }
+
+
+def concatenar_blocos(blocos):
+    """Junta blocos colunares (ex.: de simular_grade com tamanho_bloco) em um só"""
+    blocos = iter(blocos)
+    primeiro = next(blocos, None)
+    if primeiro is None:
+        return {coluna: np.empty(0) for coluna in COLUNAS_LOTE}
+    acumulado = {coluna: [valores] for coluna, valores in primeiro.items()}
+    for bloco in blocos:
+        for coluna, valores in bloco.items():
+            acumulado[coluna].append(valores)
+    return {coluna: np.concatenate(partes) for coluna, partes in acumulado.items()}
+
+
+class EstatisticasProducao:
+    """Acumulador streaming e combinável para a simulação de Monte Carlo.
+
+    Guarda apenas contagens, momentos (média/variância pelo método de Chan)
+    e um histograma de classes fixas para os percentis, então o uso de memória
+    é constante e dois acumuladores com as mesmas classes podem ser combinados.
+    """
+
+    def __init__(self, limite_superior, n_classes=4096):
+        self.limite_superior = float(limite_superior)
+        self.n_classes = int(n_classes)
+        self.histograma = np.zeros(self.n_classes, dtype=np.int64)
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.n_meta = 0
+        self.soma_custo = 0.0
+
+    def atualizar(self, producao, custo, meta):
+        """Incorpora um bloco de amostras (arrays de produção e custo)"""
+        if len(producao) == 0:
+            return
+        bloco = EstatisticasProducao(self.limite_superior, self.n_classes)
+        bloco.n = len(producao)
+        bloco.media = float(producao.mean())
+        bloco.m2 = float(((producao - bloco.media) ** 2).sum())
+        bloco.minimo = float(producao.min())
+        bloco.maximo = float(producao.max())
+        bloco.n_meta = int((producao >= meta).sum())
+        bloco.soma_custo = float(custo.sum())
+        classes = (producao / self.limite_superior * self.n_classes).astype(np.int64)
+        bloco.histograma = np.bincount(np.clip(classes, 0, self.n_classes - 1),
+                                       minlength=self.n_classes)
+        self.combinar(bloco)
+
+    def combinar(self, outro):
+        """Combina outro acumulador (com as mesmas classes) neste"""
+        if outro.n == 0:
+            return
+        if outro.n_classes != self.n_classes or outro.limite_superior != self.limite_superior:
+            raise ValueError("Acumuladores com classes diferentes não podem ser combinados")
+        n_total = self.n + outro.n
+        delta = outro.media - self.media
+        self.media += delta * outro.n / n_total
+        self.m2 += outro.m2 + delta ** 2 * self.n * outro.n / n_total
+        self.n = n_total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.n_meta += outro.n_meta
+        self.soma_custo += outro.soma_custo
+        self.histograma += outro.histograma
+
+    def percentil(self, q):
+        """Percentil q (0-100) estimado pelo histograma, com interpolação na classe"""
+        if self.n == 0:
+            return np.nan
+        acumulado = np.cumsum(self.histograma)
+        alvo = q / 100 * self.n
+        classe = int(np.searchsorted(acumulado, alvo, side='left'))
+        classe = min(classe, self.n_classes - 1)
+        anterior = acumulado[classe - 1] if classe > 0 else 0
+        contagem = self.histograma[classe]
+        fracao = (alvo - anterior) / contagem if contagem else 0.0
+        largura = self.limite_superior / self.n_classes
+        valor = (classe + fracao) * largura
+        return float(np.clip(valor, self.minimo, self.maximo))
+
+    def resumo(self, percentis=PERCENTIS_PADRAO):
+        """Resumo das estatísticas acumuladas"""
+        desvio = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        return {
+            'n_amostras': self.n,
+            'prob_meta': self.n_meta / self.n if self.n else np.nan,
+            'producao_media': self.media,
+            'producao_desvio': float(desvio),
+            'producao_minima': self.minimo,
+            'producao_maxima': self.maximo,
+            'percentis': {q: self.percentil(q) for q in percentis},
+            'custo_esperado': self.soma_custo / self.n if self.n else np.nan,
+        }
+
+
+def amostrar(rng, especificacao, tamanho):
+    """Sorteia amostras de uma distribuição no formato (nome, *argumentos)"""
+    nome, *argumentos = especificacao
+    if nome == 'constante':
+        return np.full(tamanho, float(argumentos[0]))
+    if nome == 'normal':
+        return rng.normal(argumentos[0], argumentos[1], tamanho)
+    if nome == 'lognormal':
+        # Argumentos: média e desvio da própria variável (não do logaritmo)
+        media, desvio = argumentos
+        sigma2 = np.log1p((desvio / media) ** 2)
+        return rng.lognormal(np.log(media) - sigma2 / 2, np.sqrt(sigma2), tamanho)
+    if nome == 'uniforme':
+        return rng.uniform(argumentos[0], argumentos[1], tamanho)
+    if nome == 'triangular':
+        return rng.triangular(argumentos[0], argumentos[1], argumentos[2], tamanho)
+    if nome == 'exponencial':
+        return rng.exponential(argumentos[0], tamanho)
+    if nome == 'bernoulli':
+        return rng.random(tamanho) < argumentos[0]
+    raise ValueError(f"Distribuição desconhecida: {nome}")
+
+
+def _simular_bloco_monte_carlo(tarefa):
+    """Simula um bloco de turnos e devolve apenas o acumulador (executado nos processos)"""
+    parametros, operarios, horas, distribuicoes, semente, tamanho, limite_superior, n_classes = tarefa
+    rng = np.random.default_rng(semente)
+
+    # Matriz (turnos x operários): produtividade individual e presença
+    produtividade = np.clip(amostrar(rng, distribuicoes['produtividade'], (tamanho, operarios)), 0, None)
+    presente = ~amostrar(rng, distribuicoes['absenteismo'], (tamanho, operarios)).astype(bool)
+    parada = np.clip(amostrar(rng, distribuicoes['parada'], tamanho), 0, horas)
+
+    horas_produtivas = horas - parada
+    producao = (parametros['taxa_producao'] * horas_produtivas *
+                (produtividade * presente).sum(axis=1))
+    # Operários presentes recebem o turno inteiro, mesmo com a máquina parada
+    custo = presente.sum(axis=1) * horas * parametros['custo_hora']
+
+    estatisticas = EstatisticasProducao(limite_superior, n_classes)
+    estatisticas.atualizar(producao, custo, parametros['meta_diaria'])
+    return estatisticas
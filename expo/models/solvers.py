@@ -0,0 +1,236 @@
+"""
+Camada de solvers: problema linear em forma matricial e backends intercambiáveis
+(analítico, SciPy/HiGHS e PuLP/CBC), com escolha automática e verificação cruzada
+"""
+
+import math
+import time
+
+import numpy as np
+
+from models.instrumentacao import contar, etapa
+
+
+class ProblemaLinear:
+    """Problema de maximização em forma matricial.
+
+        max  c·x
+        s.a. lb_restricoes <= A x <= ub_restricoes
+             lb <= x <= ub,  x[i] inteiro onde inteiras[i]
+
+    A pode ser um array NumPy denso ou uma matriz esparsa do SciPy.
+    Os nomes de variáveis e restrições são opcionais e servem aos relatórios.
+    """
+
+    def __init__(self, c, A, lb_restricoes, ub_restricoes, lb, ub, inteiras, nome='Problema',
+                 nomes_variaveis=None, nomes_restricoes=None):
+        self.c = np.asarray(c, dtype=float)
+        self.A = A
+        self.lb_restricoes = np.asarray(lb_restricoes, dtype=float)
+        self.ub_restricoes = np.asarray(ub_restricoes, dtype=float)
+        self.lb = np.asarray(lb, dtype=float)
+        self.ub = np.asarray(ub, dtype=float)
+        self.inteiras = np.asarray(inteiras, dtype=bool)
+        self.nome = nome
+        self.nomes_variaveis = list(nomes_variaveis or (f'x_{i}' for i in range(len(self.c))))
+        self.nomes_restricoes = list(nomes_restricoes or (f'R_{i}' for i in range(len(self.lb_restricoes))))
+
+    @property
+    def n_variaveis(self):
+        return len(self.c)
+
+    @property
+    def n_restricoes(self):
+        return len(self.lb_restricoes)
+
+    def copiar(self, **alteracoes):
+        """Cópia do problema com alguns atributos substituídos"""
+        atributos = dict(vars(self))
+        atributos.update(alteracoes)
+        return ProblemaLinear(**atributos)
+
+
+class DivergenciaBackends(AssertionError):
+    """Dois backends chegaram a resultados diferentes na verificação cruzada"""
+
+
+def escolher_backend(problema):
+    """Escolhe o backend mais barato que resolve o problema corretamente"""
+    if problema.n_variaveis == 1:
+        return 'analitico'
+    try:
+        import scipy.optimize  # noqa: F401
+    except ImportError:
+        return 'cbc'
+    return 'highs'
+
+
+def resolver(problema, backend='auto', verificar=None, limite_tempo=None, tolerancia=1e-6):
+    """Resolve o problema com o backend pedido (ou o escolhido automaticamente).
+
+    Com verificar=<nome de outro backend>, resolve também com ele e levanta
+    DivergenciaBackends se status ou valor objetivo não coincidirem.
+    Retorna {'status', 'x', 'objetivo', 'backend', 'tempo_solver'} com status no
+    padrão do PuLP; tempo_solver (s) inclui a conversão para o formato do backend.
+    """
+    if backend == 'auto':
+        backend = escolher_backend(problema)
+    solucao = _executar(backend, problema, limite_tempo)
+
+    if verificar:
+        referencia = _executar(verificar, problema, limite_tempo)
+        _comparar(solucao, referencia, tolerancia)
+
+    return solucao
+
+
+def _executar(backend, problema, limite_tempo):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend}")
+    inicio = time.perf_counter()
+    with etapa('solver', backend=backend):
+        solucao = BACKENDS[backend](problema, limite_tempo)
+    solucao['tempo_solver'] = time.perf_counter() - inicio
+    solucao['backend'] = backend
+    contar('solves', backend=backend, status=solucao['status'])
+    return solucao
+
+
+def _comparar(solucao, referencia, tolerancia):
+    """Confere se duas soluções concordam em status e valor objetivo"""
+    if solucao['status'] != referencia['status']:
+        raise DivergenciaBackends(
+            f"Status divergente: {solucao['backend']}={solucao['status']}, "
+            f"{referencia['backend']}={referencia['status']}")
+    if solucao['status'] == 'Optimal':
+        escala = max(1.0, abs(referencia['objetivo']))
+        if abs(solucao['objetivo'] - referencia['objetivo']) > tolerancia * escala:
+            raise DivergenciaBackends(
+                f"Objetivo divergente: {solucao['backend']}={solucao['objetivo']}, "
+                f"{referencia['backend']}={referencia['objetivo']}")
+
+
+def _resolver_analitico(problema, limite_tempo=None):
+    """Forma fechada para problemas de uma variável: intervalo viável e extremo"""
+    if problema.n_variaveis != 1:
+        raise ValueError("O backend analítico só resolve problemas de uma variável")
+
+    coeficientes = _densa(problema.A)[:, 0] if problema.n_restricoes else np.empty(0)
+    inferior, superior = float(problema.lb[0]), float(problema.ub[0])
+    viavel = True
+
+    # Cada restrição l <= a*x <= u vira um intervalo para x
+    for a, l, u in zip(coeficientes, problema.lb_restricoes, problema.ub_restricoes):
+        if a > 0:
+            inferior, superior = max(inferior, l / a), min(superior, u / a)
+        elif a < 0:
+            inferior, superior = max(inferior, u / a), min(superior, l / a)
+        elif not l <= 0 <= u:
+            viavel = False
+
+    if problema.inteiras[0]:
+        # Folga numérica para não perder inteiros na fronteira (ex.: 3000/700*700)
+        inferior = math.ceil(inferior - 1e-9) if math.isfinite(inferior) else inferior
+        superior = math.floor(superior + 1e-9) if math.isfinite(superior) else superior
+
+    if not viavel or inferior > superior:
+        return {'status': 'Infeasible', 'x': None, 'objetivo': None}
+
+    c = problema.c[0]
+    valor = superior if c > 0 else inferior
+    if not math.isfinite(valor):
+        return {'status': 'Unbounded', 'x': None, 'objetivo': None}
+
+    return {'status': 'Optimal', 'x': np.array([float(valor)]), 'objetivo': float(c * valor)}
+
+
+# Códigos de status do scipy.optimize.milp traduzidos para os nomes do PuLP
+STATUS_MILP = {0: 'Optimal', 1: 'Not Solved', 2: 'Infeasible', 3: 'Unbounded', 4: 'Undefined'}
+
+
+def _resolver_highs(problema, limite_tempo=None):
+    """SciPy milp (HiGHS); aceita matriz densa ou esparsa sem conversão"""
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    restricoes = []
+    if problema.n_restricoes:
+        restricoes.append(LinearConstraint(problema.A, problema.lb_restricoes, problema.ub_restricoes))
+    opcoes = {} if limite_tempo is None else {'time_limit': limite_tempo}
+
+    # milp minimiza: usamos -c e invertemos o sinal do objetivo
+    resposta = milp(-problema.c, constraints=restricoes, bounds=Bounds(problema.lb, problema.ub),
+                    integrality=problema.inteiras.astype(int), options=opcoes)
+
+    status = STATUS_MILP.get(resposta.status, 'Undefined')
+    if resposta.x is None:
+        return {'status': status, 'x': None, 'objetivo': None}
+    return {'status': status, 'x': resposta.x, 'objetivo': float(-resposta.fun)}
+
+
+def _resolver_cbc(problema, limite_tempo=None):
+    """PuLP/CBC, montando as expressões a partir das linhas da matriz"""
+    import pulp
+
+    with etapa('montagem_pulp'):
+        prob, variaveis = modelo_pulp(problema)
+    with etapa('cbc'):
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=limite_tempo))
+
+    status = pulp.LpStatus[prob.status]
+    if status != 'Optimal':
+        return {'status': status, 'x': None, 'objetivo': None}
+    x = np.array([v.value() or 0.0 for v in variaveis])
+    return {'status': status, 'x': x, 'objetivo': float(problema.c @ x)}
+
+
+def modelo_pulp(problema):
+    """Monta o LpProblem a partir das linhas da matriz; retorna (prob, variáveis)"""
+    import pulp
+
+    prob = pulp.LpProblem(problema.nome, pulp.LpMaximize)
+    variaveis = [
+        pulp.LpVariable(f'x_{i}',
+                        lowBound=None if np.isinf(lb) else lb,
+                        upBound=None if np.isinf(ub) else ub,
+                        cat='Integer' if inteira else 'Continuous')
+        for i, (lb, ub, inteira) in enumerate(zip(problema.lb, problema.ub, problema.inteiras))
+    ]
+
+    prob += pulp.lpSum(c * variaveis[j] for j, c in enumerate(problema.c) if c), "Objetivo"
+
+    for i, (indices, valores) in enumerate(_linhas(problema.A)):
+        expressao = pulp.lpSum(v * variaveis[j] for j, v in zip(indices, valores))
+        lb, ub = problema.lb_restricoes[i], problema.ub_restricoes[i]
+        if lb == ub:
+            prob += expressao == lb, f"R_{i}"
+            continue
+        if np.isfinite(lb):
+            prob += expressao >= lb, f"R_{i}_inf"
+        if np.isfinite(ub):
+            prob += expressao <= ub, f"R_{i}_sup"
+
+    return prob, variaveis
+
+
+def _densa(A):
+    return A.toarray() if hasattr(A, 'toarray') else np.atleast_2d(np.asarray(A, dtype=float))
+
+
+def _linhas(A):
+    """Itera (índices, valores) não nulos de cada linha da matriz"""
+    if hasattr(A, 'tocsr'):
+        A = A.tocsr()
+        for i in range(A.shape[0]):
+            inicio, fim = A.indptr[i], A.indptr[i + 1]
+            yield A.indices[inicio:fim], A.data[inicio:fim]
+        return
+    for linha in np.atleast_2d(np.asarray(A, dtype=float)):
+        indices = np.flatnonzero(linha)
+        yield indices, linha[indices]
+
+
+BACKENDS = {
+    'analitico': _resolver_analitico,
+    'highs': _resolver_highs,
+    'cbc': _resolver_cbc,
+}
@@ -0,0 +1,517 @@
+"""
+Serviço local de otimização (asyncio + HTTP/1.1, em TCP ou socket Unix)
+
+Mantém processos de trabalho aquecidos (PuLP, SciPy e modelos já importados),
+agrupa as requisições que chegam dentro de uma janela curta em lotes, junta
+requisições idênticas (mesma CacheSolucoes.chave) numa única execução e
+responde 503 quando a fila está cheia.
+
+Rotas:
+    POST /otimizar  {"parametros": {...}, "metodo": "fixas" | "variaveis", "opcoes_horas": [...]}
+    POST /simular   {"parametros": {...}, "monte_carlo": N, "semente": S}
+    GET  /saude     estado da fila e contadores
+
+Uso:
+    python main.py serve --porta 8765            # ou --unix /tmp/otimizacao.sock
+    python servico.py cliente --requisicoes 200 --concorrencia 16
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import statistics
+import sys
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from data.carregador import TIPOS_PARAMETROS
+from data.parametros import PARAMETROS
+from models.cache import CacheSolucoes
+
+ROTAS = {'/otimizar': 'otimizar', '/simular': 'simular'}
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+MENSAGENS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class ServicoOtimizacao:
+    """Servidor assíncrono que despacha lotes de requisições para processos aquecidos.
+
+    janela: segundos que o despachante espera por mais requisições antes de
+    fechar um lote; lote_maximo: requisições por lote; limite_fila: requisições
+    aguardando despacho antes de responder 503.
+    """
+
+    def __init__(self, parametros=PARAMETROS, n_processos=None, janela=0.005, lote_maximo=64,
+                 limite_fila=1024, cache=None):
+        self.parametros = parametros
+        self.n_processos = n_processos or os.cpu_count() or 1
+        self.janela = janela
+        self.lote_maximo = lote_maximo
+        self.limite_fila = limite_fila
+        self.cache = cache if cache is not None else CacheSolucoes(capacidade=1024)
+        self.contadores = {'requisicoes': 0, 'lotes': 0, 'execucoes': 0, 'deduplicadas': 0,
+                           'cache': 0, 'rejeitadas': 0, 'erros': 0}
+        self._fila = None
+        self._em_andamento = {}
+        self._executor = None
+        self._vagas = None
+        self._tarefas = set()
+
+    async def iniciar(self, host='127.0.0.1', porta=8765, caminho_unix=None):
+        """Aquece os processos e começa a aceitar conexões; retorna o asyncio.Server"""
+        loop = asyncio.get_running_loop()
+        self._fila = asyncio.Queue(maxsize=self.limite_fila)
+        self._vagas = asyncio.Semaphore(self.n_processos)
+        self._executor = ProcessPoolExecutor(max_workers=self.n_processos, initializer=_aquecer)
+        # Força a criação de todos os processos antes da primeira requisição
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _pronto)
+                               for _ in range(self.n_processos)))
+        self._manter(self._despachar())
+
+        if caminho_unix:
+            if os.path.exists(caminho_unix):
+                os.remove(caminho_unix)
+            return await asyncio.start_unix_server(self._atender, path=caminho_unix)
+        return await asyncio.start_server(self._atender, host, porta)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def processar(self, tipo, corpo):
+        """Resolve uma requisição: cache, junção de idênticas ou fila do próximo lote
+
+        Retorna (status_http, resposta).
+        """
+        self.contadores['requisicoes'] += 1
+        try:
+            tarefa = self._montar_tarefa(tipo, corpo)
+        except PedidoInvalido as erro:
+            return 400, {'erro': str(erro)}
+
+        chave = CacheSolucoes.chave(tarefa['tipo'], tarefa['parametros'], opcoes=tarefa['opcoes'])
+        guardado = self.cache.obter(chave)
+        if guardado is not None:
+            self.contadores['cache'] += 1
+            return 200, guardado
+
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            self.contadores['deduplicadas'] += 1
+        else:
+            futuro = asyncio.get_running_loop().create_future()
+            try:
+                self._fila.put_nowait((chave, tarefa))
+            except asyncio.QueueFull:
+                self.contadores['rejeitadas'] += 1
+                return 503, {'erro': 'Fila cheia, tente novamente'}
+            self._em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self._liberar(chave, futuro))
+
+        resultado = await asyncio.shield(futuro)
+        if 'erro' in resultado:
+            return 500, resultado
+        return 200, resultado
+
+    def _liberar(self, chave, futuro):
+        if self._em_andamento.get(chave) is futuro:
+            del self._em_andamento[chave]
+
+    def _montar_tarefa(self, tipo, corpo):
+        """Confere e converte o corpo do pedido; PedidoInvalido antes de ir para a fila"""
+        parametros = dict(self.parametros)
+        parametros.update(_validar_parametros(corpo.get('parametros') or {}))
+        if tipo == 'otimizar':
+            metodo = corpo.get('metodo', 'fixas')
+            if metodo not in ('fixas', 'variaveis'):
+                raise PedidoInvalido(f"Método desconhecido: {metodo}")
+            opcoes_horas = corpo.get('opcoes_horas')
+            opcoes = {'metodo': metodo,
+                      'opcoes_horas': None if opcoes_horas is None else _opcoes_horas(opcoes_horas)}
+        else:
+            monte_carlo, semente = corpo.get('monte_carlo'), corpo.get('semente')
+            if monte_carlo is not None:
+                monte_carlo = _numero('monte_carlo', monte_carlo, inteiro=True) or None
+            if semente is not None:
+                semente = _numero('semente', semente, inteiro=True)
+            opcoes = {'monte_carlo': monte_carlo, 'semente': semente}
+        return {'tipo': tipo, 'parametros': parametros, 'opcoes': opcoes}
+
+    async def _despachar(self):
+        """Fecha lotes pela janela de tempo e os distribui entre os processos"""
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._fila.get()]
+            limite = loop.time() + self.janela
+            while len(lote) < self.lote_maximo:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            self.contadores['lotes'] += 1
+
+            # Um pedaço do lote por processo; com todos ocupados a fila enche e vem o 503
+            tamanho = -(-len(lote) // self.n_processos)
+            for inicio in range(0, len(lote), tamanho):
+                await self._vagas.acquire()
+                self._manter(self._executar(lote[inicio:inicio + tamanho]))
+
+    async def _executar(self, pedaco):
+        loop = asyncio.get_running_loop()
+        try:
+            resultados = await loop.run_in_executor(self._executor, _executar_lote,
+                                                    [tarefa for _, tarefa in pedaco])
+        except Exception as erro:
+            resultados = [{'erro': f'{type(erro).__name__}: {erro}'} for _ in pedaco]
+        finally:
+            self._vagas.release()
+
+        self.contadores['execucoes'] += len(pedaco)
+        for (chave, _), resultado in zip(pedaco, resultados):
+            if 'erro' in resultado:
+                self.contadores['erros'] += 1
+            else:
+                self.cache.guardar(chave, resultado)
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None and not futuro.done():
+                futuro.set_result(resultado)
+
+    def _manter(self, corrotina):
+        # Guarda referência para a tarefa não ser coletada antes de terminar
+        tarefa = asyncio.ensure_future(corrotina)
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    def saude(self):
+        return {'fila': self._fila.qsize(), 'limite_fila': self.limite_fila,
+                'em_andamento': len(self._em_andamento), 'processos': self.n_processos,
+                'contadores': dict(self.contadores), 'cache': self.cache.estatisticas()}
+
+    async def _atender(self, leitor, escritor):
+        """Conexão HTTP/1.1 com keep-alive"""
+        try:
+            while True:
+                try:
+                    pedido = await _ler_pedido(leitor)
+                except PedidoInvalido as erro:
+                    # Sem enquadramento confiável, a conexão não pode ser reaproveitada
+                    _escrever_resposta(escritor, 400, {'erro': str(erro)}, False)
+                    await escritor.drain()
+                    break
+                if pedido is None:
+                    break
+                metodo, caminho, corpo, manter = pedido
+                try:
+                    status, resposta = await self._rotear(metodo, caminho, corpo)
+                except Exception as erro:
+                    status, resposta = 500, {'erro': f'{type(erro).__name__}: {erro}'}
+                _escrever_resposta(escritor, status, resposta, manter)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _rotear(self, metodo, caminho, corpo):
+        if caminho == '/saude':
+            return 200, self.saude()
+        if caminho not in ROTAS:
+            return 404, {'erro': f'Rota desconhecida: {caminho}'}
+        if metodo != 'POST':
+            return 405, {'erro': 'Use POST'}
+        if corpo is _CORPO_GRANDE:
+            return 413, {'erro': 'Corpo da requisição muito grande'}
+        try:
+            dados = json.loads(corpo or b'{}')
+        except ValueError:
+            return 400, {'erro': 'JSON inválido'}
+        if not isinstance(dados, dict):
+            return 400, {'erro': 'O corpo deve ser um objeto JSON'}
+        return await self.processar(ROTAS[caminho], dados)
+
+
+_CORPO_GRANDE = object()
+
+
+class PedidoInvalido(ValueError):
+    """Pedido HTTP malformado ou com parâmetros inválidos (respondido com 400)"""
+
+
+def _validar_parametros(valores):
+    """Parâmetros do pedido convertidos para os tipos de PARAMETROS"""
+    if not isinstance(valores, dict):
+        raise PedidoInvalido("'parametros' deve ser um objeto JSON")
+    parametros = {}
+    for nome, valor in valores.items():
+        if nome == 'opcoes_horas':
+            parametros[nome] = _opcoes_horas(valor)
+        elif nome in TIPOS_PARAMETROS:
+            parametros[nome] = _numero(nome, valor, inteiro=TIPOS_PARAMETROS[nome] == 'i8')
+        else:
+            raise PedidoInvalido(f"Parâmetro desconhecido: {nome!r}")
+    return parametros
+
+
+def _numero(nome, valor, inteiro=False):
+    """Número finito e não negativo (inteiro, se pedido); PedidoInvalido caso contrário"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+        raise PedidoInvalido(f"'{nome}' deve ser um número, recebido {json.dumps(valor)[:80]}")
+    if valor < 0 or (inteiro and valor != int(valor)):
+        tipo = 'um inteiro não negativo' if inteiro else 'um número não negativo'
+        raise PedidoInvalido(f"'{nome}' deve ser {tipo}, recebido {valor}")
+    return int(valor) if inteiro else valor
+
+
+def _opcoes_horas(valores):
+    if not isinstance(valores, list) or not valores:
+        raise PedidoInvalido("'opcoes_horas' deve ser uma lista de horas")
+    horas = [_numero('opcoes_horas', valor) for valor in valores]
+    if min(horas) <= 0:
+        raise PedidoInvalido("'opcoes_horas' deve ter só horas positivas")
+    return horas
+
+
+async def _ler_pedido(leitor):
+    """Lê um pedido HTTP; retorna (método, caminho, corpo, keep_alive) ou None no fim"""
+    linha = await leitor.readline()
+    if not linha.strip():
+        return None
+    try:
+        metodo, caminho, versao = linha.decode('latin-1').split()
+    except ValueError:
+        texto = linha.strip()[:80].decode('latin-1')
+        raise PedidoInvalido(f"Linha de pedido malformada: {texto!r}") from None
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    try:
+        tamanho = int(cabecalhos.get('content-length', 0))
+    except ValueError:
+        raise PedidoInvalido(f"Content-Length inválido: {cabecalhos['content-length'][:80]!r}") from None
+    if tamanho < 0:
+        raise PedidoInvalido(f"Content-Length inválido: {tamanho}")
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        return metodo, caminho, _CORPO_GRANDE, False
+    corpo = await leitor.readexactly(tamanho) if tamanho else b''
+    conexao = cabecalhos.get('connection', '').lower()
+    manter = conexao != 'close' if versao == 'HTTP/1.1' else conexao == 'keep-alive'
+    return metodo, caminho.split('?')[0], corpo, manter
+
+
+def _escrever_resposta(escritor, status, resposta, manter):
+    corpo = json.dumps(resposta, ensure_ascii=False, default=_valor_json).encode('utf-8')
+    cabecalhos = [
+        f'HTTP/1.1 {status} {MENSAGENS_HTTP.get(status, "")}',
+        'Content-Type: application/json; charset=utf-8',
+        f'Content-Length: {len(corpo)}',
+        f'Connection: {"keep-alive" if manter else "close"}',
+    ]
+    if status == 503:
+        cabecalhos.append('Retry-After: 1')
+    escritor.write(('\r\n'.join(cabecalhos) + '\r\n\r\n').encode('latin-1') + corpo)
+
+
+def _valor_json(valor):
+    if hasattr(valor, 'tolist'):
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+# Funções executadas nos processos de trabalho
+
+def _aquecer():
+    """Importa os modelos e resolve um problema pequeno para carregar PuLP/HiGHS"""
+    from models.otimizacao import OtimizadorProducao
+    from models.simulacao import SimuladorCenarios
+
+    otimizador = OtimizadorProducao(PARAMETROS, cache=False)
+    otimizador.otimizar_producao()
+    otimizador.otimizar_com_horas_variaveis()
+    SimuladorCenarios(PARAMETROS).simular_cenarios()
+
+
+def _pronto():
+    return os.getpid()
+
+
+def _executar_lote(tarefas):
+    """Executa um pedaço do lote; erros ficam na resposta da própria tarefa"""
+    return [_executar_tarefa(tarefa) for tarefa in tarefas]
+
+
+def _executar_tarefa(tarefa):
+    from models.otimizacao import OtimizadorProducao
+    from models.simulacao import SimuladorCenarios
+
+    parametros, opcoes = tarefa['parametros'], tarefa['opcoes']
+    try:
+        if tarefa['tipo'] == 'otimizar':
+            # O cache fica no serviço; nos processos ele só duplicaria memória
+            otimizador = OtimizadorProducao(parametros, cache=False)
+            if opcoes['metodo'] == 'variaveis':
+                resultado = otimizador.otimizar_com_horas_variaveis(opcoes['opcoes_horas'])
+            else:
+                resultado = otimizador.otimizar_producao()
+            if resultado is None:
+                return {'status': 'Infeasible', 'resultado': None}
+            resultado['custo_total'] = otimizador.calcular_custo(resultado['operarios_ideais'],
+                                                                 resultado['horas_ideais'])
+            return json.loads(json.dumps(resultado, default=_valor_json))
+
+        simulador = SimuladorCenarios(parametros)
+        if opcoes['monte_carlo']:
+            resumo = simulador.simular_monte_carlo(opcoes['monte_carlo'], semente=opcoes['semente'],
+                                                   n_processos=1)
+            return json.loads(json.dumps(resumo, default=_valor_json))
+        return {'cenarios': json.loads(json.dumps(simulador.simular_cenarios(), default=_valor_json))}
+    except Exception as erro:
+        return {'erro': f'{type(erro).__name__}: {erro}'}
+
+
+def servir(parametros=PARAMETROS, host='127.0.0.1', porta=8765, caminho_unix=None, **opcoes):
+    """Executa o serviço até Ctrl+C"""
+    servico = ServicoOtimizacao(parametros, **opcoes)
+
+    async def executar():
+        servidor = await servico.iniciar(host, porta, caminho_unix)
+        endereco = caminho_unix or f'http://{host}:{porta}'
+        print(f"🚀 Serviço de otimização em {endereco} ({servico.n_processos} processos aquecidos)")
+        async with servidor:
+            await servidor.serve_forever()
+
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        print("\n🛑 Serviço encerrado")
+    finally:
+        servico.encerrar()
+    return 0
+
+
+# Cliente
+
+class _ConexaoUnix(http.client.HTTPConnection):
+    def __init__(self, caminho, timeout=30):
+        super().__init__('localhost', timeout=timeout)
+        self.caminho = caminho
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.caminho)
+
+
+class ClienteServico:
+    """Cliente síncrono (uma conexão keep-alive) para o ServicoOtimizacao"""
+
+    def __init__(self, host='127.0.0.1', porta=8765, caminho_unix=None, timeout=30):
+        if caminho_unix:
+            self._conexao = _ConexaoUnix(caminho_unix, timeout)
+        else:
+            self._conexao = http.client.HTTPConnection(host, porta, timeout=timeout)
+
+    def otimizar(self, parametros=None, metodo='fixas', opcoes_horas=None):
+        return self._pedir('POST', '/otimizar', {'parametros': parametros or {}, 'metodo': metodo,
+                                                 'opcoes_horas': opcoes_horas})
+
+    def simular(self, parametros=None, monte_carlo=None, semente=None):
+        return self._pedir('POST', '/simular', {'parametros': parametros or {},
+                                                'monte_carlo': monte_carlo, 'semente': semente})
+
+    def saude(self):
+        return self._pedir('GET', '/saude')
+
+    def fechar(self):
+        self._conexao.close()
+
+    def _pedir(self, metodo, caminho, dados=None):
+        """Retorna (status_http, resposta)"""
+        corpo = None if dados is None else json.dumps(dados).encode('utf-8')
+        cabecalhos = {'Content-Type': 'application/json'} if corpo else {}
+        self._conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+        resposta = self._conexao.getresponse()
+        return resposta.status, json.loads(resposta.read() or b'null')
+
+
+def carga(requisicoes=200, concorrencia=16, variantes=20, host='127.0.0.1', porta=8765,
+          caminho_unix=None):
+    """Dispara requisições concorrentes de otimização e resume latência e status
+
+    variantes controla quantas metas diárias diferentes aparecem, para exercitar
+    a junção de requisições idênticas e o cache.
+    """
+
+    def trabalhador(indices):
+        cliente = ClienteServico(host, porta, caminho_unix)
+        medidas = []
+        try:
+            for i in indices:
+                parametros = {'meta_diaria': 2000 + 100 * (i % variantes)}
+                inicio = time.perf_counter()
+                status, _ = cliente.otimizar(parametros, metodo='variaveis' if i % 2 else 'fixas')
+                medidas.append((status, time.perf_counter() - inicio))
+        finally:
+            cliente.fechar()
+        return medidas
+
+    grupos = [range(i, requisicoes, concorrencia) for i in range(concorrencia)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        medidas = [medida for grupo in executor.map(trabalhador, grupos) for medida in grupo]
+    duracao = time.perf_counter() - inicio
+
+    latencias = sorted(latencia for _, latencia in medidas)
+    status = {}
+    for codigo, _ in medidas:
+        status[codigo] = status.get(codigo, 0) + 1
+    return {
+        'requisicoes': len(medidas),
+        'duracao': duracao,
+        'vazao': len(medidas) / duracao if duracao else 0.0,
+        'latencia_mediana': statistics.median(latencias),
+        'latencia_p95': latencias[int(0.95 * (len(latencias) - 1))],
+        'status': status,
+    }
+
+
+def _main_cliente(argv=None):
+    parser = argparse.ArgumentParser(description="Cliente de carga do serviço de otimização")
+    parser.add_argument('comando', choices=['cliente'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--unix', metavar='CAMINHO')
+    parser.add_argument('--requisicoes', type=int, default=200)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--variantes', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    resumo = carga(args.requisicoes, args.concorrencia, args.variantes, args.host, args.porta, args.unix)
+    print(f"📨 {resumo['requisicoes']} requisições em {resumo['duracao']:.2f} s "
+          f"({resumo['vazao']:.0f}/s)")
+    print(f"⏱️ Latência mediana {resumo['latencia_mediana'] * 1000:.1f} ms, "
+          f"p95 {resumo['latencia_p95'] * 1000:.1f} ms")
+    print(f"📊 Status HTTP: {resumo['status']}")
+    cliente = ClienteServico(args.host, args.porta, args.unix)
+    print(f"🩺 Saúde: {cliente.saude()[1]}")
+    cliente.fechar()
+    return 0 if set(resumo['status']) <= {200, 503} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_main_cliente())
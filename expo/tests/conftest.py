@@ -0,0 +1,9 @@
+"""
+Configuração dos testes: os módulos são importados a partir de expo/,
+como em main.py (python -m pytest a partir de expo/)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+"""
+Testes do acompanhamento do turno (models/acompanhamento.py)
+"""
+
+import io
+
+from data.parametros import PARAMETROS
+from models.acompanhamento import AcompanhadorTurno, _interpretar, acompanhar
+
+
+def test_registros_que_nao_avancam_a_hora_sao_ignorados():
+    acompanhador = AcompanhadorTurno(PARAMETROS)
+    assert acompanhador.atualizar(0, 0) is None
+    assert acompanhador.atualizar(1, 600)['producao_acumulada'] == 600
+    assert acompanhador.atualizar(1, 50) is None
+    assert acompanhador.ignorados == 2
+
+
+def test_linhas_malformadas_sao_ignoradas(monkeypatch):
+    monkeypatch.setattr('sys.stderr', io.StringIO())
+    assert _interpretar('hora,producao') is None
+    assert _interpretar('2') is None
+    assert _interpretar('{"hora": 2}') is None
+    assert _interpretar('1.5, 300, 5') == {'hora': 1.5, 'producao': 300.0, 'operarios': 5.0}
+
+
+def test_operarios_necessarios_vem_do_solver():
+    # Meta 3000 em 7 h a 100 un./h: ceil(3000 / 700) = 5 operários
+    assert AcompanhadorTurno(PARAMETROS).decisao['operarios_necessarios'] == 5
+
+    # Ritmo abaixo do previsto (60 un./h por operário): na 1ª hora a taxa estimada
+    # cai para 88 e 2700 / (88 * 6) pede 6 operários; na 2ª a meta fica inviável
+    registros = [{'hora': h, 'producao': 300.0, 'operarios': 5} for h in range(1, 7)]
+    situacoes = list(acompanhar(PARAMETROS, registros))
+    assert [situacao['operarios_necessarios'] for situacao in situacoes] == [6] + [None] * 5
+    assert [situacao['reotimizado'] for situacao in situacoes] == [True, True] + [False] * 4
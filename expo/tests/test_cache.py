@@ -0,0 +1,48 @@
+"""
+Testes do cache de soluções (models/cache.py) usado por OtimizadorProducao
+"""
+
+from unittest import mock
+
+from data.parametros import PARAMETROS
+from models import solvers
+from models.cache import CacheSolucoes
+from models.otimizacao import OtimizadorProducao
+
+INVIAVEL = dict(PARAMETROS, meta_diaria=99_999)
+
+
+def test_resultado_inviavel_tambem_fica_no_cache(tmp_path):
+    cache = CacheSolucoes(diretorio=str(tmp_path))
+    otimizador = OtimizadorProducao(INVIAVEL, cache=cache)
+    assert otimizador.otimizar_com_horas_variaveis() is None
+
+    with mock.patch.object(OtimizadorProducao, '_resolver') as resolver:
+        assert otimizador.otimizar_com_horas_variaveis() is None
+        # Também a partir do disco, num cache novo
+        novo = OtimizadorProducao(INVIAVEL, cache=CacheSolucoes(diretorio=str(tmp_path)))
+        assert novo.otimizar_com_horas_variaveis() is None
+    resolver.assert_not_called()
+
+
+def test_backend_e_verificacao_entram_na_chave():
+    cache = CacheSolucoes()
+    OtimizadorProducao(PARAMETROS, cache=cache, backend='cbc').otimizar_com_horas_variaveis()
+    with mock.patch('models.otimizacao.resolver', wraps=solvers.resolver) as resolver:
+        OtimizadorProducao(PARAMETROS, cache=cache, backend='highs', verificar='cbc').otimizar_com_horas_variaveis()
+    resolver.assert_called_once()
+    assert resolver.call_args.kwargs['verificar'] == 'cbc'
+
+
+def test_acertos_da_memoria_e_do_disco_sao_copias_iguais(tmp_path):
+    import numpy as np
+
+    cache = CacheSolucoes(diretorio=str(tmp_path))
+    cache.guardar('chave', {'por_horas': {'8': {'operarios': np.int64(6)}}, 'producao': np.arange(3)})
+
+    da_memoria = cache.obter('chave')
+    da_memoria['por_horas']['8']['operarios'] = 0
+    da_memoria['producao'].append(99)
+    do_disco = CacheSolucoes(diretorio=str(tmp_path)).obter('chave')
+
+    assert cache.obter('chave') == do_disco == {'por_horas': {'8': {'operarios': 6}}, 'producao': [0, 1, 2]}
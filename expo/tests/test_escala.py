@@ -0,0 +1,43 @@
+"""
+Testes da escala semanal (models/escala.py): heurística e gap para o MILP
+"""
+
+import numpy as np
+import pytest
+
+from models.escala import EscalonadorTurnos, instancia_escala
+
+
+@pytest.fixture
+def escalonador():
+    return EscalonadorTurnos(instancia_escala(20, n_dias=3, semente=1))
+
+
+def test_heuristica_respeita_as_restricoes(escalonador):
+    e = escalonador
+    escala = e.resolver_heuristico(limite_tempo=1.0)
+
+    assert escala['status'] == 'Optimal'
+    assert escala['metodo'] == 'heuristico' and not escala['otimalidade_comprovada']
+    # Um turno por operário por vez, max_turnos e postos por (turno, linha)
+    pares = [(operario, turno) for operario, turno, _ in escala['atribuicoes']]
+    assert len(pares) == len(set(pares))
+    assert np.all(escala['turnos_por_operario'] <= e.max_turnos)
+    celulas = {}
+    for _, turno, linha in escala['atribuicoes']:
+        celulas[turno, linha] = celulas.get((turno, linha), 0) + 1
+    linhas = e.instancia['nomes_linhas']
+    assert all(n <= e.postos[linhas.index(linha)] for (_, linha), n in celulas.items())
+    assert escala['objetivo'] == pytest.approx(escala['custo'] + e.penalidade * escala['falta_total'])
+    np.testing.assert_allclose(escala['falta'], np.clip(e.demanda - escala['producao'], 0, None))
+
+
+def test_gap_da_heuristica_contra_o_milp(escalonador):
+    comparacao = escalonador.comparar(limite_tempo_heuristico=1.0)
+    exato, heuristico = comparacao['exato'], comparacao['heuristico']
+
+    assert exato['status'] == 'Optimal' and exato['otimalidade_comprovada']
+    assert comparacao['gap_comprovado']
+    assert comparacao['gap'] == pytest.approx((heuristico['objetivo'] - exato['objetivo']) / exato['objetivo'])
+    # O MILP é ótimo: a heurística não passa dele e fica perto
+    assert -1e-9 <= comparacao['gap'] < 0.05
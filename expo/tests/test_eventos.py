@@ -0,0 +1,64 @@
+"""
+Testes da calibração por eventos discretos (models/eventos.py)
+"""
+
+import pytest
+
+from data.parametros import PARAMETROS
+from models.eventos import SimuladorEventos
+
+CICLO = 36 / 3600  # 100 peças/hora por operário
+
+
+def _linha_deterministica(pausas=()):
+    """Uma estação sem variação, setups nem quebras, com máquina para cada operário"""
+    return {
+        'estacoes': [{'nome': 'Unica', 'maquinas': PARAMETROS['operarios_maximos'],
+                      'ciclo': ('constante', CICLO)}],
+        'capacidade_buffer': 10,
+        'wip_inicial': 0,
+        'pausas': list(pausas),
+    }
+
+
+def test_linha_sem_perdas_reproduz_taxa_e_horas_nominais():
+    medicao = SimuladorEventos(PARAMETROS, _linha_deterministica()).calibrar(4, semente=1, n_processos=1)
+
+    assert medicao['taxa_producao'] == pytest.approx(1 / CICLO)
+    assert medicao['horas_efetivas'] == pytest.approx(PARAMETROS['horas_maximas'])
+    assert medicao['producao_media'] == pytest.approx(
+        PARAMETROS['operarios_maximos'] * PARAMETROS['horas_maximas'] / CICLO)
+    assert medicao['producao_desvio'] == 0.0
+    assert medicao['uso_operarios']['processamento'] == pytest.approx(1.0)
+
+
+def test_pausas_saem_das_horas_efetivas():
+    pausas = [(2.0, 0.5), (5.0, 0.5)]
+    medicao = SimuladorEventos(PARAMETROS, _linha_deterministica(pausas)).calibrar(4, semente=1,
+                                                                                  n_processos=1)
+
+    assert medicao['taxa_producao'] == pytest.approx(1 / CICLO)
+    # Um ciclo já iniciado termina dentro da pausa: no máximo um ciclo por pausa
+    assert medicao['horas_efetivas'] == pytest.approx(PARAMETROS['horas_maximas'] - 1.0, abs=len(pausas) * CICLO)
+    assert medicao['uso_operarios']['pausa'] == pytest.approx(1.0 / PARAMETROS['horas_maximas'],
+                                                             abs=len(pausas) * CICLO)
+
+
+def test_parametros_calibrados_reproduzem_a_producao_simulada():
+    medicao = SimuladorEventos(PARAMETROS).calibrar(20, semente=3, n_processos=1)
+    calibrados = medicao['parametros_calibrados']
+
+    producao = calibrados['taxa_producao'] * medicao['operarios'] * calibrados['horas_efetivas']
+    assert producao == pytest.approx(medicao['producao_media'])
+    # Setups, quebras, pausas e filas tiram horas do turno nominal
+    assert 0 < calibrados['horas_efetivas'] < PARAMETROS['horas_maximas']
+    # Só ciclos concluídos contam: o que está em andamento no fim do turno fica de fora
+    assert 0.98 < sum(medicao['uso_operarios'].values()) <= 1.0 + 1e-9
+
+
+def test_resultado_depende_so_da_semente():
+    simulador = SimuladorEventos(PARAMETROS)
+    sequencial = simulador.calibrar(20, semente=7, n_processos=1)
+    paralelo = simulador.calibrar(20, semente=7, n_processos=2)
+
+    assert sequencial == paralelo
@@ -0,0 +1,54 @@
+"""
+Testes do histórico de execuções (data/historico.py)
+"""
+
+import numpy as np
+import pytest
+
+from data.historico import HistoricoExecucoes
+from data.parametros import PARAMETROS
+
+
+@pytest.fixture
+def historico(tmp_path):
+    with HistoricoExecucoes(str(tmp_path)) as historico:
+        yield historico
+
+
+@pytest.fixture
+def execucao(historico):
+    """Execução com o conjunto 'grade' gravado em três segmentos de tamanhos diferentes"""
+    execucao = historico.registrar('simulate', PARAMETROS, {'prob_meta': 0.9})
+    for inicio, fim in [(0, 7), (7, 20), (20, 31)]:
+        historico.acrescentar(execucao, 'grade', {'i': np.arange(inicio, fim),
+                                                  'x': np.arange(inicio, fim) * 0.5})
+    return execucao
+
+
+@pytest.mark.parametrize('inicio, fim, passo', [
+    (0, None, 1), (3, 25, 1), (5, 30, 4), (7, 20, 1), (19, 21, 1), (2, None, 7), (30, None, 1), (12, 12, 1),
+])
+def test_carregar_fatia_atravessando_segmentos(historico, execucao, inicio, fim, passo):
+    esperado = np.arange(31)[inicio:fim:passo]
+    dados = historico.carregar(execucao, 'grade', inicio=inicio, fim=fim, passo=passo)
+    np.testing.assert_array_equal(dados['i'], esperado)
+    np.testing.assert_array_equal(dados['x'], esperado * 0.5)
+
+
+def test_carregar_so_as_colunas_pedidas(historico, execucao):
+    dados = historico.carregar(execucao, 'grade', colunas=['x'], inicio=-3)
+    assert list(dados) == ['x']
+    np.testing.assert_array_equal(dados['x'], np.arange(28, 31) * 0.5)
+
+
+def test_metadados_e_consulta_por_parametros(historico, execucao):
+    historico.registrar('optimize', dict(PARAMETROS, meta_diaria=1))
+
+    assert historico.conjuntos(execucao) == {'grade': {'linhas': 31, 'colunas': ['i', 'x']}}
+    assert [linha['id'] for linha in historico.execucoes(parametros=PARAMETROS)] == [execucao]
+    assert historico.obter(execucao)['resultado'] == {'prob_meta': 0.9}
+
+
+def test_colunas_diferentes_sao_rejeitadas(historico, execucao):
+    with pytest.raises(ValueError):
+        historico.acrescentar(execucao, 'grade', {'i': np.arange(3)})
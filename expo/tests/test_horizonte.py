@@ -0,0 +1,53 @@
+"""
+Testes do planejamento de vários dias (models/horizonte.py)
+"""
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS, PARAMETROS_HORIZONTE
+from models.horizonte import COLUNAS_PLANO, PlanejadorHorizonte, demanda_exemplo
+
+GAP_MIP = 1e-4
+
+
+@pytest.fixture(scope='module')
+def demanda():
+    return demanda_exemplo(PARAMETROS, 28)
+
+
+@pytest.fixture(scope='module')
+def rolante(demanda):
+    return PlanejadorHorizonte(PARAMETROS, demanda).planejar('rolante', janela=14, fixar=7, n_processos=1)
+
+
+def test_rolante_igual_ao_monolitico(demanda, rolante):
+    monolitico = PlanejadorHorizonte(PARAMETROS, demanda).planejar('monolitico')
+    assert rolante['status'] == monolitico['status'] == 'Optimal'
+    # Os dois são MILPs resolvidos até o gap relativo padrão do HiGHS (1e-4)
+    assert rolante['custo_total'] == pytest.approx(monolitico['custo_total'], rel=GAP_MIP)
+
+
+def test_sequencial_resolve_cada_janela_uma_vez(rolante):
+    assert rolante['janelas'] == 4
+    assert rolante['resolucoes'] == 4
+
+
+@pytest.mark.parametrize('n_processos', [2, 4])
+def test_rolante_em_paralelo_igual_ao_sequencial(demanda, rolante, n_processos):
+    paralelo = PlanejadorHorizonte(PARAMETROS, demanda).planejar('rolante', janela=14, fixar=7,
+                                                                 n_processos=n_processos)
+    assert paralelo['custo_total'] == pytest.approx(rolante['custo_total'], rel=1e-9)
+    # A especulação fica limitada ao número de processos por rodada
+    assert paralelo['resolucoes'] <= paralelo['rodadas'] * n_processos
+    for coluna in COLUNAS_PLANO:
+        np.testing.assert_allclose(paralelo['plano'][coluna], rolante['plano'][coluna], atol=1e-6)
+
+
+def test_plano_respeita_balanco_e_limite_semanal(demanda, rolante):
+    plano = rolante['plano']
+    estoque_anterior = np.concatenate([[0.0], plano['estoque'][:-1]])
+    np.testing.assert_allclose(estoque_anterior + plano['producao'] + plano['falta'] - plano['demanda'],
+                               plano['estoque'], atol=1e-6)
+    semanal = np.bincount(plano['dia'].astype(int) // 7, weights=plano['horas_extra'])
+    assert np.all(semanal <= PARAMETROS_HORIZONTE['horas_extra_semanais'] + 1e-6)
@@ -0,0 +1,55 @@
+"""
+Testes do modelo incremental (models/incremental.py) contra um OtimizadorProducao novo
+"""
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS
+from models.incremental import ModeloIncremental
+from models.otimizacao import OtimizadorProducao
+from models.solvers import resolver
+
+CAMPOS = ('status', 'operarios_ideais', 'horas_ideais', 'producao_maxima', 'meta_atingida')
+
+
+def test_alterar_coeficiente_equivale_a_montar_de_novo():
+    incremental = ModeloIncremental(PARAMETROS)
+    # Minimiza operários: a meta passa a decidir quantos são escalados
+    incremental.alterar_objetivo('Operarios', -1.0)
+    assert incremental.resolver()['operarios_ideais'] == 5  # 3000 / 700
+
+    horas = PARAMETROS['horas_efetivas']
+    for taxa in (80, 40):
+        incremental.alterar_coeficiente('Meta_Minima', 'Operarios', taxa * horas)
+        resultado = incremental.resolver()
+
+        novo = OtimizadorProducao(dict(PARAMETROS, taxa_producao=taxa), cache=False)
+        esperado = resolver(novo.modelo_horas_fixas(horas).copiar(c=np.array([-1.0])), backend='cbc')
+        assert resultado['status'] == esperado['status']
+        if esperado['status'] == 'Optimal':
+            assert resultado['operarios_ideais'] == pytest.approx(esperado['x'][0])
+    assert resultado['status'] == 'Infeasible'  # 40 * 7 * 6 < 3000
+
+
+@pytest.mark.parametrize('metodo', ['horas_fixas', 'horas_selecionadas'])
+def test_alterar_parametros_equivale_a_otimizar_de_novo(metodo):
+    incremental = ModeloIncremental(PARAMETROS, metodo=metodo)
+    incremental.resolver()
+
+    for alteracoes in ({'meta_diaria': 3500}, {'taxa_producao': 60},
+                       {'operarios_maximos': 9, 'custo_hora': 20}, {'meta_diaria': 3500}):
+        alteradas = incremental.alterar_parametros(**alteracoes)
+        resultado = incremental.resolver()
+
+        novo = OtimizadorProducao(incremental.parametros, cache=False)
+        if metodo == 'horas_fixas':
+            esperado = novo.otimizar_producao()
+        else:
+            esperado = novo.otimizar_com_horas_variaveis(incremental.opcoes_horas)
+        if esperado is None:
+            assert resultado is None or resultado['status'] != 'Optimal'
+        else:
+            assert {campo: resultado[campo] for campo in CAMPOS} == {campo: esperado[campo] for campo in CAMPOS}
+    # A última alteração repete um valor que já está no modelo
+    assert alteradas == 0
@@ -0,0 +1,82 @@
+"""
+Testes da carga e otimização em lote (data/carregador.py, models/lote.py)
+"""
+
+import csv
+import json
+
+from models.lote import otimizar_arquivo
+
+ENTRADA = """planta,taxa_producao,meta_diaria,operarios_maximos
+A,100,3000,6
+B,abc,3000,6
+C,100,99999,6
+D,,2000,
+"""
+
+
+def _gravar_entrada(tmp_path):
+    caminho = tmp_path / 'plantas.csv'
+    caminho.write_text(ENTRADA, encoding='utf-8')
+    return str(caminho)
+
+
+def test_linhas_invalidas_e_inviaveis_nao_interrompem_o_lote(tmp_path):
+    saida = tmp_path / 'resultados.csv'
+    resumo = otimizar_arquivo(_gravar_entrada(tmp_path), str(saida), n_processos=1)
+
+    assert resumo['conjuntos'] == 4
+    assert resumo['viaveis'] == 2
+    assert resumo['invalidos'] == 1
+    with open(saida, newline='', encoding='utf-8') as arquivo:
+        linhas = {linha['planta']: linha for linha in csv.DictReader(arquivo)}
+    assert linhas['A']['status'] == 'Optimal' and float(linhas['A']['custo_total']) == 756.0
+    assert linhas['B']['status'] == 'Invalido'
+    assert linhas['C']['status'] == 'Infeasible'
+    for planta in 'BC':
+        assert linhas[planta]['operarios_ideais'] == linhas[planta]['custo_total'] == ''
+    # Campos vazios usam os padrões de PARAMETROS
+    assert linhas['D']['operarios_ideais'] == '6.0'
+
+
+def test_resultados_ausentes_viram_null_em_json_lines(tmp_path):
+    saida = tmp_path / 'resultados.jsonl'
+    otimizar_arquivo(_gravar_entrada(tmp_path), str(saida), metodo='variaveis', n_processos=1)
+
+    linhas = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    inviavel = next(linha for linha in linhas if linha['planta'] == 'C')
+    assert inviavel['producao_maxima'] is None and inviavel['status'] == 'Infeasible'
+
+
+def test_opcoes_de_horas_dos_padroes_chegam_ao_otimizador(tmp_path):
+    from data.parametros import PARAMETROS
+
+    saida = tmp_path / 'resultados.jsonl'
+    padroes = dict(PARAMETROS, opcoes_horas=[6])
+    otimizar_arquivo(_gravar_entrada(tmp_path), str(saida), metodo='variaveis',
+                     n_processos=1, padroes=padroes)
+
+    linhas = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    assert {linha['horas_ideais'] for linha in linhas if linha['status'] == 'Optimal'} == {6}
+
+
+def test_inteiros_fracionarios_ou_negativos_invalidam_a_linha(tmp_path):
+    from data.carregador import carregar_parametros
+
+    caminho = tmp_path / 'plantas.csv'
+    caminho.write_text('planta,operarios_maximos\nA,7.9\nB,-2\nC,7.0\n', encoding='utf-8')
+    bloco = carregar_parametros(str(caminho))
+
+    assert bloco['valido'].tolist() == [False, False, True]
+    assert bloco['operarios_maximos'][2] == 7
+
+
+def test_identificadores_longos_nao_sao_cortados(tmp_path):
+    entrada = tmp_path / 'plantas.csv'
+    planta = 'Planta ' + 'X' * 80
+    entrada.write_text(f'planta,meta_diaria\n{planta},3000\nB,3000\n', encoding='utf-8')
+    saida = tmp_path / 'resultados.csv'
+    otimizar_arquivo(str(entrada), str(saida), n_processos=1, tamanho_bloco=1)
+
+    with open(saida, newline='', encoding='utf-8') as arquivo:
+        assert [linha['planta'] for linha in csv.DictReader(arquivo)] == [planta, 'B']
@@ -0,0 +1,75 @@
+"""
+Testes do otimizador (models/otimizacao.py)
+"""
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS
+from models.otimizacao import OtimizadorProducao
+from models.solvers import resolver
+
+OPCOES_HORAS = [6, 7, 8, 9]
+
+
+def _parametros_sorteados(n, semente=0):
+    rng = np.random.default_rng(semente)
+    for _ in range(n):
+        yield dict(PARAMETROS, taxa_producao=int(rng.integers(60, 140)),
+                   operarios_maximos=int(rng.integers(2, 10)), meta_diaria=int(rng.integers(500, 9000)))
+
+
+def _laco_por_horas(parametros, opcoes_horas):
+    """Laço original: um modelo de horas fixas por opção; fica a maior produção"""
+    otimizador = OtimizadorProducao(parametros, cache=False)
+    melhor = None
+    for horas in opcoes_horas:
+        solucao = resolver(otimizador.modelo_horas_fixas(horas), backend='cbc')
+        if solucao['status'] == 'Optimal' and (melhor is None or solucao['objetivo'] > melhor['producao_maxima']):
+            melhor = {'operarios_ideais': solucao['x'][0], 'horas_ideais': horas,
+                      'producao_maxima': solucao['objetivo']}
+    return melhor
+
+
+@pytest.mark.parametrize('modo', ['milp', 'decomposicao'])
+def test_horas_variaveis_coincide_com_o_laco_por_horas(modo):
+    for parametros in _parametros_sorteados(25):
+        esperado = _laco_por_horas(parametros, OPCOES_HORAS)
+        resultado = OtimizadorProducao(parametros, cache=False).otimizar_com_horas_variaveis(
+            OPCOES_HORAS, modo=modo, n_processos=1)
+
+        if esperado is None:
+            assert resultado is None, parametros
+            continue
+        assert resultado['status'] == 'Optimal' and resultado['meta_atingida']
+        assert resultado['horas_ideais'] == esperado['horas_ideais'], parametros
+        assert resultado['operarios_ideais'] == pytest.approx(esperado['operarios_ideais'])
+        assert resultado['producao_maxima'] == pytest.approx(esperado['producao_maxima'])
+
+
+def _pontos_enumerados(parametros, opcoes_horas):
+    """Todas as escalas (operários, horas) com sua produção e seu custo"""
+    return [(parametros['taxa_producao'] * operarios * horas, parametros['custo_hora'] * operarios * horas)
+            for operarios in range(parametros['operarios_maximos'] + 1) for horas in opcoes_horas]
+
+
+@pytest.mark.parametrize('n_processos', [1, 2])
+def test_fronteira_de_pareto_nao_dominada_e_completa(n_processos):
+    parametros = dict(PARAMETROS, custo_hora=18.0, opcoes_horas=OPCOES_HORAS)
+    fronteira = OtimizadorProducao(parametros, cache=False).fronteira_pareto(n_pontos=30,
+                                                                          n_processos=n_processos)
+    producao, custo = fronteira['producao'], fronteira['custo']
+
+    # Ordenada por custo, com produção crescente: nenhum ponto domina outro
+    assert np.all(np.diff(custo) > 0) and np.all(np.diff(producao) > 0)
+    for i in range(len(custo)):
+        dominado = (producao >= producao[i]) & (custo <= custo[i]) & ((producao > producao[i]) | (custo < custo[i]))
+        assert not dominado.any()
+    np.testing.assert_allclose(producao, parametros['taxa_producao'] * fronteira['operarios'] * fronteira['horas'])
+    assert fronteira['solves'] <= 30
+
+    # Para cada nível de produção, o custo mínimo da fronteira é o da enumeração
+    enumerados = np.array(_pontos_enumerados(parametros, OPCOES_HORAS))
+    for nivel in np.linspace(producao.min(), producao.max(), 30):
+        minimo = enumerados[enumerados[:, 0] >= nivel - 1e-9, 1].min()
+        assert custo[producao >= nivel - 1e-9].min() == pytest.approx(minimo)
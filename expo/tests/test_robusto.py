@@ -0,0 +1,33 @@
+"""
+Testes da otimização robusta por cenários (models/robusto.py)
+"""
+
+import pytest
+
+from data.parametros import PARAMETROS
+from models.otimizacao import OtimizadorProducao
+from models.robusto import otimizar_robusto
+
+OPCOES_HORAS = [6, 7, 8, 9]
+
+
+@pytest.mark.parametrize('meta_diaria', [2500, 3000, 3500])
+@pytest.mark.parametrize('probabilidade', [0.5, 0.9, 0.99])
+def test_decomposicao_igual_ao_milp(meta_diaria, probabilidade):
+    parametros = dict(PARAMETROS, meta_diaria=meta_diaria)
+    opcoes = {'n_cenarios': 400, 'opcoes_horas': OPCOES_HORAS, 'semente': 7, 'tamanho_bloco': 100}
+
+    decomposicao = otimizar_robusto(parametros, probabilidade, modo='decomposicao', n_processos=1, **opcoes)
+    milp = otimizar_robusto(parametros, probabilidade, modo='milp', **opcoes)
+
+    assert decomposicao['status'] == milp['status']
+    assert decomposicao['por_horas'] == milp['por_horas']
+    for chave in ('operarios_ideais', 'horas_ideais', 'probabilidade_meta', 'custo_total'):
+        assert decomposicao[chave] == milp[chave]
+
+
+def test_solucao_atinge_a_probabilidade_alvo():
+    resultado = OtimizadorProducao(PARAMETROS, cache=False).otimizar_producao_robusta(
+        0.9, 2_000, opcoes_horas=OPCOES_HORAS, semente=0, n_processos=1)
+    assert resultado['status'] == 'Optimal'
+    assert resultado['probabilidade_meta'] >= 0.9
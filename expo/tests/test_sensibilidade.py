@@ -0,0 +1,93 @@
+"""
+Testes da análise de sensibilidade (models/sensibilidade.py) contra diferenças finitas
+"""
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS
+from models.otimizacao import OtimizadorProducao
+from models.sensibilidade import AnalisadorSensibilidade, analisar_lp
+from models.solvers import ProblemaLinear, resolver
+
+PASSO = 1e-3
+
+# max 3x + 5y  s.a.  x <= 4,  2y <= 12,  3x + 2y <= 18,  y <= 5.5
+PROBLEMA = ProblemaLinear(
+    c=[3, 5], A=np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 2.0]]),
+    lb_restricoes=[-np.inf] * 3, ub_restricoes=[4, 12, 18], lb=[0, 0], ub=[np.inf, 5.5],
+    inteiras=[True, True], nomes_variaveis=['x', 'y'], nomes_restricoes=['a', 'b', 'c'])
+
+
+def _relaxacao(problema, **alteracoes):
+    """Solução da relaxação linear com alguns atributos substituídos"""
+    problema = problema.copiar(inteiras=np.zeros(problema.n_variaveis, dtype=bool), **alteracoes)
+    return resolver(problema, 'highs')
+
+
+def _derivada(problema, atributo, indice, valor):
+    """Derivada central do ótimo em relação a problema.<atributo>[indice] no ponto valor"""
+    objetivos = []
+    for sinal in (1, -1):
+        vetor = getattr(problema, atributo).copy()
+        vetor[indice] = valor + sinal * PASSO
+        objetivos.append(_relaxacao(problema, **{atributo: vetor})['objetivo'])
+    return (objetivos[0] - objetivos[1]) / (2 * PASSO)
+
+
+def _pontos_internos(intervalo, atual):
+    """Pontos do intervalo de validade (extremos infinitos viram atual ± 5)"""
+    inferior = intervalo[0] if np.isfinite(intervalo[0]) else atual - 5
+    superior = intervalo[1] if np.isfinite(intervalo[1]) else atual + 5
+    return np.linspace(inferior, superior, 7)[1:-1]
+
+
+def test_precos_sombra_e_intervalos_das_restricoes():
+    analise = analisar_lp(PROBLEMA)
+    assert analise['objetivo'] == pytest.approx(_relaxacao(PROBLEMA)['objetivo'])
+
+    for i, restricao in enumerate(analise['restricoes']):
+        atual = PROBLEMA.ub_restricoes[i]
+        for valor in _pontos_internos(restricao['intervalo'], atual):
+            assert _derivada(PROBLEMA, 'ub_restricoes', i, valor) == pytest.approx(
+                restricao['preco_sombra'], abs=1e-6), (restricao['nome'], valor)
+        if np.isfinite(restricao['intervalo'][1]):
+            # Logo depois do intervalo o preço-sombra muda
+            fora = restricao['intervalo'][1] + 10 * PASSO
+            assert _derivada(PROBLEMA, 'ub_restricoes', i, fora) != pytest.approx(restricao['preco_sombra'])
+
+
+def test_precos_sombra_e_intervalos_dos_limites():
+    (limite,) = analisar_lp(PROBLEMA)['limites_superiores']
+    assert limite['variavel'] == 'y' and limite['preco_sombra'] == pytest.approx(3.0)
+
+    for valor in _pontos_internos(limite['intervalo'], limite['limite']):
+        assert _derivada(PROBLEMA, 'ub', 1, valor) == pytest.approx(limite['preco_sombra'], abs=1e-6)
+    assert _derivada(PROBLEMA, 'ub', 1, limite['intervalo'][1] + 10 * PASSO) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_intervalos_de_custo_mantem_a_solucao():
+    analise = analisar_lp(PROBLEMA)
+
+    for j, intervalo in enumerate(analise['intervalos_custo']):
+        for valor in _pontos_internos(intervalo, PROBLEMA.c[j]):
+            c = PROBLEMA.c.copy()
+            c[j] = valor
+            np.testing.assert_allclose(_relaxacao(PROBLEMA, c=c)['x'], analise['x'], atol=1e-6)
+        if np.isfinite(intervalo[1]):
+            c = PROBLEMA.c.copy()
+            c[j] = intervalo[1] + 0.5
+            assert not np.allclose(_relaxacao(PROBLEMA, c=c)['x'], analise['x'], atol=1e-6)
+
+
+def test_valores_marginais_do_otimizador():
+    otimizador = OtimizadorProducao(PARAMETROS, cache=False)
+    marginais = AnalisadorSensibilidade(otimizador).valores_marginais()
+    horas = PARAMETROS['horas_efetivas']
+
+    modelo = otimizador.modelo_horas_fixas(horas)
+    assert marginais['unidades_por_operario'] == pytest.approx(_derivada(modelo, 'ub', 0, modelo.ub[0]))
+    # Derivada em relação às horas: o modelo inteiro muda (objetivo e meta)
+    producao = [_relaxacao(otimizador.modelo_horas_fixas(horas + sinal * PASSO))['objetivo']
+                for sinal in (1, -1)]
+    assert marginais['unidades_por_hora'] == pytest.approx((producao[0] - producao[1]) / (2 * PASSO))
@@ -0,0 +1,113 @@
+"""
+Testes do serviço de otimização (servico.py) numa porta efêmera, com um processo
+"""
+
+import asyncio
+import json
+
+from servico import ServicoOtimizacao
+
+
+def _com_servico(cenario, **opcoes):
+    """Sobe o serviço em 127.0.0.1:<porta livre>, executa cenario(servico, porta) e encerra"""
+    async def executar():
+        servico = ServicoOtimizacao(n_processos=1, **opcoes)
+        servidor = await servico.iniciar('127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        try:
+            async with servidor:
+                return await cenario(servico, porta)
+        finally:
+            servico.encerrar()
+    return asyncio.run(executar())
+
+
+async def _pedir(porta, caminho, dados=None, bruto=None):
+    """Um pedido HTTP numa conexão nova; retorna (status, resposta)"""
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+    if bruto is None:
+        corpo = json.dumps(dados).encode('utf-8')
+        bruto = (f'POST {caminho} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\n'
+                 f'Connection: close\r\n\r\n').encode('latin-1') + corpo
+    escritor.write(bruto)
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    cabecalhos = {}
+    while (linha := await leitor.readline()) not in (b'\r\n', b''):
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    resposta = json.loads(await leitor.readexactly(int(cabecalhos['content-length'])))
+    escritor.close()
+    return status, resposta
+
+
+def test_pedidos_identicos_sao_resolvidos_uma_vez():
+    async def cenario(servico, porta):
+        pedido = {'parametros': {'meta_diaria': 2500}}
+        respostas = await asyncio.gather(*(_pedir(porta, '/otimizar', pedido) for _ in range(8)))
+        repetida = await _pedir(porta, '/otimizar', pedido)
+        return respostas, repetida, dict(servico.contadores)
+
+    respostas, repetida, contadores = _com_servico(cenario, janela=0.05)
+
+    assert {status for status, _ in respostas} == {200}
+    assert all(resposta == respostas[0][1] for _, resposta in respostas)
+    assert respostas[0][1]['status'] == 'Optimal'
+    assert contadores['execucoes'] == 1
+    assert contadores['deduplicadas'] == 7
+    # Depois de resolvido, o mesmo pedido vem do cache
+    assert repetida == respostas[0]
+    assert contadores['cache'] == 1
+
+
+def test_pedidos_da_mesma_janela_formam_um_lote():
+    async def cenario(servico, porta):
+        respostas = await asyncio.gather(*(
+            _pedir(porta, '/otimizar', {'parametros': {'meta_diaria': 2000 + 100 * i}})
+            for i in range(6)))
+        return respostas, dict(servico.contadores)
+
+    respostas, contadores = _com_servico(cenario, janela=0.2)
+
+    assert [status for status, _ in respostas] == [200] * 6
+    assert contadores['execucoes'] == 6
+    assert contadores['lotes'] < 6
+
+
+def test_fila_cheia_responde_503():
+    async def cenario(servico, porta):
+        # Ocupa a única vaga de processo: o despachante para e a fila enche
+        await servico._vagas.acquire()
+        pedidos = [asyncio.ensure_future(_pedir(porta, '/otimizar',
+                                                {'parametros': {'meta_diaria': 2000 + 100 * i}}))
+                   for i in range(4)]
+        while servico.contadores['requisicoes'] < 4:
+            await asyncio.sleep(0.01)
+        servico._vagas.release()
+        return await asyncio.gather(*pedidos), dict(servico.contadores)
+
+    respostas, contadores = _com_servico(cenario, limite_fila=1, lote_maximo=1, janela=0)
+
+    rejeitadas = [resposta for status, resposta in respostas if status == 503]
+    assert rejeitadas and contadores['rejeitadas'] == len(rejeitadas)
+    assert {status for status, _ in respostas} == {200, 503}
+    assert all('erro' in resposta for resposta in rejeitadas)
+
+
+def test_pedidos_invalidos_respondem_400_sem_ir_para_a_fila():
+    async def cenario(servico, porta):
+        respostas = [
+            await _pedir(porta, '/otimizar', {'parametros': {'taxa_producao': 'abc'}}),
+            await _pedir(porta, '/otimizar', {'parametros': {'operarios_maximos': 7.5}}),
+            await _pedir(porta, '/otimizar', {'metodo': 'outro'}),
+            await _pedir(porta, '/simular', {'monte_carlo': 'muitos'}),
+            await _pedir(porta, '/otimizar', bruto=b'LIXO\r\n\r\n'),
+            await _pedir(porta, '/otimizar', bruto=b'POST /otimizar HTTP/1.1\r\nContent-Length: x\r\n\r\n'),
+        ]
+        return respostas, dict(servico.contadores)
+
+    respostas, contadores = _com_servico(cenario)
+
+    assert [status for status, _ in respostas] == [400] * len(respostas)
+    assert "'taxa_producao'" in respostas[0][1]['erro']
+    assert contadores['execucoes'] == contadores['erros'] == 0
@@ -0,0 +1,32 @@
+"""
+Testes da simulação Monte Carlo de turnos (models/simulacao.py)
+"""
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS
+from models.simulacao import SimuladorCenarios
+
+
+@pytest.mark.parametrize('n_processos', [2, 3])
+def test_monte_carlo_independe_do_numero_de_processos(n_processos):
+    simulador = SimuladorCenarios(PARAMETROS)
+    opcoes = {'n_amostras': 50_000, 'semente': 42, 'tamanho_bloco': 10_000}
+
+    sequencial = simulador.simular_monte_carlo(n_processos=1, **opcoes)
+    paralelo = simulador.simular_monte_carlo(n_processos=n_processos, **opcoes)
+
+    assert sequencial['n_amostras'] == paralelo['n_amostras'] == 50_000
+    assert sequencial['prob_meta'] == paralelo['prob_meta']
+    assert sequencial['percentis'] == paralelo['percentis']
+    np.testing.assert_allclose(paralelo['producao_media'], sequencial['producao_media'], rtol=1e-12)
+    np.testing.assert_allclose(paralelo['producao_desvio'], sequencial['producao_desvio'], rtol=1e-9)
+    np.testing.assert_allclose(paralelo['custo_esperado'], sequencial['custo_esperado'], rtol=1e-12)
+
+
+def test_monte_carlo_muda_com_a_semente():
+    simulador = SimuladorCenarios(PARAMETROS)
+    a = simulador.simular_monte_carlo(20_000, semente=1, n_processos=1, tamanho_bloco=5_000)
+    b = simulador.simular_monte_carlo(20_000, semente=2, n_processos=1, tamanho_bloco=5_000)
+    assert a['producao_media'] != b['producao_media']
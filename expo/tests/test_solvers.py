@@ -0,0 +1,77 @@
+"""
+Testes da camada de solvers (models/solvers.py): escolha do backend e verificação cruzada
+"""
+
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from data.parametros import PARAMETROS
+from models import solvers
+from models.escala import EscalonadorTurnos, instancia_escala
+from models.otimizacao import OtimizadorProducao
+from models.solvers import DivergenciaBackends, escolher_backend, resolver
+
+
+def _otimizador(**alteracoes):
+    return OtimizadorProducao(dict(PARAMETROS, **alteracoes), cache=False)
+
+
+def test_escolha_automatica_do_backend():
+    otimizador = _otimizador()
+    assert escolher_backend(otimizador.modelo_horas_fixas(7)) == 'analitico'
+    assert escolher_backend(otimizador.modelo_horas_selecionadas([6, 7, 8])) == 'highs'
+    assert resolver(otimizador.modelo_horas_fixas(7))['backend'] == 'analitico'
+    assert resolver(otimizador.modelo_horas_selecionadas([6, 7, 8]))['backend'] == 'highs'
+
+
+@pytest.mark.parametrize('meta, taxa, operarios', [
+    (3000, 100, 6), (4200, 100, 6), (4201, 100, 6), (0, 100, 6), (3000, 70, 1), (3500, 100, 5),
+])
+def test_backends_concordam_no_modelo_de_horas_fixas(meta, taxa, operarios):
+    problema = _otimizador(meta_diaria=meta, taxa_producao=taxa,
+                           operarios_maximos=operarios).modelo_horas_fixas(7)
+    solucoes = {backend: resolver(problema, backend) for backend in ('analitico', 'highs', 'cbc')}
+
+    assert len({solucao['status'] for solucao in solucoes.values()}) == 1
+    if solucoes['cbc']['status'] == 'Optimal':
+        for solucao in solucoes.values():
+            np.testing.assert_allclose(solucao['x'], solucoes['cbc']['x'], atol=1e-6)
+
+
+@pytest.mark.parametrize('problema', [
+    _otimizador(meta_diaria=5000).modelo_horas_selecionadas([6, 7, 8, 9]),
+    _otimizador(meta_diaria=99_999).modelo_horas_selecionadas([6, 7, 8, 9]),
+    EscalonadorTurnos(instancia_escala(12, n_dias=2, semente=3)).montar_modelo(),
+], ids=['horas_selecionadas', 'inviavel', 'escala'])
+def test_verificacao_cruzada_highs_e_cbc(problema):
+    solucao = resolver(problema, 'highs', verificar='cbc')
+    assert solucao['backend'] == 'highs'
+
+
+def test_verificacao_acusa_divergencia():
+    problema = _otimizador().modelo_horas_selecionadas([6, 7, 8])
+    referencia = resolver(problema, 'highs')
+    errado = dict(referencia, objetivo=referencia['objetivo'] + 1.0)
+
+    with mock.patch.dict(solvers.BACKENDS, cbc=lambda problema, limite_tempo: dict(errado)):
+        with pytest.raises(DivergenciaBackends, match='Objetivo divergente'):
+            resolver(problema, 'highs', verificar='cbc')
+    with mock.patch.dict(solvers.BACKENDS, cbc=lambda problema, limite_tempo: {
+            'status': 'Infeasible', 'x': None, 'objetivo': None}):
+        with pytest.raises(DivergenciaBackends, match='Status divergente'):
+            resolver(problema, 'highs', verificar='cbc')
+
+
+def test_otimizador_repassa_backend_e_verificacao():
+    with mock.patch('models.otimizacao.resolver', wraps=solvers.resolver) as chamada:
+        resultado = OtimizadorProducao(PARAMETROS, cache=False, backend='cbc',
+                                       verificar='highs').otimizar_producao()
+    assert resultado['status'] == 'Optimal'
+    assert chamada.call_args.kwargs == {'backend': 'cbc', 'verificar': 'highs'}
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError, match='Backend desconhecido'):
+        resolver(_otimizador().modelo_horas_fixas(7), 'gurobi')
@@ -1,30 +1,188 @@
 """
 Dashboard interativo com Plotly - 3 ABAS SEPARADAS
+Pode abrir no navegador ou exportar um relatório HTML único (modo headless)
 """
 
+import html
+import json
+import math
+
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+
+from models.cache import CacheSolucoes
+from models.instrumentacao import contar, etapa
+
+# Figuras já construídas, pelo hash dos dados de entrada de cada painel
+CACHE_FIGURAS = CacheSolucoes(capacidade=64)
+
+# Até este número de pontos a sensibilidade usa o gráfico 3D; acima dele usa
+# Scattergl (WebGL) em 2D, com a grade reduzida no servidor a LIMITE_PONTOS_WEBGL
+LIMITE_PONTOS_3D = 2000
+LIMITE_PONTOS_WEBGL = 50000
 
-def criar_dashboard(resultado, cenarios, parametros):
-    """Cria 3 dashboards interativos em abas separadas"""
+def criar_dashboard(resultado, cenarios, parametros, exportar=None, exportar_json=None,
+                    grade_sensibilidade=None, cache=CACHE_FIGURAS, fronteira=None,
+                    historico=None, execucao=None, marginais=None):
+    """Cria 3 dashboards interativos em abas separadas
     
-    print("🌐 Abrindo 3 dashboards em abas separadas...")
+    Sem exportar, abre as 3 figuras no navegador. Com exportar=<caminho.html>,
+    não abre nada: grava um relatório HTML único com as 3 abas e um só
+    plotly.js embutido (e, com exportar_json, a especificação JSON das
+    figuras). grade_sensibilidade aceita {'operarios': [...], 'horas': [...]}.
+    Com fronteira (saída de OtimizadorProducao.fronteira_pareto), acrescenta
+    um painel com a fronteira de Pareto produção x custo. Com historico
+    (HistoricoExecucoes) e execucao, a sensibilidade usa a grade gravada
+    nessa execução, lida sob demanda e só nas colunas e linhas exibidas.
+    marginais (AnalisadorSensibilidade.valores_marginais) anota o painel de
+    sensibilidade; sem ele, é calculado uma vez, sem o cache de soluções.
+    """
+    
+    if exportar is None:
+        print("🌐 Abrindo 3 dashboards em abas separadas...")
     
     # DASHBOARD 1: Comparação de Cenários
     print("📊 Criando Dashboard 1: Comparação de Cenários...")
-    _criar_dashboard_cenarios(cenarios, parametros)
+    fig_cenarios = _figura_em_cache('cenarios', _criar_dashboard_cenarios, cache,
+                                    cenarios=cenarios, parametros=parametros)
     
     # DASHBOARD 2: Resultado da Otimização
     print("📈 Criando Dashboard 2: Resultado da Otimização...")
-    _criar_dashboard_otimizacao(resultado, parametros)
+    fig_otimizacao = _figura_em_cache('otimizacao', _criar_dashboard_otimizacao, cache,
+                                      resultado=resultado, parametros=parametros)
     
     # DASHBOARD 3: Análise de Sensibilidade
     print("🎛️ Criando Dashboard 3: Análise de Sensibilidade...")
-    _criar_dashboard_sensibilidade(resultado, parametros)
+    grade = grade_sensibilidade or {}
+    if marginais is None:
+        marginais = _valores_marginais(parametros)
+    conjunto = historico.conjuntos(execucao).get('grade') if historico is not None else None
+    if conjunto is not None:
+        # A chave identifica a grade gravada (segmentos só são acrescentados)
+        fig_sensibilidade = _figura_em_cache('sensibilidade_historico',
+                                             _criar_dashboard_sensibilidade_historico, cache,
+                                             diretorio=historico.diretorio, execucao=execucao,
+                                             linhas=conjunto['linhas'], parametros=parametros,
+                                             marginais=marginais)
+    else:
+        fig_sensibilidade = _figura_em_cache('sensibilidade', _criar_dashboard_sensibilidade, cache,
+                                             resultado=resultado, parametros=parametros,
+                                             marginais=marginais, operarios=grade.get('operarios'),
+                                             horas=grade.get('horas'))
+    
+    paineis = [
+        ('Comparação de Cenários', fig_cenarios),
+        ('Resultado da Otimização', fig_otimizacao),
+        ('Análise de Sensibilidade', fig_sensibilidade),
+    ]
+    
+    # DASHBOARD 4 (opcional): Fronteira de Pareto
+    if fronteira is not None:
+        print("⚖️ Criando Dashboard 4: Fronteira de Pareto...")
+        fig_pareto = _figura_em_cache('pareto', _criar_dashboard_pareto, cache,
+                                      fronteira=fronteira, resultado=resultado, parametros=parametros)
+        paineis.append(('Fronteira de Pareto', fig_pareto))
     
+    if exportar is not None:
+        with etapa('exportar_relatorio'):
+            exportar_relatorio(paineis, exportar, exportar_json)
+        print(f"✅ Relatório salvo em '{exportar}'")
+        return paineis
+    
+    for _, fig in paineis:
+        fig.show()
     print("✅ Todos os dashboards foram abertos em abas separadas!")
+    return paineis
+
+def exportar_relatorio(paineis, caminho_html, caminho_json=None):
+    """Grava os painéis [(titulo, figura)] em um HTML único com abas
+    
+    O plotly.js é embutido uma única vez no <head> e compartilhado pelas abas,
+    então o arquivo abre sem internet e sem servidor.
+    """
+    
+    botoes = []
+    abas = []
+    for i, (titulo, fig) in enumerate(paineis):
+        ativo = ' ativo' if i == 0 else ''
+        botoes.append(f'<button class="aba{ativo}" onclick="mostrarAba({i})">{html.escape(titulo)}</button>')
+        div = fig.to_html(full_html=False, include_plotlyjs=False, div_id=f'figura-{i}',
+                          default_width='100%')
+        abas.append(f'<section class="painel{ativo}" id="painel-{i}">{div}</section>')
+    
+    documento = _MODELO_RELATORIO.format(
+        plotlyjs=get_plotlyjs(),
+        botoes='\n'.join(botoes),
+        abas='\n'.join(abas),
+    )
+    with open(caminho_html, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(documento)
+    
+    if caminho_json is not None:
+        especificacao = {'paineis': [{'titulo': titulo, 'figura': json.loads(pio.to_json(fig))}
+                                     for titulo, fig in paineis]}
+        with open(caminho_json, 'w', encoding='utf-8') as arquivo:
+            json.dump(especificacao, arquivo)
+
+def _figura_em_cache(nome, construtor, cache, **dados):
+    """Reaproveita a figura se os dados do painel não mudaram desde a última vez"""
+    
+    if cache is None:
+        with etapa('figura', painel=nome):
+            return construtor(**dados)
+    
+    chave = cache.chave(f'figura_{nome}', dados)
+    guardada = cache.obter(chave)
+    contar('cache_figuras', painel=nome, resultado='miss' if guardada is None else 'hit')
+    if guardada is not None:
+        return pio.from_json(guardada['json'])
+    
+    with etapa('figura', painel=nome):
+        fig = construtor(**dados)
+    cache.guardar(chave, {'json': fig.to_json()})
+    return fig
+
+_MODELO_RELATORIO = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Relatório de Otimização de Produção</title>
+<script type="text/javascript">{plotlyjs}</script>
+<style>
+body {{ font-family: sans-serif; margin: 0; }}
+nav {{ display: flex; gap: 4px; padding: 8px; background: #f0f0f0; }}
+.aba {{ border: 0; padding: 8px 16px; cursor: pointer; background: #ddd; }}
+.aba.ativo {{ background: #2E86AB; color: white; }}
+.painel {{ display: none; padding: 8px; }}
+.painel.ativo {{ display: block; }}
+</style>
+</head>
+<body>
+<nav>
+{botoes}
+</nav>
+{abas}
+<script type="text/javascript">
+function mostrarAba(indice) {{
+    document.querySelectorAll('.aba').forEach(function (botao, i) {{
+        botao.classList.toggle('ativo', i === indice);
+    }});
+    document.querySelectorAll('.painel').forEach(function (painel, i) {{
+        painel.classList.toggle('ativo', i === indice);
+    }});
+    var figura = document.getElementById('figura-' + indice);
+    if (figura) {{ Plotly.Plots.resize(figura); }}
+}}
+</script>
+</body>
+</html>
+"""
+
 
 def _criar_dashboard_cenarios(cenarios, parametros):
     """Dashboard 1: Comparação de Cenários"""
@@ -50,7 +208,40 @@ def _criar_dashboard_cenarios(cenarios, parametros):
                   line_color="red", annotation_text="META DIÁRIA",
                   annotation_font_size=14, annotation_font_color="red")
     
-    fig.show()
+    return fig
+
+def _criar_dashboard_pareto(fronteira, resultado, parametros):
+    """Dashboard 4: Fronteira de Pareto produção x custo"""
+    
+    meta = np.asarray(fronteira['meta_atingida'], dtype=bool)
+    texto = [f'{o:.0f} operários × {h:g} h' for o, h in zip(fronteira['operarios'], fronteira['horas'])]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=fronteira['custo'], y=fronteira['producao'], mode='lines',
+                             line=dict(color='#2E86AB', width=2, shape='hv'),
+                             name='Fronteira', hoverinfo='skip'))
+    for atingida, cor, nome in ((False, '#C73E1D', 'Abaixo da meta'), (True, '#34A853', 'Atinge a meta')):
+        fig.add_trace(go.Scatter(x=fronteira['custo'][meta == atingida],
+                                 y=fronteira['producao'][meta == atingida],
+                                 mode='markers', marker=dict(size=10, color=cor), name=nome,
+                                 text=[t for t, m in zip(texto, meta) if m == atingida],
+                                 hovertemplate='%{text}<br>Custo: R$ %{x:.2f}<br>'
+                                               'Produção: %{y:.0f} unidades<extra></extra>'))
+    
+    # Solução que maximiza a produção (a do otimizar_producao)
+    custo_atual = resultado['operarios_ideais'] * resultado['horas_ideais'] * parametros['custo_hora']
+    fig.add_trace(go.Scatter(x=[custo_atual], y=[resultado['producao_maxima']], mode='markers',
+                             marker=dict(size=16, symbol='star', color='#F18F01'),
+                             name='Solução atual'))
+    
+    fig.add_hline(y=parametros['meta_diaria'], line_dash="dash",
+                  line_color="red", annotation_text="META DIÁRIA",
+                  annotation_font_size=14, annotation_font_color="red")
+    fig.update_layout(title='⚖️ DASHBOARD 4: FRONTEIRA DE PARETO PRODUÇÃO × CUSTO',
+                      xaxis_title='Custo (R$)', yaxis_title='Produção (unidades)',
+                      height=600, font=dict(size=12), title_font_size=18)
+    
+    return fig
 
 def _criar_dashboard_otimizacao(resultado, parametros):
     """Dashboard 2: Resultado da Otimização"""
@@ -125,29 +316,31 @@ def _criar_dashboard_otimizacao(resultado, parametros):
     fig.update_yaxes(title_text="R$", row=2, col=1, range=[0, custo_total * 1.3])
     fig.update_yaxes(title_text="%", row=2, col=2, range=[0, 110])
     
-    fig.show()
+    return fig
 
-def _criar_dashboard_sensibilidade(resultado, parametros):
+def _criar_dashboard_sensibilidade(resultado, parametros, marginais, operarios=None, horas=None):
     """Dashboard 3: Análise de Sensibilidade 3D"""
+    from models.simulacao import SimuladorCenarios
+    
+    operarios = list(range(1, parametros['operarios_maximos'] + 3)) if operarios is None else operarios
+    horas = [6, 7, 8, 9, 10] if horas is None else horas
     
-    operarios = list(range(1, parametros['operarios_maximos'] + 3))
-    horas = [6, 7, 8, 9, 10]
-    
-    producao_data = []
-    for op in operarios:
-        for hr in horas:
-            producao = parametros['taxa_producao'] * op * hr
-            custo = op * hr * parametros['custo_hora']
-            eficiencia = (producao / (op * hr * parametros['taxa_producao'])) * 100
-            
-            producao_data.append({
-                'Operarios': op,
-                'Horas': hr, 
-                'Producao': producao,
-                'Custo': custo,
-                'Eficiencia': eficiencia,
-                'Status': 'Viável' if producao >= parametros['meta_diaria'] else 'Inviável'
-            })
+    # Grades grandes: reduz no servidor e troca o 3D por Scattergl (WebGL)
+    if len(operarios) * len(horas) > LIMITE_PONTOS_3D:
+        operarios, horas = _reduzir_grade([operarios, horas], LIMITE_PONTOS_WEBGL)
+        return _criar_dashboard_sensibilidade_webgl(parametros, operarios, horas, marginais)
+    
+    # Grade avaliada de uma vez pelo simulador vetorizado
+    grade = SimuladorCenarios(parametros).simular_grade(operarios=operarios, horas=horas)
+    homem_hora = grade['operarios'] * grade['horas'] * grade['taxa_producao']
+    producao_data = {
+        'Operarios': grade['operarios'],
+        'Horas': grade['horas'],
+        'Producao': grade['producao'],
+        'Custo': grade['custo'],
+        'Eficiencia': grade['producao'] / homem_hora * 100,
+        'Status': np.where(grade['meta_atingida'], 'Viável', 'Inviável')
+    }
     
     df_sensibilidade = pd.DataFrame(producao_data)
     
@@ -185,4 +378,91 @@ def _criar_dashboard_sensibilidade(resultado, parametros):
         title_font_size=16
     )
     
-    fig.show()
\ No newline at end of file
+    _anotar_valores_marginais(fig, marginais)
+    
+    return fig
+
+def _criar_dashboard_sensibilidade_webgl(parametros, operarios, horas, marginais):
+    """Dashboard 3 para grades grandes: mapa Operários x Horas em Scattergl"""
+    from models.simulacao import SimuladorCenarios
+    
+    grade = SimuladorCenarios(parametros).simular_grade(operarios=operarios, horas=horas)
+    return _figura_grade_webgl(grade, marginais)
+
+def _criar_dashboard_sensibilidade_historico(diretorio, execucao, linhas, parametros, marginais):
+    """Dashboard 3 a partir da grade gravada no histórico (amostrada com passo fixo)"""
+    from data.historico import HistoricoExecucoes
+
+    passo = max(1, math.ceil(linhas / LIMITE_PONTOS_WEBGL))
+    with HistoricoExecucoes(diretorio) as historico:
+        grade = historico.carregar(execucao, 'grade',
+                                   ['operarios', 'horas', 'producao', 'custo', 'meta_atingida'],
+                                   fim=linhas, passo=passo)
+    return _figura_grade_webgl(grade, marginais)
+
+def _figura_grade_webgl(grade, marginais):
+    """Mapa Operários x Horas em Scattergl para uma grade colunar"""
+    
+    fig = go.Figure()
+    for viavel, simbolo, nome in ((True, 'circle', 'Viável'), (False, 'x', 'Inviável')):
+        selecao = grade['meta_atingida'] == viavel
+        fig.add_trace(go.Scattergl(
+            name=nome,
+            x=grade['operarios'][selecao],
+            y=grade['horas'][selecao],
+            mode='markers',
+            marker=dict(color=grade['producao'][selecao], colorscale='Viridis',
+                        cmin=float(grade['producao'].min()), cmax=float(grade['producao'].max()),
+                        symbol=simbolo, size=6, showscale=viavel,
+                        colorbar=dict(title='Produção')),
+            customdata=np.column_stack([grade['producao'][selecao], grade['custo'][selecao]]),
+            hovertemplate=('Operários: %{x}<br>Horas: %{y}<br>Produção: %{customdata[0]:.0f}'
+                           '<br>Custo: R$ %{customdata[1]:.2f}<extra></extra>')
+        ))
+    
+    fig.update_layout(
+        title=f'🎛️ DASHBOARD 3: SENSIBILIDADE - PRODUÇÃO vs OPERÁRIOS vs HORAS ({len(grade["producao"])} pontos)',
+        xaxis_title='Nº de Operários',
+        yaxis_title='Horas Trabalhadas',
+        height=700,
+        title_font_size=16
+    )
+    
+    _anotar_valores_marginais(fig, marginais)
+    
+    return fig
+
+def _valores_marginais(parametros):
+    """Valores marginais dos preços-sombra (sem gravar no cache de soluções)"""
+    from models.otimizacao import OtimizadorProducao
+    from models.sensibilidade import AnalisadorSensibilidade
+    
+    return AnalisadorSensibilidade(OtimizadorProducao(parametros, cache=False)).valores_marginais()
+
+def _anotar_valores_marginais(fig, marginais):
+    """Anota os valores marginais vindos dos preços-sombra do otimizador"""
+    
+    if marginais['status'] == 'Optimal':
+        fig.add_annotation(
+            text=(f"Valor marginal: +{marginais['unidades_por_operario']:.0f} un./operário, "
+                  f"+{marginais['unidades_por_hora']:.0f} un./hora<br>"
+                  f"Preço-sombra da meta: {marginais['preco_sombra_meta']:.2f} "
+                  f"(válido até {marginais['intervalo_meta'][1]:.0f} unidades)"),
+            xref='paper', yref='paper', x=0, y=1.05, showarrow=False, align='left',
+            font=dict(size=12), bgcolor='lightyellow'
+        )
+
+def _reduzir_grade(eixos, limite):
+    """Amostra cada eixo com passo uniforme (mantendo o último valor) para ficar perto do limite"""
+    
+    eixos = [np.asarray(eixo) for eixo in eixos]
+    total = math.prod(len(eixo) for eixo in eixos)
+    if total <= limite:
+        return eixos
+    
+    passo = math.ceil((total / limite) ** (1 / len(eixos)))
+    reduzidos = []
+    for eixo in eixos:
+        indices = np.unique(np.append(np.arange(0, len(eixo), passo), len(eixo) - 1))
+        reduzidos.append(eixo[indices])
+    return reduzidos
@@ -1,150 +1,229 @@
 """
-Criação de gráficos estáticos com Matplotlib e Seaborn
+Criação de gráficos estáticos com Matplotlib
+Renderização não interativa (Agg), em paralelo e incremental
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 
+from data.parametros import PARAMETROS
+from models.analitico import calcular_meta_minima
+from models.cache import CacheSolucoes
+from models.otimizacao import OPCOES_HORAS_PADRAO
+
+# Arquivo, no diretório de saída, com o hash dos dados de cada gráfico já gerado
+MANIFESTO = '.graficos_manifesto.json'
+
+CORES = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#34A853', '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+
 class Visualizador:
-    def __init__(self):
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-        
-    def criar_graficos(self, resultado, cenarios):
-        """Cria todos os gráficos estáticos"""
+    def __init__(self, parametros=None, diretorio_saida='.', dpi=300, estilo='seaborn-v0_8'):
+        self.parametros = parametros
+        self.diretorio_saida = diretorio_saida
+        self.estilo = {'estilo': estilo, 'dpi': dpi}
         
-        print("📈 Gerando gráficos...")
-        
-        # Gráfico 1: Cenários
-        self._grafico_producao_cenarios(cenarios)
-        print("✅ Gráfico de cenários salvo como 'grafico_cenarios.png'")
+    def criar_graficos(self, resultado, cenarios, parametros=None, n_processos=None, forcar=False):
+        """Cria todos os gráficos estáticos
         
-        # Gráfico 2: Otimização
-        self._grafico_otimizacao(resultado)
-        print("✅ Gráfico de otimização salvo como 'grafico_otimizacao.png'")
+        Os gráficos são renderizados com o backend Agg (nada é aberto na tela)
+        em processos separados. Um gráfico só é refeito se o hash dos seus dados
+        e da configuração de estilo mudou desde a última execução, ou se forcar=True.
+        Sem parâmetros (aqui ou no construtor), usa data.parametros.PARAMETROS.
+        Retorna {arquivo: 'gerado' | 'reaproveitado'}.
+        """
         
-        # Gráfico 3: Sensibilidade
-        self._grafico_sensibilidade()
-        print("✅ Gráfico de sensibilidade salvo como 'grafico_sensibilidade.png'")
+        if parametros is None:
+            parametros = PARAMETROS if self.parametros is None else self.parametros
         
+        print("📈 Gerando gráficos...")
+        os.makedirs(self.diretorio_saida, exist_ok=True)
+        
+        graficos = {
+            'grafico_cenarios.png': ('cenarios', {'cenarios': cenarios, 'parametros': parametros}),
+            'grafico_otimizacao.png': ('otimizacao', {'resultado': resultado, 'parametros': parametros}),
+            'grafico_sensibilidade.png': ('sensibilidade', {'parametros': parametros}),
+        }
+        
+        manifesto = self._ler_manifesto()
+        situacao = {}
+        tarefas = []
+        for arquivo, (tipo, dados) in graficos.items():
+            chave = CacheSolucoes.chave(tipo, dados, **self.estilo)
+            caminho = os.path.join(self.diretorio_saida, arquivo)
+            if not forcar and manifesto.get(arquivo) == chave and os.path.exists(caminho):
+                situacao[arquivo] = 'reaproveitado'
+                continue
+            tarefas.append((tipo, _dados_nativos(dados), self.estilo, caminho))
+            manifesto[arquivo] = chave
+            situacao[arquivo] = 'gerado'
+        
+        if len(tarefas) > 1 and n_processos != 1:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                list(executor.map(_renderizar, tarefas))
+        else:
+            for tarefa in tarefas:
+                _renderizar(tarefa)
+        
+        self._gravar_manifesto(manifesto)
+        
+        for arquivo, estado in situacao.items():
+            icone = '✅' if estado == 'gerado' else '♻️'
+            print(f"{icone} '{arquivo}' {estado}")
         print("🎨 Todos os gráficos foram gerados e salvos!")
-        
-    def _grafico_producao_cenarios(self, cenarios):
-        """Gráfico de barras comparando cenários"""
-        
-        df_cenarios = pd.DataFrame(cenarios)
-        
-        plt.figure(figsize=(12, 7))
-        bars = plt.bar(df_cenarios['nome'], df_cenarios['producao'], 
-                      color=['#2E86AB', '#A23B72', '#F18F01', '#C73E1D'],
-                      alpha=0.8)
-        
-        # Adicionar valores nas barras
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 50,
-                    f'{height:.0f} unidades', ha='center', va='bottom', fontweight='bold')
-        
-        plt.title('Comparação de Produção por Cenário', fontsize=16, fontweight='bold', pad=20)
-        plt.ylabel('Produção (unidades)', fontsize=12)
-        plt.xlabel('Cenários', fontsize=12)
-        plt.xticks(rotation=15)
-        plt.grid(axis='y', alpha=0.3)
-        
-        # Adicionar linha da meta
-        plt.axhline(y=3000, color='red', linestyle='--', linewidth=2, label='Meta (3000 unidades)')
-        plt.legend()
-        
-        plt.tight_layout()
-        plt.savefig('grafico_cenarios.png', dpi=300, bbox_inches='tight')
-        plt.show()
-        
-    def _grafico_otimizacao(self, resultado):
-        """Gráfico do resultado da otimização"""
-        
-        fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 5))
-        
-        # Gráfico 1: Recursos otimizados
-        recursos = ['Operários', 'Horas']
-        valores = [resultado['operarios_ideais'], resultado['horas_ideais']]
-        cores = ['#2E86AB', '#A23B72']
-        
-        bars1 = ax1.bar(recursos, valores, color=cores, alpha=0.8)
-        ax1.set_title('Recursos Otimizados', fontweight='bold', fontsize=14)
-        ax1.set_ylabel('Quantidade', fontsize=12)
-        ax1.grid(axis='y', alpha=0.3)
-        
-        # Adicionar valores nas barras
-        for bar in bars1:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'{height:.1f}', ha='center', va='bottom', fontweight='bold')
-        
-        # Gráfico 2: Produção vs Meta
-        producao_meta = [resultado['producao_maxima'], 3000]
-        labels = ['Produção\nOtimizada', 'Meta\nDiária']
-        cores2 = ['#F18F01', '#C73E1D']
-        
-        bars2 = ax2.bar(labels, producao_meta, color=cores2, alpha=0.8)
-        ax2.set_title('Produção vs Meta', fontweight='bold', fontsize=14)
-        ax2.set_ylabel('Unidades', fontsize=12)
-        ax2.grid(axis='y', alpha=0.3)
-        
-        # Adicionar valores nas barras
-        for bar in bars2:
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height + 50,
-                    f'{height:.0f}', ha='center', va='bottom', fontweight='bold')
-        
-        # Gráfico 3: Custo
-        custo = resultado['operarios_ideais'] * resultado['horas_ideais'] * 18
-        ax3.bar(['Custo Total'], [custo], color='#34A853', alpha=0.8)
-        ax3.set_title('Custo de Produção', fontweight='bold', fontsize=14)
-        ax3.set_ylabel('R$', fontsize=12)
-        ax3.grid(axis='y', alpha=0.3)
-        ax3.text(0, custo + 20, f'R$ {custo:.2f}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('grafico_otimizacao.png', dpi=300, bbox_inches='tight')
-        plt.show()
-        
-    def _grafico_sensibilidade(self):
-        """Gráfico de sensibilidade da produção"""
-        
-        operarios_range = range(1, 9)
-        horas_range = [6, 7, 8, 9]
-        
-        fig, ax = plt.subplots(figsize=(12, 7))
-        
-        cores = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-        
-        for i, horas in enumerate(horas_range):
-            producao = [100 * op * horas for op in operarios_range]
-            ax.plot(operarios_range, producao, marker='o', 
-                   label=f'{horas} horas', linewidth=3, markersize=8, color=cores[i])
-        
-        # Linha da meta
-        ax.axhline(y=3000, color='red', linestyle='--', linewidth=3, 
-                  label='Meta (3000 unidades)', alpha=0.8)
-        
-        # Área viável
-        ax.axvspan(5, 8, alpha=0.2, color='green', label='Zona Viável (≥ Meta)')
-        
-        ax.set_xlabel('Número de Operários', fontsize=12)
-        ax.set_ylabel('Produção (unidades)', fontsize=12)
-        ax.set_title('Sensibilidade: Produção vs Operários e Horas', 
-                    fontweight='bold', fontsize=16, pad=20)
-        ax.legend(fontsize=11)
-        ax.grid(True, alpha=0.3)
+        return situacao
+        
+    def _ler_manifesto(self):
+        try:
+            with open(os.path.join(self.diretorio_saida, MANIFESTO), encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return {}
+        
+    def _gravar_manifesto(self, manifesto):
+        with open(os.path.join(self.diretorio_saida, MANIFESTO), 'w', encoding='utf-8') as arquivo:
+            json.dump(manifesto, arquivo, indent=2)
+
+def _dados_nativos(dados):
+    """Converte valores NumPy em tipos nativos antes de enviar aos processos"""
+    return json.loads(json.dumps(dados, default=lambda valor: valor.tolist()))
+
+def _renderizar(tarefa):
+    """Renderiza um gráfico em PNG (executado nos processos)"""
+    tipo, dados, estilo, caminho = tarefa
+    with matplotlib.style.context(estilo['estilo']):
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        RENDERIZADORES[tipo](fig, **dados)
+        fig.tight_layout()
+        fig.savefig(caminho, dpi=estilo['dpi'], bbox_inches='tight')
+    return caminho
+
+def _grafico_producao_cenarios(fig, cenarios, parametros):
+    """Gráfico de barras comparando cenários"""
+    
+    fig.set_size_inches(12, 7)
+    ax = fig.subplots()
+    nomes = [cenario['nome'] for cenario in cenarios]
+    producoes = [cenario['producao'] for cenario in cenarios]
+    meta = parametros['meta_diaria']
+    
+    bars = ax.bar(nomes, producoes, color=[CORES[i % len(CORES)] for i in range(len(cenarios))],
+                  alpha=0.8)
+    
+    # Adicionar valores nas barras
+    folga = max(producoes + [meta]) * 0.01
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + folga,
+                f'{height:.0f} unidades', ha='center', va='bottom', fontweight='bold')
+    
+    ax.set_title('Comparação de Produção por Cenário', fontsize=16, fontweight='bold', pad=20)
+    ax.set_ylabel('Produção (unidades)', fontsize=12)
+    ax.set_xlabel('Cenários', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=15)
+    ax.grid(axis='y', alpha=0.3)
+    
+    # Adicionar linha da meta
+    ax.axhline(y=meta, color='red', linestyle='--', linewidth=2, label=f'Meta ({meta:.0f} unidades)')
+    ax.legend()
+
+def _grafico_otimizacao(fig, resultado, parametros):
+    """Gráfico do resultado da otimização"""
+    
+    fig.set_size_inches(15, 5)
+    ax1, ax2, ax3 = fig.subplots(1, 3)
+    meta = parametros['meta_diaria']
+    
+    # Gráfico 1: Recursos otimizados
+    recursos = ['Operários', 'Horas']
+    valores = [resultado['operarios_ideais'], resultado['horas_ideais']]
+    cores = ['#2E86AB', '#A23B72']
+    
+    bars1 = ax1.bar(recursos, valores, color=cores, alpha=0.8)
+    ax1.set_title('Recursos Otimizados', fontweight='bold', fontsize=14)
+    ax1.set_ylabel('Quantidade', fontsize=12)
+    ax1.grid(axis='y', alpha=0.3)
+    
+    # Adicionar valores nas barras
+    for bar in bars1:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height + max(valores) * 0.01,
+                f'{height:.1f}', ha='center', va='bottom', fontweight='bold')
+    
+    # Gráfico 2: Produção vs Meta
+    producao_meta = [resultado['producao_maxima'], meta]
+    labels = ['Produção\nOtimizada', 'Meta\nDiária']
+    cores2 = ['#F18F01', '#C73E1D']
+    
+    bars2 = ax2.bar(labels, producao_meta, color=cores2, alpha=0.8)
+    ax2.set_title('Produção vs Meta', fontweight='bold', fontsize=14)
+    ax2.set_ylabel('Unidades', fontsize=12)
+    ax2.grid(axis='y', alpha=0.3)
+    
+    # Adicionar valores nas barras
+    for bar in bars2:
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height + max(producao_meta) * 0.01,
+                f'{height:.0f}', ha='center', va='bottom', fontweight='bold')
+    
+    # Gráfico 3: Custo
+    custo = resultado['operarios_ideais'] * resultado['horas_ideais'] * parametros['custo_hora']
+    ax3.bar(['Custo Total'], [custo], color='#34A853', alpha=0.8)
+    ax3.set_title('Custo de Produção', fontweight='bold', fontsize=14)
+    ax3.set_ylabel('R$', fontsize=12)
+    ax3.grid(axis='y', alpha=0.3)
+    ax3.text(0, custo * 1.01, f'R$ {custo:.2f}', ha='center', va='bottom', fontweight='bold')
+
+def _grafico_sensibilidade(fig, parametros):
+    """Gráfico de sensibilidade da produção"""
+    
+    operarios_range = np.arange(1, parametros['operarios_maximos'] + 3)
+    horas_range = parametros.get('opcoes_horas', OPCOES_HORAS_PADRAO)
+    meta = parametros['meta_diaria']
+    taxa = parametros['taxa_producao']
+    
+    fig.set_size_inches(12, 7)
+    ax = fig.subplots()
+    
+    for i, horas in enumerate(horas_range):
+        producao = taxa * operarios_range * horas
+        ax.plot(operarios_range, producao, marker='o',
+               label=f'{horas} horas', linewidth=3, markersize=8, color=CORES[(i + 5) % len(CORES)])
+    
+    # Linha da meta
+    ax.axhline(y=meta, color='red', linestyle='--', linewidth=3,
+              label=f'Meta ({meta:.0f} unidades)', alpha=0.8)
+    
+    # Área viável: a partir do mínimo de operários com as horas efetivas
+    minimo = calcular_meta_minima(parametros)
+    operarios_minimos = minimo['operarios_minimos']
+    if operarios_minimos <= operarios_range[-1]:
+        ax.axvspan(operarios_minimos, operarios_range[-1], alpha=0.2, color='green',
+                   label='Zona Viável (≥ Meta)')
         
         # Adicionar anotações
-        ax.annotate('Mínimo: 5 operários\ncom 7 horas', 
-                   xy=(5, 3500), xytext=(3, 4500),
+        ax.annotate(f"Mínimo: {operarios_minimos} operários\ncom {minimo['horas_necessarias']} horas\n"
+                    f"(+{taxa * minimo['horas_necessarias']:.0f} un. por operário)",
+                   xy=(operarios_minimos, minimo['producao_estimada']),
+                   xytext=(max(1, operarios_minimos - 2), minimo['producao_estimada'] * 1.3),
                    arrowprops=dict(arrowstyle='->', color='black'),
                    fontsize=10, bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
-        
-        plt.tight_layout()
-        plt.savefig('grafico_sensibilidade.png', dpi=300, bbox_inches='tight')
-        plt.show()
\ No newline at end of file
+    
+    ax.set_xlabel('Número de Operários', fontsize=12)
+    ax.set_ylabel('Produção (unidades)', fontsize=12)
+    ax.set_title('Sensibilidade: Produção vs Operários e Horas',
+                fontweight='bold', fontsize=16, pad=20)
+    ax.legend(fontsize=11)
+    ax.grid(True, alpha=0.3)
+
+RENDERIZADORES = {
+    'cenarios': _grafico_producao_cenarios,
+    'otimizacao': _grafico_otimizacao,
+    'sensibilidade': _grafico_sensibilidade,
+}